@@ -0,0 +1,121 @@
+import threading
+import time
+from collections import deque
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a heavy job cannot be admitted (wait queue full or queue timeout)
+    """
+
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+class AdmissionController:
+    """
+    Concurrency limiter for heavy jobs (upload processing, exports) with a bounded
+    FIFO wait queue and a memory budget: a job is admitted when a slot is free and
+    its estimated memory cost fits in the remaining budget. A job larger than the
+    whole budget is admitted only when nothing else is running.
+    Limits apply per process (each gunicorn worker has its own controller).
+    """
+
+    def __init__(self, max_concurrent=2, max_queue=8, memory_budget_bytes=None, queue_timeout=30.0):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.memory_budget_bytes = memory_budget_bytes
+        self.queue_timeout = queue_timeout
+        self._condition = threading.Condition()
+        self._queue = deque()
+        self._active = 0
+        self._active_bytes = 0
+        self._avg_job_seconds = None
+        self._stats = {
+            'admitted': 0,
+            'rejected_queue_full': 0,
+            'rejected_timeout': 0,
+            'completed': 0,
+            'max_queue_length': 0
+        }
+
+    def _fits(self, cost_bytes):
+        if self._active >= self.max_concurrent:
+            return False
+        if self.memory_budget_bytes is None or self._active == 0:
+            return True
+        return self._active_bytes + cost_bytes <= self.memory_budget_bytes
+
+    def _retry_after(self):
+        """
+        Seconds until a slot is likely free, from the average job duration and queue length
+        """
+        avg = self._avg_job_seconds or 5.0
+        waves = (len(self._queue) + self._active) / max(self.max_concurrent, 1)
+        return max(1, int(round(avg * max(waves, 1))))
+
+    def acquire(self, cost_bytes=0):
+        """
+        Block until the job is admitted (FIFO); raise AdmissionRejected if the queue is full
+        or the wait exceeds queue_timeout
+        Returns: ticket to pass to release()
+        """
+        with self._condition:
+            if not self._queue and self._fits(cost_bytes):
+                return self._admit(cost_bytes)
+
+            if len(self._queue) >= self.max_queue:
+                self._stats['rejected_queue_full'] += 1
+                raise AdmissionRejected('queue full', self._retry_after())
+
+            ticket = object()
+            self._queue.append(ticket)
+            self._stats['max_queue_length'] = max(self._stats['max_queue_length'], len(self._queue))
+            deadline = time.monotonic() + self.queue_timeout
+            try:
+                while not (self._queue[0] is ticket and self._fits(cost_bytes)):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['rejected_timeout'] += 1
+                        raise AdmissionRejected('queue timeout', self._retry_after())
+                    self._condition.wait(remaining)
+            finally:
+                self._queue.remove(ticket)
+                # The next waiter may now be at the head of the queue
+                self._condition.notify_all()
+            return self._admit(cost_bytes)
+
+    def _admit(self, cost_bytes):
+        self._active += 1
+        self._active_bytes += cost_bytes
+        self._stats['admitted'] += 1
+        return (cost_bytes, time.monotonic())
+
+    def release(self, ticket):
+        cost_bytes, started = ticket
+        elapsed = time.monotonic() - started
+        with self._condition:
+            self._active -= 1
+            self._active_bytes -= cost_bytes
+            self._stats['completed'] += 1
+            # Exponential moving average of job duration, used for Retry-After
+            if self._avg_job_seconds is None:
+                self._avg_job_seconds = elapsed
+            else:
+                self._avg_job_seconds = 0.8 * self._avg_job_seconds + 0.2 * elapsed
+            self._condition.notify_all()
+
+    def get_stats(self):
+        with self._condition:
+            stats = dict(self._stats)
+            stats.update({
+                'active_jobs': self._active,
+                'active_bytes': self._active_bytes,
+                'queue_length': len(self._queue),
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue,
+                'memory_budget_bytes': self.memory_budget_bytes,
+                'queue_timeout': self.queue_timeout,
+                'avg_job_seconds': round(self._avg_job_seconds, 3) if self._avg_job_seconds is not None else None
+            })
+        return stats
@@ -1,24 +1,119 @@
-from flask import Flask, request, render_template, jsonify, send_file, session
+from flask import Flask, Response, request, render_template, jsonify, send_file, session
+from flask.json.provider import DefaultJSONProvider
 from flask_session import Session
+from functools import wraps
 import os
+import sqlite3
+import threading
 from datetime import datetime
 from excel_to_json_anak import process_excel_to_json, validate_template_compliance
-from export_analisis import export_analisis_from_json
+from kualitas_data import ISSUE_TYPES, describe_issues, filter_issues
+from export_analisis import export_analisis_from_json, export_analisis_per_tempat_zip, export_diff_to_excel
+from filter_analisis import build_export_index, parse_list_filters, select_rows
+from perbandingan_upload import diff_results
+from statistik_anak import compute_aggregate_statistics
+from upload_store import UploadStore
+from pengukuran import Measurement
+from ringkasan_anak import summarize_child
+from profil_memori import annotate, profile_session, stage
+import profil_cpu
+from progres import ProgressRegistry, event_stream, is_valid_id as is_valid_progress_id, progress_session
+from janitor import Janitor
+from admission import AdmissionController, AdmissionRejected
+from arsip_pengukuran import COHORT_FILTERS, MeasurementArchive
+from periode import build_period_index, parse_period_key, make_period_key
 import uuid
 
+class CompactJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider that expands compact Measurement records to plain dicts
+    """
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, Measurement):
+            return o.to_dict()
+        return DefaultJSONProvider.default(o)
+
 app = Flask(__name__)
+app.json = CompactJSONProvider(app)
 
 # Configuration for both development and production
 app.config['UPLOAD_FOLDER'] = os.environ.get('UPLOAD_FOLDER', 'uploads')
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'sitrek_stunting_secret_key_2024')
+app.config['EXPORT_WORKERS'] = int(os.environ.get('EXPORT_WORKERS', os.cpu_count() or 1))
+app.config['EXPORT_FOLDER'] = os.environ.get('EXPORT_FOLDER', 'exports')
+# Worker processes for multi-sheet workbooks (one sheet per posyandu / desa)
+app.config['INGEST_WORKERS'] = int(os.environ.get('INGEST_WORKERS', os.cpu_count() or 1))
+
+# Janitor: age (hours) and size (MB) limits per directory, evicted oldest first
+app.config['JANITOR_ENABLED'] = os.environ.get('JANITOR_ENABLED', '1') == '1'
+app.config['JANITOR_INTERVAL_SECONDS'] = int(os.environ.get('JANITOR_INTERVAL_SECONDS', 600))
+app.config['UPLOAD_MAX_AGE_HOURS'] = float(os.environ.get('UPLOAD_MAX_AGE_HOURS', 24 * 7))
+app.config['UPLOAD_MAX_MB'] = float(os.environ.get('UPLOAD_MAX_MB', 500))
+app.config['EXPORT_MAX_AGE_HOURS'] = float(os.environ.get('EXPORT_MAX_AGE_HOURS', 24))
+app.config['EXPORT_MAX_MB'] = float(os.environ.get('EXPORT_MAX_MB', 500))
+app.config['SESSION_MAX_AGE_HOURS'] = float(os.environ.get('SESSION_MAX_AGE_HOURS', 24))
+app.config['SESSION_MAX_MB'] = float(os.environ.get('SESSION_MAX_MB', 100))
+# Optional eviction of processed datasets kept in memory (export_data_store), oldest first with
+# their caches; 0 keeps every dataset (eviction can drop another user's data or a /diff base)
+app.config['EXPORT_STORE_MAX_ENTRIES'] = int(os.environ.get('EXPORT_STORE_MAX_ENTRIES', 0))
+app.config['EXPORT_STORE_MAX_AGE_HOURS'] = float(os.environ.get('EXPORT_STORE_MAX_AGE_HOURS', 0))
+
+# Threads per gunicorn worker (Procfile --threads). Running heavy jobs, queued heavy jobs and
+# progress streams each hold one; LIGHT_RESERVED_THREADS always stay free for light endpoints
+app.config['SERVER_THREADS'] = int(os.environ.get('SERVER_THREADS', 8))
+app.config['LIGHT_RESERVED_THREADS'] = int(os.environ.get('LIGHT_RESERVED_THREADS', 2))
+
+# Progress streams: each holds a server thread, keep the cap well below gunicorn --threads
+app.config['PROGRESS_MAX_STREAMS'] = int(os.environ.get('PROGRESS_MAX_STREAMS', 3))
+app.config['PROGRESS_START_TIMEOUT'] = float(os.environ.get('PROGRESS_START_TIMEOUT', 5))
+
+# Admission control for heavy endpoints (upload processing, exports), per process
+# The wait queue defaults to the threads left over; beyond it requests get 503 + Retry-After
+app.config['HEAVY_MAX_CONCURRENT'] = int(os.environ.get('HEAVY_MAX_CONCURRENT', 2))
+app.config['HEAVY_MAX_QUEUE'] = int(os.environ.get('HEAVY_MAX_QUEUE', max(
+    0, app.config['SERVER_THREADS'] - app.config['LIGHT_RESERVED_THREADS']
+    - app.config['HEAVY_MAX_CONCURRENT'] - app.config['PROGRESS_MAX_STREAMS'])))
+app.config['HEAVY_QUEUE_TIMEOUT'] = float(os.environ.get('HEAVY_QUEUE_TIMEOUT', 30))
+app.config['HEAVY_MEMORY_BUDGET_MB'] = float(os.environ.get('HEAVY_MEMORY_BUDGET_MB', 1024))
+# Estimated peak memory: upload size x factor (openpyxl + pandas expansion), bytes per exported row
+app.config['UPLOAD_MEMORY_FACTOR'] = float(os.environ.get('UPLOAD_MEMORY_FACTOR', 40))
+app.config['EXPORT_BYTES_PER_ROW'] = int(os.environ.get('EXPORT_BYTES_PER_ROW', 4096))
+
+# Persistent application data (the archive); put it on a persistent volume in production
+app.config['DATA_DIR'] = os.environ.get('DATA_DIR', 'data')
+
+# Opt-in longitudinal SQLite archive of every processed upload (queried through /archive/...)
+# Measurements of periods older than ARCHIVE_RETENTION_MONTHS are deleted (0: keep everything)
+app.config['ARCHIVE_ENABLED'] = os.environ.get('ARCHIVE_ENABLED', '0') == '1'
+app.config['ARCHIVE_DB_PATH'] = os.environ.get('ARCHIVE_DB_PATH',
+                                               os.path.join(app.config['DATA_DIR'], 'arsip_pengukuran.sqlite3'))
+app.config['ARCHIVE_RETENTION_MONTHS'] = int(os.environ.get('ARCHIVE_RETENTION_MONTHS', 24))
+
+# Opt-in cProfile of single requests (CPU_PROFILE=1 + CPU_PROFILE_TOKEN, see profil_cpu.py)
+app.config['CPU_PROFILE_MAX_AGE_HOURS'] = float(os.environ.get('CPU_PROFILE_MAX_AGE_HOURS', 24 * 7))
+app.config['CPU_PROFILE_MAX_MB'] = float(os.environ.get('CPU_PROFILE_MAX_MB', 200))
+
+def check_thread_budget(config):
+    """
+    Fail at startup when heavy jobs, their queue and progress streams could take the threads
+    reserved for light endpoints (/health, /children, ...)
+    """
+    held = config['HEAVY_MAX_CONCURRENT'] + config['HEAVY_MAX_QUEUE'] + config['PROGRESS_MAX_STREAMS']
+    if held + config['LIGHT_RESERVED_THREADS'] > config['SERVER_THREADS']:
+        raise RuntimeError(
+            f"HEAVY_MAX_CONCURRENT ({config['HEAVY_MAX_CONCURRENT']}) + HEAVY_MAX_QUEUE ({config['HEAVY_MAX_QUEUE']}) "
+            f"+ PROGRESS_MAX_STREAMS ({config['PROGRESS_MAX_STREAMS']}) + LIGHT_RESERVED_THREADS "
+            f"({config['LIGHT_RESERVED_THREADS']}) exceeds SERVER_THREADS ({config['SERVER_THREADS']})")
+
+check_thread_budget(app.config)
 
 # Railway-specific configurations
 is_railway = os.environ.get('RAILWAY_ENVIRONMENT', '') != ''
-if is_railway:
-    app.config['SESSION_FILE_DIR'] = '/tmp/flask_sessions'
-else:
-    app.config['SESSION_FILE_DIR'] = 'flask_sessions'
+app.config['SESSION_FILE_DIR'] = os.environ.get('SESSION_FILE_DIR',
+                                                '/tmp/flask_sessions' if is_railway else 'flask_sessions')
 
 # Use file-based session to avoid cookie size limit
 app.config['SESSION_TYPE'] = 'filesystem'
@@ -28,18 +123,302 @@ app.config['SESSION_PERMANENT'] = False
 # Ensure directories exist
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs(app.config['SESSION_FILE_DIR'], exist_ok=True)
+os.makedirs(app.config['EXPORT_FOLDER'], exist_ok=True)
 
 # Initialize session
 sess = Session(app)
 
+# Content-addressed upload storage with metadata index
+upload_store = UploadStore(app.config['UPLOAD_FOLDER'])
+
+# Background cleanup of uploads, exports and session files
+janitor = Janitor(interval_seconds=app.config['JANITOR_INTERVAL_SECONDS'])
+janitor.add_directory('uploads', app.config['UPLOAD_FOLDER'],
+                      max_age_seconds=app.config['UPLOAD_MAX_AGE_HOURS'] * 3600,
+                      max_total_bytes=int(app.config['UPLOAD_MAX_MB'] * 1024 * 1024),
+                      on_evict=upload_store.remove_stored)
+janitor.add_directory('exports', app.config['EXPORT_FOLDER'],
+                      max_age_seconds=app.config['EXPORT_MAX_AGE_HOURS'] * 3600,
+                      max_total_bytes=int(app.config['EXPORT_MAX_MB'] * 1024 * 1024))
+janitor.add_directory('sessions', app.config['SESSION_FILE_DIR'],
+                      max_age_seconds=app.config['SESSION_MAX_AGE_HOURS'] * 3600,
+                      max_total_bytes=int(app.config['SESSION_MAX_MB'] * 1024 * 1024))
+if profil_cpu.is_enabled():
+    janitor.add_directory('cpu_profiles', profil_cpu.profile_dir(),
+                          max_age_seconds=app.config['CPU_PROFILE_MAX_AGE_HOURS'] * 3600,
+                          max_total_bytes=int(app.config['CPU_PROFILE_MAX_MB'] * 1024 * 1024))
+if app.config['JANITOR_ENABLED']:
+    janitor.start()
+
+archive = (MeasurementArchive(app.config['ARCHIVE_DB_PATH'], retention_months=app.config['ARCHIVE_RETENTION_MONTHS'])
+           if app.config['ARCHIVE_ENABLED'] else None)
+
+# Heavy job limiter: lightweight endpoints never go through it
+admission = AdmissionController(max_concurrent=app.config['HEAVY_MAX_CONCURRENT'],
+                                max_queue=app.config['HEAVY_MAX_QUEUE'],
+                                memory_budget_bytes=int(app.config['HEAVY_MEMORY_BUDGET_MB'] * 1024 * 1024),
+                                queue_timeout=app.config['HEAVY_QUEUE_TIMEOUT'])
+
+# Progress of running uploads / exports, streamed through /progress/<progress_id>
+progress_registry = ProgressRegistry(max_streams=app.config['PROGRESS_MAX_STREAMS'])
+
 # Server-side storage for export data (Railway session fix)
 export_data_store = {}
 
+# Cached aggregate statistics per export_id (invalidated on re-upload)
+statistics_cache = {}
+
+# Cached filter index for /export-analisis per export_id (invalidated on re-upload)
+export_index_cache = {}
+
+# Period key -> measurement positions per export_id, built once (/period-index)
+period_index_cache = {}
+
+# Cached measurement row count per export_id (admission estimate for exports)
+export_rows_cache = {}
+
+# Guards export_data_store: readers use stored_export / export_store_snapshot, never the dict itself
+export_store_lock = threading.Lock()
+
+def stored_export(export_id):
+    """
+    Stored entry {'data', 'upload_timestamp', 'created_at'} for export_id, or None
+    """
+    if not export_id:
+        return None
+    with export_store_lock:
+        return export_data_store.get(export_id)
+
+def export_store_snapshot():
+    """
+    Copy of export_data_store taken under the lock, safe to iterate while uploads evict
+    """
+    with export_store_lock:
+        return dict(export_data_store)
+
+def latest_stored_export():
+    """
+    (export_id, entry) of the most recently stored dataset, or (None, None)
+    """
+    snapshot = export_store_snapshot()
+    if not snapshot:
+        return None, None
+    export_id = max(snapshot, key=lambda k: snapshot[k].get('created_at', ''))
+    return export_id, snapshot[export_id]
+
+def drop_export_data(export_id):
+    """
+    Remove a dataset from export_data_store together with everything cached for it
+    (caller holds export_store_lock)
+    """
+    export_data_store.pop(export_id, None)
+    statistics_cache.pop(export_id, None)
+    export_index_cache.pop(export_id, None)
+    period_index_cache.pop(export_id, None)
+    export_rows_cache.pop(export_id, None)
+
+def store_export_data(data):
+    """
+    Keep a processed dataset in export_data_store; when configured, evicts datasets older than
+    EXPORT_STORE_MAX_AGE_HOURS, then the oldest beyond EXPORT_STORE_MAX_ENTRIES (0: no limit)
+    Returns: the new export_id
+    """
+    export_id = str(uuid.uuid4())
+    now = datetime.now()
+    with export_store_lock:
+        export_data_store[export_id] = {
+            'data': data,
+            'upload_timestamp': now.isoformat(),
+            'created_at': now.isoformat()
+        }
+        max_entries = app.config['EXPORT_STORE_MAX_ENTRIES']
+        max_age_seconds = app.config['EXPORT_STORE_MAX_AGE_HOURS'] * 3600
+        if max_entries <= 0 and max_age_seconds <= 0:
+            return export_id
+        oldest_first = sorted(export_data_store, key=lambda k: export_data_store[k].get('created_at', ''))
+        excess = len(oldest_first) - max_entries if max_entries > 0 else 0
+        for position, key in enumerate(oldest_first):
+            if key == export_id:
+                continue
+            created_at = export_data_store[key].get('created_at')
+            expired = (max_age_seconds > 0 and created_at is not None
+                       and (now - datetime.fromisoformat(created_at)).total_seconds() > max_age_seconds)
+            if expired or position < excess:
+                drop_export_data(key)
+    return export_id
+
+def get_period_index(export_id, data):
+    """
+    Period index of a dataset (periode.build_period_index), built once per export_id
+    """
+    index = period_index_cache.get(export_id) if export_id else None
+    if index is None:
+        index = build_period_index(data.get('children', []))
+        if export_id:
+            period_index_cache[export_id] = index
+    return index
+
+def count_export_rows(export_id, data):
+    """
+    Measurement rows of a dataset, counted once per export_id
+    """
+    rows = export_rows_cache.get(export_id) if export_id else None
+    if rows is None:
+        rows = sum(len(child.get('measurements', [])) for child in data.get('children', []))
+        if export_id:
+            export_rows_cache[export_id] = rows
+    return rows
+
+def get_current_export_data(export_id=None):
+    """
+    Resolve the processed data for the current request (or for an explicit export_id)
+    Returns: (export_id, data, upload_timestamp) - export_id may be None for session-only data
+    """
+    stored = stored_export(export_id)
+    if stored is not None:
+        return export_id, stored['data'], stored['upload_timestamp']
+
+    export_id = session.get('export_id')
+
+    # Priority 1: Use session export_id to get server storage data
+    stored = stored_export(export_id)
+    if stored is not None:
+        return export_id, stored['data'], stored['upload_timestamp']
+    # Priority 2: Use session data directly (compatibility)
+    if 'processed_data' in session:
+        return None, session['processed_data'], session.get('upload_timestamp')
+    # Priority 3: Use most recent server data as last resort
+    latest_export_id, stored = latest_stored_export()
+    if stored is not None:
+        return latest_export_id, stored['data'], stored['upload_timestamp']
+    return None, None, None
+
+def estimate_upload_cost():
+    """
+    Memory estimate for processing an upload, from the request size (body is not read yet)
+    """
+    return int((request.content_length or 0) * app.config['UPLOAD_MEMORY_FACTOR'])
+
+def estimate_export_cost():
+    """
+    Memory estimate for an export, from the number of measurement rows in the current dataset
+    """
+    export_id, data, _ = get_current_export_data()
+    if not data or not isinstance(data, dict):
+        return 0
+    return count_export_rows(export_id, data) * app.config['EXPORT_BYTES_PER_ROW']
+
+def estimate_filtered_export_cost():
+    """
+    Memory estimate for /export-analisis: the selected rows when the request has filters and
+    the dataset's filter index is cached, otherwise all rows (nothing is walked before admission)
+    """
+    export_id, data, _ = get_current_export_data()
+    if not data or not isinstance(data, dict):
+        return 0
+    index = export_index_cache.get(export_id) if export_id else None
+    if index is not None:
+        try:
+            filters = parse_list_filters(request.args)
+            periode_dari, periode_sampai = period_range_params()
+        except ValueError:
+            # Rejected by the view with 400
+            return 0
+        niks = nik_list_param()
+        if filters or periode_dari is not None or periode_sampai is not None or niks:
+            rows = len(select_rows(index, filters, periode_dari, periode_sampai, niks))
+            return rows * app.config['EXPORT_BYTES_PER_ROW']
+    return count_export_rows(export_id, data) * app.config['EXPORT_BYTES_PER_ROW']
+
+def heavy_job(estimate_cost):
+    """
+    Run the view under admission control; returns 503 + Retry-After when the wait queue is full
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                ticket = admission.acquire(estimate_cost())
+            except AdmissionRejected as e:
+                response = jsonify({
+                    'error': 'Server sedang sibuk memproses file lain. Silakan coba lagi nanti.',
+                    'reason': e.reason,
+                    'retry_after': e.retry_after
+                })
+                response.status_code = 503
+                response.headers['Retry-After'] = str(e.retry_after)
+                return response
+            try:
+                return view(*args, **kwargs)
+            finally:
+                admission.release(ticket)
+        return wrapper
+    return decorator
+
+def memory_profiled(label):
+    """
+    Profile the view per pipeline stage when MEMORY_PROFILE is enabled (no-op otherwise)
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            with profile_session(label, {'path': request.full_path, 'content_length': request.content_length}):
+                return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def profile_token():
+    return request.headers.get(profil_cpu.TOKEN_HEADER) or request.args.get(profil_cpu.TOKEN_PARAM)
+
+def cpu_profiled(label):
+    """
+    Run the view under cProfile when CPU profiling is enabled and the request carries the token;
+    the response names the saved profile in X-Profile-Id
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not profil_cpu.token_matches(profile_token()):
+                return view(*args, **kwargs)
+            metadata = {'path': request.path, 'args': {k: v for k, v in request.args.items()
+                                                       if k != profil_cpu.TOKEN_PARAM},
+                        'content_length': request.content_length}
+            with profil_cpu.profile_session(label, metadata) as profile:
+                response = app.make_response(view(*args, **kwargs))
+                if profile is not None:
+                    profile['metadata']['status_code'] = response.status_code
+            response.headers['X-Profile-Id'] = profile['id'] if profile is not None else 'busy'
+            return response
+        return wrapper
+    return decorator
+
+def progress_tracked(label):
+    """
+    Report the view's stages on /progress/<progress_id> when the request carries ?progress_id=
+    (outermost, so the time spent in the admission queue shows as well)
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            tracker = progress_registry.get_or_create(request.args.get('progress_id'))
+            with progress_session(tracker, label):
+                response = app.make_response(view(*args, **kwargs))
+                if tracker is not None and response.status_code >= 400:
+                    error = (response.get_json(silent=True) or {}).get('error')
+                    tracker.finish('error', error or f'HTTP {response.status_code}')
+                return response
+        return wrapper
+    return decorator
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
 @app.route('/upload', methods=['POST'])
+@progress_tracked('upload')
+@heavy_job(estimate_upload_cost)
+@memory_profiled('upload')
+@cpu_profiled('upload')
 def upload_file():
     try:
         if 'file' not in request.files:
@@ -51,13 +430,17 @@ def upload_file():
 
         if file and file.filename.endswith(('.xlsx', '.xls')):
             filename = file.filename
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(filepath)
+            with stage('upload_save'):
+                file_hash, filepath, is_duplicate = upload_store.save(file)
 
             # Validate template compliance first
-            is_valid, validation_result = validate_template_compliance(filepath)
+            with stage('validation'):
+                is_valid, validation_result = validate_template_compliance(filepath)
 
             if not is_valid:
+                upload_store.update_metadata(file_hash,
+                                             format_detected=validation_result.get('format_detected'),
+                                             total_children=0)
                 # Template validation failed - return detailed error
                 return jsonify({
                     'success': False,
@@ -68,60 +451,505 @@ def upload_file():
                 }), 400
 
             # Process Excel file to JSON
-            result = process_excel_to_json(filepath)
+            result = process_excel_to_json(filepath, max_workers=app.config['INGEST_WORKERS'])
+
+            # Files are stored by content hash, report the original name
+            result['file_name'] = filename
+            result['file_hash'] = file_hash
+            input_metadata = {
+                'file_name': filename,
+                'file_hash': file_hash,
+                'format_type': result.get('format_type'),
+                'sheets': len(result.get('sheets', [])),
+                'total_periods': result.get('total_periods', 0),
+                'total_children': result.get('total_children', 0),
+                'total_measurements': sum(len(c.get('measurements', [])) for c in result.get('children', []))
+            }
+            annotate(**input_metadata)
+            profil_cpu.annotate(**input_metadata)
 
             # Add validation information to the result
             result['validation'] = validation_result
 
+            upload_store.update_metadata(file_hash,
+                                         format_detected=result.get('format_type', validation_result.get('format_detected')),
+                                         total_children=result.get('total_children', 0))
+
+            # Archive for longitudinal queries; a failing archive never fails the upload
+            if archive is not None:
+                with stage('archive'):
+                    try:
+                        result['archive'] = archive.store(result, file_hash, filename)
+                    except sqlite3.Error as e:
+                        print(f"Error archiving upload: {str(e)}")
+
             # Store processed data in session and server storage for export functionality
             session['processed_data'] = result
             session['upload_timestamp'] = datetime.now().isoformat()
 
+            # Re-upload replaces the previous dataset, drop its cached statistics
+            previous_export_id = session.get('export_id')
+            if previous_export_id:
+                statistics_cache.pop(previous_export_id, None)
+                export_index_cache.pop(previous_export_id, None)
+                period_index_cache.pop(previous_export_id, None)
+                export_rows_cache.pop(previous_export_id, None)
+            # Kept so the new upload can be compared with the previous one (/diff)
+            if stored_export(previous_export_id) is not None:
+                session['previous_export_id'] = previous_export_id
+            else:
+                previous_export_id = None
+                session.pop('previous_export_id', None)
+
             # Also store in server-side storage for Railway compatibility
-            export_id = str(uuid.uuid4())
-            export_data_store[export_id] = {
-                'data': result,
-                'upload_timestamp': datetime.now().isoformat(),
-                'created_at': datetime.now().isoformat()
-            }
+            export_id = store_export_data(result)
             session['export_id'] = export_id
 
             # Add export_id to result for frontend
             result['export_id'] = export_id
+            result['previous_export_id'] = previous_export_id
+
+            # The web UI pages children through /children, so it can skip the full list here
+            response_data = result
+            if request.args.get('include_children', '1').lower() in ('0', 'false', 'no'):
+                response_data = {k: v for k, v in result.items() if k != 'children'}
+                # Data quality issues are paged through /data-quality as well, send the summary only
+                if 'data_quality' in result:
+                    response_data['data_quality'] = {'summary': result['data_quality']['summary']}
 
             # Build appropriate message based on validation results
             message = 'File uploaded and processed successfully'
             if validation_result.get('warnings'):
                 message += f' (dengan {len(validation_result["warnings"])} peringatan)'
+            if result.get('coercion_errors'):
+                message += f' ({len(result["coercion_errors"])} baris berisi sel yang tidak terbaca)'
+            quality_summary = result.get('data_quality', {}).get('summary')
+            if quality_summary and quality_summary['rows_with_issues']:
+                message += f' ({quality_summary["rows_with_issues"]} baris dengan masalah kualitas data)'
 
-            return jsonify({
-                'success': True,
-                'message': message,
-                'data': result,
-                'has_export_data': True,
-                'export_id': export_id  # Send export_id to frontend
-            })
+            with stage('json_serialization'):
+                return jsonify({
+                    'success': True,
+                    'message': message,
+                    'data': response_data,
+                    'has_export_data': True,
+                    'export_id': export_id  # Send export_id to frontend
+                })
         else:
             return jsonify({'error': 'Please upload an Excel file (.xlsx or .xls)'}), 400
 
     except Exception as e:
         return jsonify({'error': f'An error occurred: {str(e)}'}), 500
 
+def child_list_item(index, child):
+    """
+    Lightweight child record for list views, from the stored summary (no measurements)
+    """
+    summary = summarize_child(child)
+    return {
+        'index': index,
+        'no': child.get('no'),
+        'tempat': child.get('tempat'),
+        'sheet': child.get('sheet'),
+        'row': child.get('row'),
+        'nik': child.get('nik'),
+        'nama_anak': child.get('nama_anak'),
+        'tanggal_lahir': child.get('tanggal_lahir'),
+        'jenis_kelamin': child.get('jenis_kelamin'),
+        'total_measurements': summary['total_measurements'],
+        'complete_measurements': summary['complete_measurements'],
+        'incomplete_measurements': summary['incomplete_measurements'],
+        'latest': summary['latest'],
+        'worst_status_bb': summary['worst_status_bb'],
+        'worst_status_tb': summary['worst_status_tb'],
+        'has_danger': summary['has_danger']
+    }
+
+@app.route('/children')
+def list_children():
+    """
+    Paginated children list with server-side search (nama, NIK, tempat)
+    Query: offset, limit (max 500), q, export_id
+    """
+    try:
+        export_id, data, upload_time = get_current_export_data(request.args.get('export_id'))
+        if not data or not isinstance(data, dict) or 'children' not in data:
+            return jsonify({'error': 'Tidak ada data. Silakan upload file terlebih dahulu.'}), 400
+
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        limit = min(max(request.args.get('limit', 100, type=int), 1), 500)
+        query = request.args.get('q', '').strip().lower()
+
+        children = data['children']
+        if query:
+            matched = [
+                index for index, child in enumerate(children)
+                if query in (child.get('nama_anak') or '').lower()
+                or query in (child.get('nik') or '').lower()
+                or query in (child.get('tempat') or '').lower()
+            ]
+        else:
+            matched = range(len(children))
+
+        page = [child_list_item(index, children[index]) for index in matched[offset:offset + limit]]
+
+        return jsonify({
+            'export_id': export_id,
+            'total': len(matched),
+            'offset': offset,
+            'limit': limit,
+            'query': query,
+            'children': page
+        })
+
+    except Exception as e:
+        return jsonify({'error': f'An error occurred: {str(e)}'}), 500
+
+@app.route('/data-quality')
+def data_quality():
+    """
+    Paginated data quality issues of the current dataset, one entry per row
+    Query: offset, limit (max 500), severity (error / warning), code, export_id
+    """
+    try:
+        export_id, data, upload_time = get_current_export_data(request.args.get('export_id'))
+        if not data or not isinstance(data, dict) or 'children' not in data:
+            return jsonify({'error': 'Tidak ada data. Silakan upload file terlebih dahulu.'}), 400
+        if 'data_quality' not in data:
+            return jsonify({'error': 'Laporan kualitas data tidak tersedia untuk data ini'}), 404
+
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        limit = min(max(request.args.get('limit', 100, type=int), 1), 500)
+        severity = request.args.get('severity', '').strip().lower() or None
+        code = request.args.get('code', '').strip().upper() or None
+
+        report = data['data_quality']
+        matched = filter_issues(report['issues'], severity, code)
+
+        return jsonify({
+            'export_id': export_id,
+            'summary': report['summary'],
+            'issue_types': {key: {'severity': value[0], 'message': value[1]} for key, value in ISSUE_TYPES.items()},
+            'total': len(matched),
+            'offset': offset,
+            'limit': limit,
+            'severity': severity,
+            'code': code,
+            'rows': describe_issues(matched[offset:offset + limit])
+        })
+
+    except Exception as e:
+        return jsonify({'error': f'An error occurred: {str(e)}'}), 500
+
+def stored_upload_info(export_id, stored):
+    """
+    File name and upload time of a stored dataset (export_id, entry), for labelling comparisons
+    """
+    return {
+        'export_id': export_id,
+        'file_name': stored['data'].get('file_name'),
+        'upload_timestamp': stored['upload_timestamp'],
+        'total_children': stored['data'].get('total_children')
+    }
+
+def resolve_diff_pair():
+    """
+    Stored datasets to compare in /diff: base defaults to the upload before the current one in this session
+    Returns: ((base_id, base_entry), (current_id, current_entry), error_response)
+    """
+    current_id, _, _ = get_current_export_data(request.args.get('export_id'))
+    base_id = request.args.get('base') or session.get('previous_export_id')
+    current = stored_export(current_id)
+    if current is None:
+        return None, None, (jsonify({'error': 'Tidak ada data. Silakan upload file terlebih dahulu.'}), 400)
+    base = stored_export(base_id) if base_id != current_id else None
+    if base is None:
+        available = sorted((stored_upload_info(key, stored) for key, stored in export_store_snapshot().items()
+                            if key != current_id),
+                           key=lambda info: info['upload_timestamp'] or '', reverse=True)
+        return None, None, (jsonify({'error': 'Pilih upload pembanding (base) yang masih tersimpan',
+                                     'available': available}), 400)
+    return (base_id, base), (current_id, current), None
+
+@app.route('/diff')
+def diff_uploads():
+    """
+    Changes between two uploads: added/removed children, changed measurements, status transitions
+    Query: base (default: previous upload in this session), export_id (default: current), limit per list (max 5000)
+    """
+    try:
+        base, current, error = resolve_diff_pair()
+        if error:
+            return error
+        limit = min(max(request.args.get('limit', 500, type=int), 0), 5000)
+
+        diff = diff_results(base[1]['data'], current[1]['data'])
+        response = {key: value[:limit] if isinstance(value, list) else value for key, value in diff.items()}
+        response.update(base=stored_upload_info(*base), current=stored_upload_info(*current), limit=limit)
+        return jsonify(response)
+
+    except Exception as e:
+        return jsonify({'error': f'An error occurred: {str(e)}'}), 500
+
+@app.route('/diff/export')
+@heavy_job(estimate_export_cost)
+def export_diff():
+    """
+    Download the comparison of two uploads as an Excel workbook
+    """
+    try:
+        base, current, error = resolve_diff_pair()
+        if error:
+            return error
+
+        base_info, current_info = stored_upload_info(*base), stored_upload_info(*current)
+        diff = diff_results(base[1]['data'], current[1]['data'])
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"Perbandingan_Upload_{timestamp}.xlsx"
+        output_path = os.path.join(app.config['EXPORT_FOLDER'], filename)
+        with stage('export'):
+            success, result = export_diff_to_excel(
+                diff, output_path,
+                base_label=f"{base_info['file_name']} ({base_info['upload_timestamp']})",
+                current_label=f"{current_info['file_name']} ({current_info['upload_timestamp']})")
+
+        if success:
+            return send_file(result,
+                           as_attachment=True,
+                           download_name=filename,
+                           mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+        else:
+            return jsonify({'error': f'Gagal membuat file export: {result}'}), 500
+
+    except Exception as e:
+        return jsonify({'error': f'Error during export: {str(e)}'}), 500
+
+@app.route('/children/<int:child_index>/measurements')
+def child_measurements(child_index):
+    """
+    Measurements of one child, fetched on demand when a card is expanded
+    """
+    try:
+        export_id, data, upload_time = get_current_export_data(request.args.get('export_id'))
+        if not data or not isinstance(data, dict) or 'children' not in data:
+            return jsonify({'error': 'Tidak ada data. Silakan upload file terlebih dahulu.'}), 400
+
+        if child_index < 0 or child_index >= len(data['children']):
+            return jsonify({'error': 'Data anak tidak ditemukan'}), 404
+
+        return jsonify({
+            'index': child_index,
+            'measurements': data['children'][child_index].get('measurements', [])
+        })
+
+    except Exception as e:
+        return jsonify({'error': f'An error occurred: {str(e)}'}), 500
+
+@app.route('/period-index')
+def period_index():
+    """
+    Positions [child offset, measurement offset] per period key, built once per dataset
+    Query: periode (only that period, a dict lookup), export_id
+    """
+    try:
+        export_id, data, upload_time = get_current_export_data(request.args.get('export_id'))
+        if not data or not isinstance(data, dict) or 'children' not in data:
+            return jsonify({'error': 'Tidak ada data. Silakan upload file terlebih dahulu.'}), 400
+        try:
+            periode = period_param('periode')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        index = get_period_index(export_id, data)
+        if periode is not None:
+            index = {str(periode): index.get(str(periode), [])}
+        return jsonify({'export_id': export_id, 'period_index': index})
+
+    except Exception as e:
+        return jsonify({'error': f'An error occurred: {str(e)}'}), 500
+
 @app.route('/files')
 def list_files():
+    """
+    Uploaded files from the upload index (newest first), paginated with page & per_page
+    """
     try:
-        files = []
-        for filename in os.listdir(app.config['UPLOAD_FOLDER']):
-            if filename.endswith(('.xlsx', '.xls')):
-                file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                files.append({
-                    'name': filename,
-                    'size': os.path.getsize(file_path)
-                })
-        return jsonify({'files': files})
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 50, type=int), 1), 500)
+        files, total = upload_store.list_files(page, per_page)
+        return jsonify({
+            'files': files,
+            'total': total,
+            'page': page,
+            'per_page': per_page
+        })
+    except Exception as e:
+        return jsonify({'error': f'An error occurred: {str(e)}'}), 500
+
+@app.route('/janitor-stats')
+def janitor_stats():
+    """
+    Janitor status: per-directory usage, limits and reclaimed space
+    """
+    return jsonify(janitor.get_stats())
+
+@app.route('/admission-stats')
+def admission_stats():
+    """
+    Heavy job limiter status: active jobs, queue length, rejections
+    """
+    return jsonify(admission.get_stats())
+
+def period_param(name):
+    """
+    Period query parameter as YYYYMM: accepts 202501, 2025-01, 01/2025 or JANUARI 2025
+    """
+    value = request.args.get(name, '').strip()
+    if not value:
+        return None
+    if value.isdigit() and len(value) == 6:
+        return int(value)
+    period_key = parse_period_key(value)
+    if period_key is None:
+        raise ValueError(f"Periode '{value}' tidak dikenali")
+    return period_key
+
+def period_range_params():
+    """
+    (periode_dari, periode_sampai) from the query, narrowed to a whole year by tahun
+    Raises ValueError for an unrecognized period
+    """
+    periode_dari = period_param('periode_dari')
+    periode_sampai = period_param('periode_sampai')
+    tahun = request.args.get('tahun', type=int)
+    if tahun:
+        periode_dari = max(periode_dari or 0, make_period_key(tahun, 1))
+        periode_sampai = min(periode_sampai or make_period_key(tahun, 12), make_period_key(tahun, 12))
+    return periode_dari, periode_sampai
+
+def nik_list_param():
+    return [nik for nik in request.args.get('nik', '').split(',') if nik.strip()]
+
+@app.route('/archive/cohort')
+def archive_cohort():
+    """
+    Archived measurements across all uploads matching a cohort
+    Query: tempat, status_bb, status_tb, status_tb_rasional, status_pertumbuhan, tahun,
+    periode_dari, periode_sampai, nik (comma separated), offset, limit (max 1000)
+    """
+    if archive is None:
+        return jsonify({'error': 'Arsip tidak aktif (aktifkan dengan ARCHIVE_ENABLED=1)'}), 404
+    try:
+        filters = {field: request.args[field].strip() for field in COHORT_FILTERS if request.args.get(field, '').strip()}
+        for field in ('status_bb', 'status_tb', 'status_tb_rasional', 'status_pertumbuhan'):
+            if field in filters:
+                filters[field] = filters[field].upper()
+        try:
+            periode_dari, periode_sampai = period_range_params()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        niks = nik_list_param()
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        limit = min(max(request.args.get('limit', 100, type=int), 1), 1000)
+
+        result = archive.cohort(filters, periode_dari, periode_sampai, niks, limit, offset)
+        return jsonify(dict(result, filters=filters, periode_dari=periode_dari, periode_sampai=periode_sampai,
+                            offset=offset, limit=limit))
+    except Exception as e:
+        return jsonify({'error': f'An error occurred: {str(e)}'}), 500
+
+@app.route('/archive/children/<nik>')
+def archive_child(nik):
+    """
+    One child's archived history across uploads
+    """
+    if archive is None:
+        return jsonify({'error': 'Arsip tidak aktif (aktifkan dengan ARCHIVE_ENABLED=1)'}), 404
+    try:
+        child = archive.child_history(nik)
+        if child is None:
+            return jsonify({'error': 'Data anak tidak ditemukan di arsip'}), 404
+        return jsonify(child)
     except Exception as e:
         return jsonify({'error': f'An error occurred: {str(e)}'}), 500
 
+@app.route('/archive-stats')
+def archive_stats():
+    """
+    Archive size: uploads, children, measurements and period range
+    """
+    if archive is None:
+        return jsonify({'enabled': False})
+    return jsonify(dict(archive.stats(), enabled=True))
+
+@app.route('/progress/<progress_id>')
+def progress_events(progress_id):
+    """
+    Server-Sent Events with the progress of the upload / export started with ?progress_id=
+    (stage, done / total rows, elapsed seconds); may be opened before the job starts
+    At most PROGRESS_MAX_STREAMS streams are open at once (503 above; poll /progress/<id>/status)
+    """
+    if not is_valid_progress_id(progress_id):
+        return jsonify({'error': 'progress_id tidak valid (8-64 karakter huruf, angka, - atau _)'}), 400
+    if not progress_registry.acquire_stream():
+        return jsonify({'error': 'Terlalu banyak progress yang sedang dipantau. Silakan coba lagi nanti.'}), 503
+    tracker = progress_registry.get_or_create(progress_id)
+    if tracker is None:
+        progress_registry.release_stream()
+        return jsonify({'error': 'Terlalu banyak progress yang sedang dipantau. Silakan coba lagi nanti.'}), 503
+    response = Response(event_stream(tracker, start_timeout=app.config['PROGRESS_START_TIMEOUT']),
+                        mimetype='text/event-stream', headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    response.call_on_close(progress_registry.release_stream)
+    return response
+
+@app.route('/progress/<progress_id>/status')
+def progress_status(progress_id):
+    """
+    Current progress snapshot as JSON (short polling, holds no thread); 404 until a job or stream uses the id
+    """
+    tracker = progress_registry.get(progress_id) if is_valid_progress_id(progress_id) else None
+    if tracker is None:
+        return jsonify({'error': 'Progress tidak ditemukan'}), 404
+    return jsonify(tracker.snapshot())
+
+def profile_admin_error():
+    """
+    404 while CPU profiling is disabled, 403 without the profile token; None when allowed
+    """
+    if not profil_cpu.is_enabled():
+        return jsonify({'error': 'CPU profiling tidak aktif (CPU_PROFILE, CPU_PROFILE_TOKEN)'}), 404
+    if not profil_cpu.token_matches(profile_token()):
+        return jsonify({'error': 'Token profil tidak valid'}), 403
+    return None
+
+@app.route('/admin/profiles')
+def list_cpu_profiles():
+    """
+    Saved CPU profiles (newest first) with their input metadata and stage timings
+    """
+    error = profile_admin_error()
+    if error is not None:
+        return error
+    profiles = profil_cpu.list_profiles()
+    return jsonify({'directory': profil_cpu.profile_dir(), 'total': len(profiles), 'profiles': profiles})
+
+@app.route('/admin/profiles/<profile_id>')
+def download_cpu_profile(profile_id):
+    """
+    Download one saved profile: ?format=prof (pstats, default), txt (top functions) or json (metadata)
+    """
+    error = profile_admin_error()
+    if error is not None:
+        return error
+    ext = request.args.get('format', 'prof')
+    path = profil_cpu.profile_path(profile_id, ext)
+    if path is None:
+        return jsonify({'error': 'Profil tidak ditemukan'}), 404
+    mimetypes = {'prof': 'application/octet-stream', 'txt': 'text/plain', 'json': 'application/json'}
+    return send_file(os.path.abspath(path), as_attachment=True, download_name=os.path.basename(path),
+                     mimetype=mimetypes[ext])
+
 @app.route('/health')
 def health():
     """Health check endpoint for monitoring"""
@@ -149,9 +977,15 @@ def download_template():
         return jsonify({'error': f'Error downloading template: {str(e)}'}), 500
 
 @app.route('/export-analisis')
+@progress_tracked('export')
+@heavy_job(estimate_filtered_export_cost)
+@memory_profiled('export')
+@cpu_profiled('export')
 def export_analisis():
     """
     Export analisis data pertumbuhan anak ke Excel dengan format analisis
+    Filter opsional: validasi, status_bb, status_tb, tempat (dipisah koma), tahun,
+    periode_dari, periode_sampai, nik (dipisah koma)
     """
     try:
         # Try to get export_id from session first (priority)
@@ -160,17 +994,19 @@ def export_analisis():
         # Get processed data with proper priority
         processed_data = None
 
+        stored = stored_export(export_id)
+        latest_export_id, latest = latest_stored_export() if stored is None else (None, None)
+
         # Priority 1: Use session export_id to get server storage data
-        if export_id and export_id in export_data_store:
-            processed_data = export_data_store[export_id]['data']
+        if stored is not None:
+            processed_data = stored['data']
         # Priority 2: Use session data directly (compatibility)
         elif 'processed_data' in session:
             processed_data = session['processed_data']
         # Priority 3: Only use most recent server data as last resort
-        elif export_data_store:
-            export_id = max(export_data_store.keys(),
-                       key=lambda k: export_data_store[k].get('created_at', ''))
-            processed_data = export_data_store[export_id]['data']
+        elif latest is not None:
+            export_id = latest_export_id
+            processed_data = latest['data']
         else:
             return jsonify({'error': 'Tidak ada data untuk di-export. Silakan upload file terlebih dahulu.'}), 400
 
@@ -182,19 +1018,100 @@ def export_analisis():
         if 'children' not in processed_data or not processed_data['children']:
             return jsonify({'error': 'Tidak ada data anak untuk di-export.'}), 400
 
+        # Optional row filters, applied before anything is written
+        try:
+            filters = parse_list_filters(request.args)
+            periode_dari, periode_sampai = period_range_params()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        niks = nik_list_param()
+        selection = None
+        if filters or periode_dari is not None or periode_sampai is not None or niks:
+            with stage('export_filter'):
+                index = export_index_cache.get(export_id) if export_id else None
+                if index is None:
+                    index = build_export_index(processed_data)
+                    if export_id:
+                        export_index_cache[export_id] = index
+                selection = select_rows(index, filters, periode_dari, periode_sampai, niks)
+            if not selection:
+                return jsonify({'error': 'Tidak ada baris yang cocok dengan filter.'}), 400
+
         # Generate filename with timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"Analisis_Pertumbuhan_Anak_{timestamp}.xlsx"
+        suffix = '_Filter' if selection is not None else ''
+        filename = f"Analisis_Pertumbuhan_Anak_{timestamp}{suffix}.xlsx"
+
+        # Export backend: 'openpyxl' (default) or 'xlsxwriter' (fast, with summary sheets)
+        backend = request.args.get('backend', 'openpyxl')
+        conditional_formatting = request.args.get('conditional_formatting', '').lower() in ('1', 'true', 'yes')
 
         # Export to Excel using the export function
-        success, result = export_analisis_from_json(processed_data, filename)
+        input_metadata = {
+            'backend': backend,
+            'conditional_formatting': conditional_formatting,
+            'format_type': processed_data.get('format_type'),
+            'total_periods': processed_data.get('total_periods', 0),
+            'total_children': len(processed_data['children']),
+            'filtered_rows': len(selection) if selection is not None else None
+        }
+        annotate(**input_metadata)
+        profil_cpu.annotate(total_measurements=count_export_rows(export_id, processed_data),
+                            **input_metadata)
+        with stage('export'):
+            success, result = export_analisis_from_json(processed_data, filename, backend=backend,
+                                                        conditional_formatting=conditional_formatting,
+                                                        selection=selection,
+                                                        output_dir=app.config['EXPORT_FOLDER'])
 
         if success:
             # Return the generated file for download
+            response = send_file(result,
+                                 as_attachment=True,
+                                 download_name=filename,
+                                 mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+            if selection is not None:
+                response.headers['X-Export-Rows'] = str(len(selection))
+            return response
+        else:
+            return jsonify({'error': f'Gagal membuat file export: {result}'}), 500
+
+    except Exception as e:
+        return jsonify({'error': f'Error during export: {str(e)}'}), 500
+
+@app.route('/export-analisis-per-tempat')
+@heavy_job(estimate_export_cost)
+@memory_profiled('export_per_tempat')
+def export_analisis_per_tempat():
+    """
+    Export analisis satu workbook per tempat (posyandu), dibuat paralel dan dikirim sebagai zip
+    """
+    try:
+        export_id, processed_data, upload_time = get_current_export_data()
+
+        if not processed_data or not isinstance(processed_data, dict):
+            return jsonify({'error': 'Tidak ada data untuk di-export. Silakan upload file terlebih dahulu.'}), 400
+
+        if 'children' not in processed_data or not processed_data['children']:
+            return jsonify({'error': 'Tidak ada data anak untuk di-export.'}), 400
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"Analisis_Pertumbuhan_Anak_Per_Tempat_{timestamp}.zip"
+
+        backend = request.args.get('backend', 'openpyxl')
+        conditional_formatting = request.args.get('conditional_formatting', '').lower() in ('1', 'true', 'yes')
+
+        with stage('export'):
+            success, result = export_analisis_per_tempat_zip(processed_data, filename, backend=backend,
+                                                             conditional_formatting=conditional_formatting,
+                                                             max_workers=app.config['EXPORT_WORKERS'],
+                                                             output_dir=app.config['EXPORT_FOLDER'])
+
+        if success:
             return send_file(result,
                            as_attachment=True,
                            download_name=filename,
-                           mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+                           mimetype='application/zip')
         else:
             return jsonify({'error': f'Gagal membuat file export: {result}'}), 500
 
@@ -212,29 +1129,35 @@ def check_export_data():
         upload_time = None
         data = None
 
+        stored = stored_export(export_id)
+
         # Priority 1: Use session export_id to get server storage data
-        if export_id and export_id in export_data_store:
-            data = export_data_store[export_id]['data']
-            upload_time = export_data_store[export_id]['upload_timestamp']
+        if stored is not None:
+            data = stored['data']
+            upload_time = stored['upload_timestamp']
         # Priority 2: Use session data directly
         elif 'processed_data' in session:
             data = session['processed_data']
             upload_time = session.get('upload_timestamp')
         # Priority 3: Use most recent server data as last resort
-        elif export_data_store:
-            latest_export_id = max(export_data_store.keys(),
-                                 key=lambda k: export_data_store[k].get('created_at', ''))
-            if latest_export_id in export_data_store:
-                data = export_data_store[latest_export_id]['data']
-                upload_time = export_data_store[latest_export_id]['upload_timestamp']
+        else:
+            _, latest = latest_stored_export()
+            if latest is not None:
+                data = latest['data']
+                upload_time = latest['upload_timestamp']
 
         # Extract stats if we have data
         if data and isinstance(data, dict) and 'children' in data and data['children']:
+            # Overview counts from the per-child summaries, O(children)
+            summaries = [summarize_child(child) for child in data['children']]
             stats = {
                 'total_children': data.get('total_children', len(data['children'])),
                 'total_periods': data.get('total_periods', 0),
                 'file_name': data.get('file_name', 'Unknown'),
-                'format_type': data.get('format_type', 'Unknown')
+                'format_type': data.get('format_type', 'Unknown'),
+                'total_measurements': sum(summary['total_measurements'] for summary in summaries),
+                'complete_measurements': sum(summary['complete_measurements'] for summary in summaries),
+                'children_with_danger': sum(1 for summary in summaries if summary['has_danger'])
             }
 
         return jsonify({
@@ -248,6 +1171,36 @@ def check_export_data():
     except Exception as e:
         return jsonify({'error': f'Error checking export data: {str(e)}'}), 500
 
+@app.route('/statistik-posyandu')
+def statistik_posyandu():
+    """
+    Statistik agregat per tempat (posyandu) dan per periode untuk dataset aktif
+    """
+    try:
+        export_id, data, upload_time = get_current_export_data()
+
+        if not data or not isinstance(data, dict) or not data.get('children'):
+            return jsonify({'error': 'Tidak ada data. Silakan upload file terlebih dahulu.'}), 400
+
+        cached = export_id is not None and export_id in statistics_cache
+        if cached:
+            statistics = statistics_cache[export_id]
+        else:
+            statistics = compute_aggregate_statistics(data)
+            if export_id is not None:
+                statistics_cache[export_id] = statistics
+
+        return jsonify({
+            'export_id': export_id,
+            'file_name': data.get('file_name', 'Unknown'),
+            'upload_timestamp': upload_time,
+            'cached': cached,
+            'statistics': statistics
+        })
+
+    except Exception as e:
+        return jsonify({'error': f'Error computing statistics: {str(e)}'}), 500
+
 @app.route('/debug-session')
 def debug_session():
     """
@@ -276,14 +1229,15 @@ def debug_session():
             }
 
         # Check server storage
+        snapshot = export_store_snapshot()
         session_info['debug_info']['server_storage'] = {
-            'total_stored_exports': len(export_data_store),
-            'storage_keys': list(export_data_store.keys()),
+            'total_stored_exports': len(snapshot),
+            'storage_keys': list(snapshot.keys()),
             'storage_details': {}
         }
 
-        if export_data_store:
-            for export_id, storage_data in export_data_store.items():
+        if snapshot:
+            for export_id, storage_data in snapshot.items():
                 session_info['debug_info']['server_storage']['storage_details'][export_id] = {
                     'created_at': storage_data.get('created_at'),
                     'has_children': isinstance(storage_data.get('data', {}), dict) and 'children' in storage_data.get('data', {}),
@@ -366,12 +1320,7 @@ def debug_create_test_data():
         session['upload_timestamp'] = datetime.now().isoformat()
 
         # Also store in server-side storage for testing
-        export_id = str(uuid.uuid4())
-        export_data_store[export_id] = {
-            'data': test_data,
-            'upload_timestamp': datetime.now().isoformat(),
-            'created_at': datetime.now().isoformat()
-        }
+        export_id = store_export_data(test_data)
         session['export_id'] = export_id
 
         return jsonify({
@@ -0,0 +1,263 @@
+"""
+Longitudinal SQLite archive of processed uploads, so measurements can be queried
+across uploads, months and posyandu.
+
+Children are keyed by normalized NIK, measurements by (NIK, periode_key); a re-upload
+of the same child and period replaces the earlier values. Children without a usable
+NIK or measurements without a period key are not archived (counted in the upload row).
+
+The archive holds personal data, so it can keep a limited window: with retention_months,
+every store drops measurements of periods older than that, then children and upload rows
+left without measurements.
+"""
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import date, datetime
+
+from nik import normalize_nik
+from periode import make_period_key
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS uploads (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    file_hash TEXT,
+    file_name TEXT,
+    format_type TEXT,
+    archived_at TEXT NOT NULL,
+    total_children INTEGER NOT NULL,
+    total_measurements INTEGER NOT NULL,
+    skipped_children INTEGER NOT NULL,
+    skipped_measurements INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS children (
+    nik TEXT PRIMARY KEY,
+    nama_anak TEXT,
+    tanggal_lahir TEXT,
+    jenis_kelamin TEXT,
+    tempat TEXT,
+    first_upload_id INTEGER NOT NULL,
+    last_upload_id INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS measurements (
+    nik TEXT NOT NULL,
+    periode_key INTEGER NOT NULL,
+    periode TEXT,
+    tempat TEXT,
+    tgl_ukur TEXT,
+    umur_bulan INTEGER,
+    umur_bulan_hitung INTEGER,
+    berat_kg REAL,
+    tinggi_cm REAL,
+    cara_ukur TEXT,
+    status_bb TEXT,
+    status_tb TEXT,
+    status_tb_rasional TEXT,
+    status_pertumbuhan TEXT,
+    upload_id INTEGER NOT NULL,
+    PRIMARY KEY (nik, periode_key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_children_tempat ON children (tempat);
+-- Period first, covering the status / tempat filters for queries over all posyandu
+CREATE INDEX IF NOT EXISTS idx_measurements_periode ON measurements (periode_key, status_bb, status_tb, tempat);
+CREATE INDEX IF NOT EXISTS idx_measurements_tempat_periode ON measurements (tempat, periode_key);
+CREATE INDEX IF NOT EXISTS idx_measurements_tempat_status_bb ON measurements (tempat, status_bb, periode_key);
+CREATE INDEX IF NOT EXISTS idx_measurements_tempat_status_tb ON measurements (tempat, status_tb, periode_key);
+"""
+
+MEASUREMENT_COLUMNS = ('nik', 'periode_key', 'periode', 'tempat', 'tgl_ukur', 'umur_bulan', 'umur_bulan_hitung',
+                       'berat_kg', 'tinggi_cm', 'cara_ukur', 'status_bb', 'status_tb', 'status_tb_rasional',
+                       'status_pertumbuhan', 'upload_id')
+
+# Cohort filters: query parameter -> column (all compared by equality)
+COHORT_FILTERS = ('tempat', 'status_bb', 'status_tb', 'status_tb_rasional', 'status_pertumbuhan')
+
+# Page cache per connection (KiB)
+CACHE_SIZE_KB = 64 * 1024
+
+class MeasurementArchive:
+    """
+    SQLite archive (WAL mode). Every call opens its own connection, so one instance can be
+    shared between threads; writes are serialized in-process and by SQLite across processes.
+    """
+
+    def __init__(self, path, timeout=30.0, retention_months=None):
+        self.path = path
+        self.timeout = timeout
+        self.retention_months = retention_months or None
+        self._write_lock = threading.Lock()
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+        if self.retention_months is not None:
+            with self._write_lock, closing(self._connect()) as conn:
+                with conn:
+                    self._prune(conn)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.timeout)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA synchronous=NORMAL')
+        # Bulk inserts touch every index at random positions, keep more pages cached
+        conn.execute(f'PRAGMA cache_size={-CACHE_SIZE_KB}')
+        return conn
+
+    def store(self, result, file_hash=None, file_name=None):
+        """
+        Bulk insert one processed result (process_excel_to_json shape) in a single transaction
+        Returns: summary dict (upload_id, archived and skipped counts, seconds)
+        """
+        start = datetime.now()
+        children = []
+        measurements = []
+        skipped_children = 0
+        skipped_measurements = 0
+        for child in result.get('children', []):
+            nik = normalize_nik(child.get('nik'))
+            if nik is None:
+                skipped_children += 1
+                continue
+            tempat = child.get('tempat')
+            children.append((nik, child.get('nama_anak'), child.get('tanggal_lahir'), child.get('jenis_kelamin'), tempat))
+            for m in child.get('measurements', []):
+                periode_key = m.get('periode_key')
+                if periode_key is None:
+                    skipped_measurements += 1
+                    continue
+                measurements.append([nik, periode_key, m.get('periode'), tempat, m.get('tgl_ukur'), m.get('umur_bulan'),
+                                     m.get('umur_bulan_hitung'), m.get('berat_kg'), m.get('tinggi_cm'),
+                                     m.get('cara_ukur'), m.get('status_bb'), m.get('status_tb'),
+                                     m.get('status_tb_rasional'), m.get('status_pertumbuhan')])
+
+        with self._write_lock, closing(self._connect()) as conn:
+            with conn:
+                cursor = conn.execute(
+                    'INSERT INTO uploads (file_hash, file_name, format_type, archived_at, total_children, '
+                    'total_measurements, skipped_children, skipped_measurements) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    (file_hash, file_name or result.get('file_name'), result.get('format_type'), start.isoformat(),
+                     len(children), len(measurements), skipped_children, skipped_measurements))
+                upload_id = cursor.lastrowid
+                conn.executemany(
+                    'INSERT INTO children (nik, nama_anak, tanggal_lahir, jenis_kelamin, tempat, first_upload_id, '
+                    'last_upload_id) VALUES (?, ?, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT (nik) DO UPDATE SET nama_anak = excluded.nama_anak, '
+                    'tanggal_lahir = excluded.tanggal_lahir, jenis_kelamin = excluded.jenis_kelamin, '
+                    'tempat = excluded.tempat, last_upload_id = excluded.last_upload_id',
+                    (row + (upload_id, upload_id) for row in children))
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO measurements ({', '.join(MEASUREMENT_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(MEASUREMENT_COLUMNS))})",
+                    (row + [upload_id] for row in measurements))
+                pruned = self._prune(conn)
+
+        return {
+            'upload_id': upload_id,
+            'children': len(children),
+            'measurements': len(measurements),
+            'skipped_children': skipped_children,
+            'skipped_measurements': skipped_measurements,
+            'pruned_measurements': pruned,
+            'seconds': round((datetime.now() - start).total_seconds(), 3)
+        }
+
+    def retention_cutoff(self, today=None):
+        """
+        Oldest periode_key kept under retention_months (None: everything is kept)
+        """
+        if self.retention_months is None:
+            return None
+        today = today or date.today()
+        months = today.year * 12 + today.month - 1 - self.retention_months
+        return make_period_key(months // 12, months % 12 + 1)
+
+    def _prune(self, conn):
+        """
+        Delete measurements before the retention cutoff, then orphaned children and uploads
+        (inside the caller's transaction); returns the number of measurements deleted
+        """
+        cutoff = self.retention_cutoff()
+        if cutoff is None:
+            return 0
+        deleted = conn.execute('DELETE FROM measurements WHERE periode_key < ?', (cutoff,)).rowcount
+        if deleted:
+            conn.execute('DELETE FROM children WHERE NOT EXISTS '
+                         '(SELECT 1 FROM measurements m WHERE m.nik = children.nik)')
+            conn.execute('DELETE FROM uploads WHERE id NOT IN (SELECT upload_id FROM measurements) '
+                         'AND id NOT IN (SELECT last_upload_id FROM children)')
+        return deleted
+
+    def cohort(self, filters=None, periode_dari=None, periode_sampai=None, niks=None, limit=100, offset=0):
+        """
+        Archived measurements matching all filters (COHORT_FILTERS -> value) within a
+        periode_key range, joined with the child's identity, ordered by period and NIK
+        Returns: {'total', 'total_children', 'rows'}
+        """
+        clauses = []
+        params = []
+        for field, value in (filters or {}).items():
+            if field not in COHORT_FILTERS:
+                raise ValueError(f"Unknown cohort filter '{field}'")
+            clauses.append(f'm.{field} = ?')
+            params.append(value)
+        if periode_dari is not None:
+            clauses.append('m.periode_key >= ?')
+            params.append(periode_dari)
+        if periode_sampai is not None:
+            clauses.append('m.periode_key <= ?')
+            params.append(periode_sampai)
+        if niks:
+            niks = [nik for nik in (normalize_nik(nik) for nik in niks) if nik]
+            clauses.append(f"m.nik IN ({', '.join('?' * len(niks))})")
+            params.extend(niks)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+
+        with closing(self._connect()) as conn:
+            total, total_children = conn.execute(
+                f'SELECT COUNT(*), COUNT(DISTINCT m.nik) FROM measurements m {where}', params).fetchone()
+            # Page over the index keys first, so only the rows of this page are read from the table
+            rows = conn.execute(
+                f'SELECT m.*, c.nama_anak, c.tanggal_lahir, c.jenis_kelamin FROM '
+                f'(SELECT m.nik, m.periode_key FROM measurements m {where} '
+                f'ORDER BY m.periode_key, m.nik LIMIT ? OFFSET ?) AS page '
+                f'JOIN measurements m ON m.nik = page.nik AND m.periode_key = page.periode_key '
+                f'JOIN children c ON c.nik = m.nik ORDER BY m.periode_key, m.nik',
+                params + [limit, offset]).fetchall()
+        return {'total': total, 'total_children': total_children, 'rows': [dict(row) for row in rows]}
+
+    def child_history(self, nik):
+        """
+        One child with all archived measurements in period order, or None if unknown
+        """
+        nik = normalize_nik(nik)
+        with closing(self._connect()) as conn:
+            child = conn.execute('SELECT * FROM children WHERE nik = ?', (nik,)).fetchone()
+            if child is None:
+                return None
+            measurements = conn.execute('SELECT * FROM measurements WHERE nik = ? ORDER BY periode_key',
+                                        (nik,)).fetchall()
+        return dict(dict(child), measurements=[dict(row) for row in measurements])
+
+    def stats(self):
+        """
+        Archive size: uploads, children, measurements, period range and posyandu count
+        """
+        with closing(self._connect()) as conn:
+            uploads = conn.execute('SELECT COUNT(*) FROM uploads').fetchone()[0]
+            children = conn.execute('SELECT COUNT(*) FROM children').fetchone()[0]
+            total, first_period, last_period = conn.execute(
+                'SELECT COUNT(*), MIN(periode_key), MAX(periode_key) FROM measurements').fetchone()
+            tempat = conn.execute('SELECT COUNT(DISTINCT tempat) FROM children').fetchone()[0]
+        return {
+            'path': self.path,
+            'retention_months': self.retention_months,
+            'retention_cutoff': self.retention_cutoff(),
+            'uploads': uploads,
+            'children': children,
+            'measurements': total,
+            'first_period': first_period,
+            'last_period': last_period,
+            'tempat': tempat
+        }
@@ -0,0 +1,320 @@
+"""
+Batch processor: convert whole directories (or globs) of posyandu workbooks to JSON / NDJSON / Parquet
+
+Usage:
+    python batch_processor.py "arsip/2023/*.xlsx" arsip/2024 -o hasil --format ndjson --workers 4 --merge
+
+Every file is hashed (sha256); files whose content was already processed successfully are
+skipped, so an interrupted run can simply be started again. Parquet needs pyarrow or fastparquet.
+With --archive DB every processed file is also bulk inserted into the SQLite archive.
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import pandas as pd
+
+from arsip_pengukuran import MeasurementArchive
+from excel_to_json_anak import COMPUTED_AGE_ENV, process_excel_to_json
+from pengukuran import json_default
+import profil_memori
+from profil_memori import profile_session, stage
+
+OUTPUT_FORMATS = ('json', 'ndjson', 'parquet')
+OUTPUT_EXTENSIONS = {'json': '.json', 'ndjson': '.ndjson', 'parquet': '.parquet'}
+STATE_FILENAME = '.batch_state.json'
+EXCEL_EXTENSIONS = ('.xlsx', '.xls')
+CHUNK_SIZE = 1024 * 1024
+
+def find_workbooks(inputs):
+    """
+    Expand directories (recursively) and glob patterns into a sorted, de-duplicated list of workbooks
+    """
+    paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, filenames in os.walk(item):
+                for filename in filenames:
+                    if filename.lower().endswith(EXCEL_EXTENSIONS) and not filename.startswith('~$'):
+                        paths.add(os.path.abspath(os.path.join(root, filename)))
+        else:
+            for path in glob.glob(item, recursive=True):
+                if os.path.isfile(path) and path.lower().endswith(EXCEL_EXTENSIONS):
+                    paths.add(os.path.abspath(path))
+    return sorted(paths)
+
+def file_sha256(path):
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+def load_state(state_path):
+    if os.path.exists(state_path):
+        with open(state_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+def save_state(state, state_path):
+    """
+    Atomically persist the resume state (write temp file, then rename)
+    """
+    fd, tmp_path = tempfile.mkstemp(prefix='.state_', dir=os.path.dirname(state_path))
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, state_path)
+
+def measurement_rows(result, file_hash):
+    """
+    Flatten a processed workbook to one row per measurement (child identity repeated)
+    """
+    rows = []
+    for child in result.get('children', []):
+        identity = {key: value for key, value in child.items() if key != 'measurements'}
+        identity['file_name'] = result.get('file_name')
+        identity['file_hash'] = file_hash
+        for measurement in child.get('measurements', []):
+            row = dict(identity)
+            row.update(measurement.items())
+            rows.append(row)
+    return rows
+
+def _parquet_frame(rows):
+    df = pd.DataFrame(rows)
+    # Parquet needs one type per column: cells mixing numbers and text (e.g. UMUR "7 bln") become text
+    for column in df.columns[df.dtypes == object]:
+        if pd.api.types.infer_dtype(df[column], skipna=True).startswith('mixed'):
+            df[column] = df[column].map(lambda v: None if v is None else str(v))
+    return df
+
+def write_output(result, file_hash, output_path, output_format):
+    """
+    Write one processed workbook: whole result (json), one child per line (ndjson)
+    or one measurement per row (parquet)
+    """
+    if output_format == 'json':
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, default=json_default)
+    elif output_format == 'ndjson':
+        with open(output_path, 'w', encoding='utf-8') as f:
+            for child in result.get('children', []):
+                record = dict(child)
+                record['file_name'] = result.get('file_name')
+                record['file_hash'] = file_hash
+                f.write(json.dumps(record, ensure_ascii=False, default=json_default))
+                f.write('\n')
+    else:
+        _parquet_frame(measurement_rows(result, file_hash)).to_parquet(output_path, index=False)
+
+def process_file(source_path, file_hash, output_path, output_format, archive_path=None):
+    """
+    Process one workbook and write its output (runs in a worker process)
+    archive_path: also store the result in this SQLite archive (arsip_pengukuran)
+    Returns: summary dict for the resume state
+    """
+    start = time.perf_counter()
+    with profile_session(os.path.basename(source_path), {'source_path': source_path, 'sha256': file_hash,
+                                                         'size': os.path.getsize(source_path)}):
+        # Files are already spread over the worker processes, so sheets are processed serially here
+        result = process_excel_to_json(source_path, max_workers=1)
+        summary = _write_result(result, file_hash, output_path, output_format)
+        if archive_path and summary['error'] is None:
+            with stage('archive'):
+                summary['archive'] = MeasurementArchive(archive_path).store(result, file_hash,
+                                                                            os.path.basename(source_path))
+    summary['seconds'] = round(time.perf_counter() - start, 3)
+    return summary
+
+def _write_result(result, file_hash, output_path, output_format):
+    summary = {
+        'sha256': file_hash,
+        'processed_at': datetime.now().isoformat(),
+        'format_type': result.get('format_type'),
+        'total_children': result.get('total_children', 0),
+        'error': result.get('error')
+    }
+    if summary['error'] is None:
+        try:
+            with stage('json_serialization' if output_format != 'parquet' else 'parquet_serialization'):
+                write_output(result, file_hash, output_path, output_format)
+            summary['output'] = output_path
+        except Exception as e:
+            summary['error'] = f'Error writing output: {str(e)}'
+    return summary
+
+def merge_outputs(outputs, merged_path, output_format):
+    """
+    Combine per-file outputs (including those from earlier runs) into one file
+    """
+    if output_format == 'json':
+        merged = {'files': [], 'children': []}
+        for path in outputs:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+            children = result.pop('children', [])
+            for child in children:
+                child['file_name'] = result.get('file_name')
+            merged['files'].append(result)
+            merged['children'].extend(children)
+        merged['total_children'] = len(merged['children'])
+        with open(merged_path, 'w', encoding='utf-8') as f:
+            json.dump(merged, f, ensure_ascii=False)
+    elif output_format == 'ndjson':
+        with open(merged_path, 'w', encoding='utf-8') as out:
+            for path in outputs:
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        out.write(line)
+    else:
+        frames = [pd.read_parquet(path) for path in outputs]
+        merged = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        merged.to_parquet(merged_path, index=False)
+
+def require_parquet_engine():
+    """
+    Fail fast (before any file is processed) when no Parquet engine is installed
+    """
+    for module in ('pyarrow', 'fastparquet'):
+        try:
+            __import__(module)
+            return module
+        except ImportError:
+            continue
+    raise ImportError("Output Parquet membutuhkan pyarrow atau fastparquet (pip install pyarrow)")
+
+def _format_eta(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f'{hours:d}:{minutes:02d}:{seconds:02d}'
+
+def run_batch(inputs, output_dir, output_format='json', workers=None, merge=False, force=False, quiet=False,
+              archive_path=None):
+    """
+    Process all workbooks matched by inputs, skipping unchanged files already done
+    Returns: (processed, skipped, failed)
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format '{output_format}', use one of: {', '.join(OUTPUT_FORMATS)}")
+    if output_format == 'parquet':
+        require_parquet_engine()
+
+    os.makedirs(output_dir, exist_ok=True)
+    files_dir = os.path.join(output_dir, 'files')
+    os.makedirs(files_dir, exist_ok=True)
+    state_path = os.path.join(output_dir, STATE_FILENAME)
+    state = load_state(state_path)
+    extension = OUTPUT_EXTENSIONS[output_format]
+
+    def log(message):
+        if not quiet:
+            print(message, file=sys.stderr, flush=True)
+
+    workbooks = find_workbooks(inputs)
+    log(f"{len(workbooks)} workbook ditemukan")
+
+    if archive_path:
+        # Create the schema once, before the worker processes start writing
+        MeasurementArchive(archive_path)
+
+    pending = []
+    skipped = 0
+    outputs = {}
+    for source_path in workbooks:
+        file_hash = file_sha256(source_path)
+        stem = os.path.splitext(os.path.basename(source_path))[0]
+        output_path = os.path.join(files_dir, f"{stem}-{file_hash[:12]}{extension}")
+        previous = state.get(source_path)
+        if (not force and previous and previous.get('sha256') == file_hash and not previous.get('error')
+                and previous.get('output') == output_path and os.path.exists(output_path)):
+            skipped += 1
+            outputs[source_path] = output_path
+            continue
+        pending.append((source_path, file_hash, output_path))
+
+    if skipped:
+        log(f"{skipped} workbook tidak berubah, dilewati")
+
+    processed = 0
+    failed = 0
+    total = len(pending)
+    start = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(process_file, source_path, file_hash, output_path, output_format, archive_path): source_path
+            for source_path, file_hash, output_path in pending
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            source_path = futures[future]
+            try:
+                summary = future.result()
+            except Exception as e:
+                summary = {'sha256': None, 'processed_at': datetime.now().isoformat(), 'error': str(e)}
+
+            state[source_path] = summary
+            save_state(state, state_path)
+
+            if summary.get('error'):
+                failed += 1
+                status = f"GAGAL: {summary['error']}"
+            else:
+                processed += 1
+                outputs[source_path] = summary['output']
+                status = f"{summary['total_children']} anak, {summary['seconds']:.1f}s"
+
+            elapsed = time.perf_counter() - start
+            eta = elapsed / done * (total - done)
+            log(f"[{done}/{total}] {os.path.basename(source_path)}: {status} (ETA {_format_eta(eta)})")
+
+    if merge:
+        merged_path = os.path.join(output_dir, f"merged{extension}")
+        merge_outputs([outputs[path] for path in workbooks if path in outputs], merged_path, output_format)
+        log(f"Output gabungan: {merged_path}")
+
+    log(f"Selesai: {processed} diproses, {skipped} dilewati, {failed} gagal")
+    return processed, skipped, failed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Batch convert posyandu workbooks to JSON / NDJSON / Parquet')
+    parser.add_argument('inputs', nargs='+', help='Directories or glob patterns of .xlsx/.xls files')
+    parser.add_argument('-o', '--output-dir', default='batch_output', help='Output directory (default: batch_output)')
+    parser.add_argument('-f', '--format', dest='output_format', choices=OUTPUT_FORMATS, default='json')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--merge', action='store_true', help='Also write one merged output file')
+    parser.add_argument('--force', action='store_true', help='Reprocess files even if unchanged')
+    parser.add_argument('-q', '--quiet', action='store_true', help='No progress output')
+    parser.add_argument('--memory-profile', nargs='?', const=profil_memori.DEFAULT_PROFILE_DIR, default=None,
+                        metavar='DIR', help='Write a tracemalloc report per file and stage to DIR')
+    parser.add_argument('--computed-age', action='store_true',
+                        help='Assess by the age computed from TANGGAL LAHIR and TGL UKUR (combine with --force '
+                             'for files already processed without it)')
+    parser.add_argument('--archive', metavar='DB', default=None,
+                        help='Also bulk insert every processed file into this SQLite archive')
+    args = parser.parse_args(argv)
+
+    if args.memory_profile:
+        profil_memori.enable(args.memory_profile)
+    if args.computed_age:
+        os.environ[COMPUTED_AGE_ENV] = '1'
+
+    try:
+        _, _, failed = run_batch(args.inputs, args.output_dir, args.output_format, args.workers,
+                                 args.merge, args.force, args.quiet, args.archive)
+    except ImportError as e:
+        parser.error(str(e))
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
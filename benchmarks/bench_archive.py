@@ -0,0 +1,65 @@
+"""
+Benchmark: bulk inserts into the SQLite archive (arsip_pengukuran) and cohort query latency
+
+Usage: python benchmarks/bench_archive.py [n_children] [n_uploads]
+"""
+import gc
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from arsip_pengukuran import MeasurementArchive
+from benchmarks.synthetic_data import TEMPAT, generate_children
+from excel_to_json_anak import assess_children, load_who_table
+from periode import parse_period_key
+
+QUERIES = (
+    ('PENDEK in one posyandu, one year', {'tempat': TEMPAT[0], 'status_tb': 'PENDEK'}, 202401, 202412),
+    ('BB KURANG anywhere, one month', {'status_bb': 'KURANG'}, 202406, 202406),
+    ('Whole posyandu, one quarter', {'tempat': TEMPAT[3]}, 202404, 202406),
+)
+
+def main():
+    n_children = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_uploads = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    load_who_table()
+    children = generate_children(n_children, 12)
+    for child in children:
+        for measurement in child['measurements']:
+            measurement['periode_key'] = parse_period_key(measurement['periode'])
+    assess_children(children)
+    per_upload = -(-n_children // n_uploads)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        archive = MeasurementArchive(os.path.join(tmp_dir, 'arsip.sqlite3'))
+        gc.collect()
+        start = time.perf_counter()
+        for i in range(n_uploads):
+            batch = children[i * per_upload:(i + 1) * per_upload]
+            archive.store({'children': batch, 'format_type': 'PRD'}, file_name=f'upload-{i + 1}.xlsx')
+        insert_time = time.perf_counter() - start
+        stats = archive.stats()
+
+        print(f"Archived:           {stats['children']} children, {stats['measurements']} measurements "
+              f"in {stats['uploads']} uploads")
+        print(f"Bulk insert:        {insert_time:.2f}s ({stats['measurements'] / insert_time:,.0f} rows/s)")
+        print(f"Database size:      {os.path.getsize(archive.path) / 1024 / 1024:.1f} MB")
+
+        for label, filters, periode_dari, periode_sampai in QUERIES:
+            archive.cohort(filters, periode_dari, periode_sampai)  # warm the page cache
+            start = time.perf_counter()
+            result = archive.cohort(filters, periode_dari, periode_sampai, limit=100)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"{label + ':':<36}{result['total']:>8} rows, {result['total_children']:>6} children, {elapsed:.1f} ms")
+
+        nik = children[n_children // 2]['nik']
+        start = time.perf_counter()
+        history = archive.child_history(nik)
+        print(f"{'Child history:':<36}{len(history['measurements']):>8} rows, "
+              f"{(time.perf_counter() - start) * 1000:.1f} ms")
+
+if __name__ == '__main__':
+    main()
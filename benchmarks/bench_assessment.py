@@ -0,0 +1,79 @@
+"""
+Benchmark: assessment pass with the per-measurement DataFrame lookup (previous implementation)
+vs the compiled WHO reference used by apply_assessment_rules / GrowthAnalyzer
+
+Usage: python benchmarks/bench_assessment.py [n_rows]
+"""
+import copy
+import gc
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_data import generate_children
+import excel_to_json_anak
+from excel_to_json_anak import apply_assessment_rules, load_who_table
+from growth_analyzer import GrowthAnalyzer
+
+def dataframe_lookup(umur_bulan, jenis_kelamin):
+    """
+    Previous get_who_reference: filter the WHO DataFrame for every measurement
+    """
+    table = excel_to_json_anak.who_table
+    try:
+        umur_bulan = int(umur_bulan)
+        if umur_bulan < 0 or umur_bulan > 59:
+            return None
+        age_row = table[table['Umur'] == umur_bulan]
+        if age_row.empty or not jenis_kelamin:
+            return None
+        age_data = age_row.iloc[0]
+        jk_upper = str(jenis_kelamin).upper()
+        if jk_upper not in ('L', 'P'):
+            return None
+        min_bb, max_bb = excel_to_json_anak._parse_range(age_data[f'BB Ideal ({jk_upper})'])
+        min_tb, max_tb = excel_to_json_anak._parse_range(age_data[f'PB Ideal ({jk_upper})'])
+        return {
+            'min_bb': min_bb, 'max_bb': max_bb, 'min_tb': min_tb, 'max_tb': max_tb,
+            'rentang_bb_ideal': f"{min_bb}-{max_bb}" if min_bb and max_bb else None,
+            'rentang_tb_ideal': f"{min_tb}-{max_tb}" if min_tb and max_tb else None
+        }
+    except Exception:
+        return None
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_periods = 12
+    load_who_table()
+    children = generate_children(int(n_rows / n_periods / 0.95) + 1, n_periods)
+    legacy_children = copy.deepcopy(children)
+    compiled_children = copy.deepcopy(children)
+
+    gc.collect()
+    start = time.perf_counter()
+    for child in legacy_children:
+        excel_to_json_anak.assess_child_measurements(child, dataframe_lookup)
+    legacy_time = time.perf_counter() - start
+
+    gc.collect()
+    start = time.perf_counter()
+    for child in compiled_children:
+        apply_assessment_rules(child)
+    compiled_time = time.perf_counter() - start
+
+    analyzer = GrowthAnalyzer()
+    gc.collect()
+    start = time.perf_counter()
+    result = analyzer.analyze(children, velocity=False)
+    analyzer_time = time.perf_counter() - start
+
+    print(f"Rows:               {sum(len(c['measurements']) for c in children)}")
+    print(f"DataFrame lookup:   {legacy_time:.2f}s")
+    print(f"Compiled lookup:    {compiled_time:.2f}s ({legacy_time / compiled_time:.0f}x)")
+    print(f"GrowthAnalyzer:     {analyzer_time:.2f}s (incl. input copy)")
+    print(f"Identical results:  {legacy_children == compiled_children}")
+
+if __name__ == '__main__':
+    main()
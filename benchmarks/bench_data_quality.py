@@ -0,0 +1,61 @@
+"""
+Benchmark: whole-dataset data quality checks (kualitas_data.check_data_quality)
+
+Usage: python benchmarks/bench_data_quality.py [n_children]
+"""
+import gc
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_data import generate_children
+from kualitas_data import check_data_quality
+from pengukuran import compact_children
+
+def inject_problems(children, rate=0.02, seed=7):
+    """
+    Typical data entry mistakes in a small share of the rows
+    """
+    rng = random.Random(seed)
+    for child in children:
+        if rng.random() < rate:
+            child['nik'] = child['nik'][:-1]
+        if rng.random() < rate:
+            child['jenis_kelamin'] = 'LAKI-LAKI'
+        for measurement in child['measurements']:
+            if rng.random() < rate:
+                measurement['umur_bulan'] = (measurement['umur_bulan'] or 0) + 6
+            if rng.random() < rate / 4:
+                measurement['berat_kg'] = 95.0
+    return children
+
+def main():
+    n_children = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    children = inject_problems(generate_children(n_children, 12))
+    for i, child in enumerate(children):
+        child['row'] = i + 3
+
+    gc.collect()
+    start = time.perf_counter()
+    report = check_data_quality(children)
+    dict_time = time.perf_counter() - start
+
+    compact_children(children)
+    gc.collect()
+    start = time.perf_counter()
+    compact_report = check_data_quality(children)
+    compact_time = time.perf_counter() - start
+
+    summary = report['summary']
+    print(f"Children:           {summary['total_children']} ({summary['total_measurements']} measurements)")
+    print(f"Dict measurements:  {dict_time:.2f}s")
+    print(f"Compact records:    {compact_time:.2f}s")
+    print(f"Rows with issues:   {summary['rows_with_issues']} ({summary['errors']} errors, {summary['warnings']} warnings)")
+    print(f"By code:            {summary['by_code']}")
+    print(f"Identical results:  {report['issues'] == compact_report['issues']}")
+
+if __name__ == '__main__':
+    main()
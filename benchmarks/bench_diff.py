@@ -0,0 +1,81 @@
+"""
+Benchmark: diff between two uploads (perbandingan_upload), with fingerprints computed from the
+child dicts (data processed without them); at ingest extract_children computes them per column
+
+Usage: python benchmarks/bench_diff.py [n_children]
+"""
+import copy
+import gc
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_data import generate_children
+from excel_to_json_anak import assess_children, load_who_table
+from kecepatan_pertumbuhan import apply_growth_velocity
+from pengukuran import compact_children
+from perbandingan_upload import add_fingerprints, diff_results
+from periode import parse_period_key
+
+def corrected_copy(children, rate=0.02, seed=3):
+    """
+    Re-upload with typical corrections: fixed weights, a renamed child, dropped and new rows
+    """
+    rng = random.Random(seed)
+    corrected = copy.deepcopy(children)
+    for child in corrected:
+        for measurement in child['measurements']:
+            if rng.random() < rate / 4 and measurement['berat_kg'] is not None:
+                measurement['berat_kg'] = round(measurement['berat_kg'] + 0.5, 1)
+        if rng.random() < rate / 10:
+            child['nama_anak'] += ' (koreksi)'
+    del corrected[::200]
+    extra = generate_children(len(children) // 100, 12, seed=99)
+    for i, child in enumerate(extra):
+        child['nik'] = str(3209000000000000 + i)
+    return corrected + extra
+
+def prepare(children):
+    for child in children:
+        for measurement in child['measurements']:
+            measurement['periode_key'] = parse_period_key(measurement['periode'])
+    assess_children(children)
+    apply_growth_velocity(children)
+    return children
+
+def main():
+    n_children = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    load_who_table()
+    base_children = generate_children(n_children, 12)
+    current_children = prepare(corrected_copy(base_children))
+    prepare(base_children)
+
+    gc.collect()
+    start = time.perf_counter()
+    add_fingerprints(base_children)
+    fingerprint_time = time.perf_counter() - start
+    add_fingerprints(current_children)
+    compact_children(base_children)
+    compact_children(current_children)
+
+    gc.collect()
+    start = time.perf_counter()
+    diff = diff_results({'children': base_children}, {'children': current_children})
+    diff_time = time.perf_counter() - start
+
+    summary = diff['summary']
+    n_measurements = sum(len(child['measurements']) for child in base_children)
+    print(f"Children:           {n_children} ({n_measurements} measurements)")
+    print(f"Fingerprints:       {fingerprint_time:.2f}s (from dicts)")
+    print(f"Diff:               {diff_time:.2f}s")
+    print(f"Children:           +{summary['children_added']} -{summary['children_removed']} "
+          f"~{summary['children_changed']} ={summary['children_unchanged']}")
+    print(f"Measurements:       +{summary['measurements_added']} -{summary['measurements_removed']} "
+          f"~{summary['measurements_changed']}")
+    print(f"Status transitions: {summary['status_transitions']}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Benchmark: analysis export backends (openpyxl per-cell, openpyxl conditional formatting, xlsxwriter streaming)
+
+Usage: python benchmarks/bench_export_backends.py [n_rows]
+"""
+import gc
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_data import generate_children
+from excel_to_json_anak import load_who_table, apply_assessment_rules
+from export_analisis import export_to_excel_analisis, export_to_excel_analisis_xlsxwriter
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_periods = 12
+    load_who_table()
+    children = generate_children(int(n_rows / n_periods / 0.95) + 1, n_periods)
+    for child in children:
+        apply_assessment_rules(child)
+    data = {'children': children}
+    total = sum(len(c['measurements']) for c in children)
+
+    timings = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        writers = (
+            ('openpyxl', export_to_excel_analisis),
+            ('openpyxl-cf', lambda d, p: export_to_excel_analisis(d, p, conditional_formatting=True)),
+            ('xlsxwriter', export_to_excel_analisis_xlsxwriter),
+        )
+        for name, writer in writers:
+            output_path = os.path.join(tmp_dir, f"{name}.xlsx")
+            gc.collect()
+            start = time.perf_counter()
+            success, result = writer(data, output_path)
+            timings[name] = time.perf_counter() - start
+            if not success:
+                print(f"{name}: {result}")
+                return
+            print(f"{name:<11} {timings[name]:7.2f}s  {os.path.getsize(output_path) / 1024 / 1024:6.1f} MB")
+
+    print(f"Rows: {total}")
+    print(f"Speedup openpyxl-cf: {timings['openpyxl'] / timings['openpyxl-cf']:.1f}x")
+    print(f"Speedup xlsxwriter:  {timings['openpyxl'] / timings['xlsxwriter']:.1f}x")
+
+if __name__ == '__main__':
+    main()
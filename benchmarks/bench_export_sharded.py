@@ -0,0 +1,55 @@
+"""
+Benchmark: serial single-workbook export vs sharded per-tempat export in the shared process pool
+
+Usage: python benchmarks/bench_export_sharded.py [n_rows] [workers]
+"""
+import gc
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_data import generate_children
+from excel_to_json_anak import load_who_table, apply_assessment_rules
+import export_analisis
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    n_periods = 12
+    load_who_table()
+    children = generate_children(int(n_rows / n_periods / 0.95) + 1, n_periods)
+    for child in children:
+        apply_assessment_rules(child)
+    data = {'children': children}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        gc.collect()
+        start = time.perf_counter()
+        export_analisis.export_to_excel_analisis(data, os.path.join(tmp_dir, 'serial.xlsx'))
+        serial_time = time.perf_counter() - start
+
+        os.chdir(tmp_dir)
+        # First run starts the shared pool; the second is the steady state of a serving process
+        sharded_times = []
+        for run in ('cold', 'warm'):
+            gc.collect()
+            start = time.perf_counter()
+            success, result = export_analisis.export_analisis_per_tempat_zip(data, f'sharded_{run}.zip',
+                                                                             max_workers=workers)
+            sharded_times.append(time.perf_counter() - start)
+            if not success:
+                print(result)
+                return
+        cold_time, sharded_time = sharded_times
+
+    print(f"Rows:     {sum(len(c['measurements']) for c in children)}")
+    print(f"Tempat:   {len(export_analisis.partition_children_by_tempat(data))}")
+    print(f"Serial:   {serial_time:.2f}s")
+    print(f"Sharded:  {sharded_time:.2f}s ({workers} workers, pool warm; {cold_time:.2f}s cold)")
+    print(f"Speedup:  {serial_time / sharded_time:.1f}x")
+
+if __name__ == '__main__':
+    main()
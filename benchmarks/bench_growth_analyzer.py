@@ -0,0 +1,158 @@
+"""
+Benchmark: GrowthAnalyzer long DataFrame input, row by row (previous implementation:
+to_dict(orient='records') and per-cell conversion) vs column-wise conversion (konversi_kolom)
+
+Usage: python benchmarks/bench_growth_analyzer.py [n_rows]
+"""
+import gc
+import os
+import sys
+import time
+from datetime import date, datetime
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_data import generate_children
+from excel_to_json_anak import load_who_table
+from growth_analyzer import COLUMN_ALIASES, GrowthAnalyzer, add_computed_age
+from periode import parse_period_key, period_sort_key
+
+EXCEL_COLUMNS = {field: column for column, field in COLUMN_ALIASES.items()}
+
+def _is_missing(value):
+    if value is None:
+        return True
+    try:
+        return bool(pd.isna(value))
+    except (TypeError, ValueError):
+        return False
+
+def _text(value, upper=False):
+    if _is_missing(value):
+        return None
+    text = str(value).strip()
+    return text.upper() if upper else text
+
+def _date_text(value):
+    """
+    Dates as 'YYYY-MM-DD', like the Excel ingestion
+    """
+    if _is_missing(value):
+        return None
+    if isinstance(value, (datetime, date)):
+        return value.strftime('%Y-%m-%d')
+    try:
+        return pd.to_datetime(value).strftime('%Y-%m-%d')
+    except (ValueError, TypeError):
+        return str(value)
+
+def _number(value, cast):
+    if _is_missing(value):
+        return None
+    try:
+        return cast(float(value))
+    except (ValueError, TypeError):
+        return None
+
+def children_from_records(records):
+    """
+    Previous GrowthAnalyzer DataFrame path: to_dict(orient='records') and one cell at a time
+    """
+    children = {}
+    for record in records:
+        record = {COLUMN_ALIASES.get(str(key).strip().upper(), key): value for key, value in record.items()}
+
+        child_fields = {
+            'no': _number(record.get('no'), int),
+            'tempat': _text(record.get('tempat')),
+            'nik': _text(record.get('nik')),
+            'nama_anak': _text(record.get('nama_anak')),
+            'tanggal_lahir': _date_text(record.get('tanggal_lahir')),
+            'jenis_kelamin': _text(record.get('jenis_kelamin'), upper=True)
+        }
+        if not (child_fields['nik'] or child_fields['nama_anak']):
+            continue
+
+        key = child_fields['nik'] or (child_fields['nama_anak'], child_fields['tanggal_lahir'])
+        child = children.get(key)
+        if child is None:
+            child = dict(child_fields, measurements=[])
+            children[key] = child
+
+        measurement = {
+            'periode': _text(record.get('periode')),
+            'periode_key': _number(record.get('periode_key'), int),
+            'tgl_ukur': _date_text(record.get('tgl_ukur')),
+            'umur_bulan': _number(record.get('umur_bulan'), int),
+            'umur_bulan_hitung': None,
+            'umur_tidak_sesuai': False,
+            'berat_kg': _number(record.get('berat_kg'), float),
+            'tinggi_cm': _number(record.get('tinggi_cm'), float),
+            'cara_ukur': _text(record.get('cara_ukur'), upper=True)
+        }
+        if measurement['periode_key'] is None:
+            measurement['periode_key'] = parse_period_key(measurement['periode'] or measurement['tgl_ukur'])
+
+        has_any_data = any(measurement[field] is not None
+                           for field in ('tgl_ukur', 'umur_bulan', 'berat_kg', 'tinggi_cm', 'cara_ukur'))
+        if not has_any_data:
+            continue
+        measurement['has_complete_data'] = measurement['berat_kg'] is not None or measurement['tinggi_cm'] is not None
+        measurement['is_incomplete'] = not measurement['has_complete_data']
+        child['measurements'].append(measurement)
+
+    result = list(children.values())
+    for child in result:
+        child['measurements'].sort(key=lambda m: period_sort_key(m['periode_key']))
+    return result
+
+def long_frame(children):
+    """
+    One row per measurement with the Excel column names, dates as Timestamps
+    """
+    rows = []
+    for child in children:
+        identity = {EXCEL_COLUMNS[field]: child[field]
+                    for field in ('no', 'tempat', 'nik', 'nama_anak', 'tanggal_lahir', 'jenis_kelamin')}
+        for measurement in child['measurements']:
+            row = dict(identity)
+            for field in ('periode', 'tgl_ukur', 'umur_bulan', 'berat_kg', 'tinggi_cm', 'cara_ukur'):
+                row[EXCEL_COLUMNS[field]] = measurement.get(field)
+            rows.append(row)
+    frame = pd.DataFrame(rows)
+    for column in ('TANGGAL LAHIR', 'TGL UKUR'):
+        frame[column] = pd.to_datetime(frame[column])
+    return frame
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_periods = 12
+    load_who_table()
+    frame = long_frame(generate_children(int(n_rows / n_periods / 0.95) + 1, n_periods))
+    analyzer = GrowthAnalyzer()
+
+    gc.collect()
+    start = time.perf_counter()
+    row_children = add_computed_age(children_from_records(frame.to_dict(orient='records')))
+    row_time = time.perf_counter() - start
+
+    gc.collect()
+    start = time.perf_counter()
+    column_children = analyzer.to_children(frame)
+    column_time = time.perf_counter() - start
+
+    gc.collect()
+    start = time.perf_counter()
+    analyzer.analyze(frame, velocity=False)
+    analyze_time = time.perf_counter() - start
+
+    print(f"Rows:               {len(frame)}")
+    print(f"Row by row:         {row_time:.2f}s")
+    print(f"Column-wise:        {column_time:.2f}s ({row_time / column_time:.1f}x)")
+    print(f"analyze(frame):     {analyze_time:.2f}s (incl. assessment)")
+    print(f"Identical children: {row_children == column_children}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark: growth velocity overhead against the whole processing of a workbook
+(process_excel_to_json on a synthetic PRD workbook; budget: less than 10%)
+
+Usage: python benchmarks/bench_growth_velocity.py [n_measurements]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import excel_to_json_anak
+from benchmarks.synthetic_data import write_prd_workbook
+from excel_to_json_anak import load_who_table, process_excel_to_json
+
+OVERHEAD_BUDGET = 0.10
+
+def main():
+    n_measurements = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_periods = 12
+    load_who_table()
+
+    # Time the velocity step inside the pipeline (a single-sheet workbook is processed in this process)
+    velocity_seconds = []
+    apply_growth_velocity = excel_to_json_anak.apply_growth_velocity
+
+    def timed_growth_velocity(children):
+        start = time.perf_counter()
+        try:
+            return apply_growth_velocity(children)
+        finally:
+            velocity_seconds.append(time.perf_counter() - start)
+
+    excel_to_json_anak.apply_growth_velocity = timed_growth_velocity
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = write_prd_workbook(os.path.join(tmp_dir, 'prd.xlsx'), n_measurements // n_periods, n_periods)
+            start = time.perf_counter()
+            result = process_excel_to_json(path)
+            total_time = time.perf_counter() - start
+    finally:
+        excel_to_json_anak.apply_growth_velocity = apply_growth_velocity
+
+    if 'error' in result:
+        print(f"Error: {result['error']}")
+        return 1
+
+    total = sum(len(child['measurements']) for child in result['children'])
+    velocity_time = sum(velocity_seconds)
+    overhead = velocity_time / (total_time - velocity_time)
+
+    print(f"Measurements:          {total}")
+    print(f"process_excel_to_json: {total_time:.3f}s")
+    print(f"Growth velocity:       {velocity_time:.3f}s")
+    print(f"Overhead vs the rest:  {overhead * 100:.1f}% (budget {OVERHEAD_BUDGET * 100:.0f}%)")
+    if overhead >= OVERHEAD_BUDGET:
+        print("Over budget")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Benchmark: row extraction cell by cell (previous extract_child_data) vs column-wise
+conversion (extract_children) on the data rows of a PRD workbook
+
+Usage: python benchmarks/bench_ingestion.py [n_children]
+"""
+import gc
+import os
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import openpyxl
+import pandas as pd
+
+from benchmarks.synthetic_data import write_prd_workbook
+from excel_to_json_anak import extract_children, extract_period_names_from_merged_cells, sort_period_columns
+
+def legacy_date(value):
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d')
+    try:
+        return pd.to_datetime(value).strftime('%Y-%m-%d')
+    except Exception:
+        return str(value)
+
+def legacy_extract_child_data(row, period_columns):
+    """
+    Previous extract_child_data: pd.isna / isinstance / pd.to_datetime / float() per cell
+    """
+    child = {'no': None, 'tempat': None, 'nik': None, 'nama_anak': None,
+             'tanggal_lahir': None, 'jenis_kelamin': None, 'measurements': []}
+    child['no'] = int(row.iloc[0]) if not pd.isna(row.iloc[0]) else None
+    for field, idx in (('tempat', 1), ('nik', 2), ('nama_anak', 3)):
+        child[field] = str(row.iloc[idx]).strip() if not pd.isna(row.iloc[idx]) else None
+    if not pd.isna(row.iloc[4]):
+        child['tanggal_lahir'] = legacy_date(row.iloc[4])
+    child['jenis_kelamin'] = str(row.iloc[5]).strip().upper() if not pd.isna(row.iloc[5]) else None
+
+    for period in period_columns:
+        measurement = {'periode': period['period_name'], 'periode_key': period.get('period_key'),
+                       'tgl_ukur': None, 'umur_bulan': None, 'berat_kg': None, 'tinggi_cm': None, 'cara_ukur': None}
+        has_complete_data = False
+        has_any_data = False
+        for col_idx, sub_col_name in period['sub_columns']:
+            value = row.iloc[col_idx]
+            if pd.isna(value):
+                continue
+            has_any_data = True
+            if sub_col_name == 'TGL UKUR':
+                measurement['tgl_ukur'] = legacy_date(value)
+            elif sub_col_name == 'UMUR':
+                try:
+                    measurement['umur_bulan'] = int(float(value))
+                except (ValueError, TypeError):
+                    pass
+            elif sub_col_name in ('BERAT', 'TINGGI'):
+                try:
+                    measurement['berat_kg' if sub_col_name == 'BERAT' else 'tinggi_cm'] = float(value)
+                    has_complete_data = True
+                except (ValueError, TypeError):
+                    pass
+            elif sub_col_name == 'CARA UKUR':
+                measurement['cara_ukur'] = str(value).strip().upper()
+        measurement['has_complete_data'] = has_complete_data
+        measurement['is_incomplete'] = has_any_data and not has_complete_data
+        if has_any_data:
+            child['measurements'].append(measurement)
+    return child
+
+def legacy_view(children):
+    """
+    Children reduced to the fields the previous extraction produced (drops 'row', the computed age
+    and the fingerprints)
+    """
+    return [dict({key: child[key] for key in child if key not in ('row', 'measurements', 'fingerprint')},
+                 measurements=[{key: value for key, value in measurement.items()
+                                if key not in ('umur_bulan_hitung', 'umur_tidak_sesuai', 'fingerprint')}
+                               for measurement in child['measurements']])
+            for child in children]
+
+def prd_period_columns(ws, period_names):
+    headers = [ws.cell(row=2, column=col).value for col in range(1, ws.max_column + 1)]
+    sub_columns = [(idx, str(h).strip()) for idx, h in enumerate(headers)
+                   if idx >= 6 and h and str(h).strip().upper() in ('TGL UKUR', 'UMUR', 'BERAT', 'TINGGI', 'CARA UKUR')]
+    period_columns = [{'period_name': period_names[i // 5], 'sub_columns': sub_columns[i:i + 5]}
+                      for i in range(0, len(sub_columns), 5)]
+    return sort_period_columns(period_columns)
+
+def main():
+    n_children = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    # The previous parser warns on every day-first text date
+    warnings.simplefilter('ignore', UserWarning)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = write_prd_workbook(os.path.join(tmp_dir, 'prd.xlsx'), n_children, 12)
+        period_names = extract_period_names_from_merged_cells(path)
+        wb = openpyxl.load_workbook(path)
+        ws = wb.active
+        period_columns = prd_period_columns(ws, period_names)
+        rows = list(ws.iter_rows(min_row=3, max_col=ws.max_column, values_only=True))
+        n_columns = ws.max_column
+        wb.close()
+
+    # Day-first text dates, as found in hand-typed sheets
+    text_rows = []
+    for row in rows:
+        row = list(row)
+        for col_idx in range(6, n_columns, 5):
+            if isinstance(row[col_idx], datetime):
+                row[col_idx] = row[col_idx].strftime('%d/%m/%Y')
+        text_rows.append(row)
+
+    for label, data in (('Excel dates', rows), ('Text dates', text_rows)):
+        gc.collect()
+        start = time.perf_counter()
+        legacy_children = []
+        for row in data:
+            row_series = pd.Series(row)
+            if row_series.isna().all():
+                continue
+            child = legacy_extract_child_data(row_series, period_columns)
+            if child['nama_anak'] or child['nik']:
+                legacy_children.append(child)
+        legacy_time = time.perf_counter() - start
+
+        gc.collect()
+        start = time.perf_counter()
+        frame = pd.DataFrame(data, columns=range(n_columns), dtype=object)
+        children, coercion_errors = extract_children(frame, period_columns, first_row_number=3)
+        columnwise_time = time.perf_counter() - start
+
+        print(f"[{label}]")
+        print(f"  Rows:               {len(data)} ({sum(len(c['measurements']) for c in children)} measurements)")
+        print(f"  Cell by cell:       {legacy_time:.2f}s")
+        print(f"  Column-wise:        {columnwise_time:.2f}s ({legacy_time / columnwise_time:.1f}x)")
+        print(f"  Identical results:  {legacy_children == legacy_view(children)}")
+        print(f"  Coercion errors:    {len(coercion_errors)}")
+        print(f"  UMUR mismatches:    {sum(m['umur_tidak_sesuai'] for c in children for m in c['measurements'])}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Benchmark: memory held by assessed measurements as plain dicts vs compact Measurement records
+
+Usage: python benchmarks/bench_measurement_memory.py [n_rows]
+"""
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_data import generate_children
+from growth_analyzer import GrowthAnalyzer
+from pengukuran import json_default
+
+def measure(analyzer, children, compact):
+    """
+    Returns (result, bytes still allocated by the result, seconds)
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = analyzer.analyze(children, compact=compact)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_periods = 12
+    analyzer = GrowthAnalyzer()
+    children = generate_children(int(n_rows / n_periods / 0.95) + 1, n_periods)
+    n_measurements = sum(len(c['measurements']) for c in children)
+
+    plain, plain_bytes, plain_time = measure(analyzer, children, compact=False)
+    compact, compact_bytes, compact_time = measure(analyzer, children, compact=True)
+
+    same_json = json.dumps(plain) == json.dumps(compact, default=json_default)
+
+    print(f"Measurements:  {n_measurements}")
+    print(f"Dict:          {plain_bytes / 1024 / 1024:.1f} MB ({plain_bytes / n_measurements:.0f} B/measurement), {plain_time:.2f}s")
+    print(f"Compact:       {compact_bytes / 1024 / 1024:.1f} MB ({compact_bytes / n_measurements:.0f} B/measurement), {compact_time:.2f}s")
+    print(f"Reduction:     {(1 - compact_bytes / plain_bytes) * 100:.0f}%")
+    print(f"Identical JSON: {same_json}")
+
+if __name__ == '__main__':
+    main()
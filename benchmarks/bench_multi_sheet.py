@@ -0,0 +1,50 @@
+"""
+Benchmark: serial vs process-pool ingestion of a workbook with one sheet per posyandu
+
+Usage: python benchmarks/bench_multi_sheet.py [n_sheets] [children_per_sheet] [workers]
+"""
+import gc
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_data import TEMPAT, write_multi_sheet_workbook
+from excel_to_json_anak import process_excel_to_json
+
+def main():
+    n_sheets = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    children_per_sheet = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else (os.cpu_count() or 1)
+    titles = [TEMPAT[i % len(TEMPAT)] + (f" {i // len(TEMPAT) + 1}" if i >= len(TEMPAT) else '')
+              for i in range(n_sheets)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = write_multi_sheet_workbook(os.path.join(tmp_dir, 'rekap.xlsx'), titles, children_per_sheet)
+
+        gc.collect()
+        start = time.perf_counter()
+        serial = process_excel_to_json(path, max_workers=1)
+        serial_time = time.perf_counter() - start
+
+        gc.collect()
+        start = time.perf_counter()
+        pooled = process_excel_to_json(path, max_workers=workers)
+        pooled_time = time.perf_counter() - start
+
+    if 'error' in pooled:
+        print(pooled['error'])
+        return
+
+    print(f"Sheets:   {n_sheets} (+ cover sheet), {pooled['total_children']} children")
+    for sheet in pooled['sheets']:
+        print(f"  {sheet['name']:<24} {sheet['total_children']:>6} children  {sheet['seconds']:.2f}s  {sheet['error'] or ''}")
+    print(f"Serial:   {serial_time:.2f}s")
+    print(f"Pooled:   {pooled_time:.2f}s ({workers} workers)")
+    print(f"Speedup:  {serial_time / pooled_time:.1f}x")
+    print(f"Same children: {serial['children'] == pooled['children']}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,414 @@
+"""
+Load test: start the app under gunicorn, drive a mix of /upload, /check-export-data,
+/export-analisis and /health from concurrent virtual users, and report latency
+percentiles, error rates and worker RSS over time. Runs offline (stdlib + repo only).
+
+Every virtual user keeps its own session cookie and behaves like a kader: it uploads a
+synthetic workbook first, then picks endpoints at random by --mix weight (an upload
+replaces its dataset). 503 responses from admission control count as rejected, not as errors.
+
+Usage: python benchmarks/load_test.py [--users 8] [--duration 120] [--children 200,1000,5000]
+       [--mix upload=1,check=4,export=1,health=4] [--workers 1] [--threads 8] [--env NAME=VALUE ...]
+       python benchmarks/load_test.py --url http://host:port   (existing server, no RSS sampling)
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.synthetic_data import TEMPAT, write_multi_sheet_workbook, write_prd_workbook
+
+# Endpoint name -> (method, path)
+ENDPOINTS = {
+    'upload': ('POST', '/upload?include_children=0'),
+    'check': ('GET', '/check-export-data'),
+    'export': ('GET', '/export-analisis'),
+    'health': ('GET', '/health'),
+}
+DEFAULT_MIX = 'upload=1,check=4,export=1,health=4'
+XLSX_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint '{name}' (choose from {', '.join(ENDPOINTS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+def generate_workbooks(folder, sizes, variants, multi_sheet):
+    """
+    Synthetic PRD workbooks: `variants` files (different seeds) per size, plus an optional
+    workbook with one sheet per posyandu
+    Returns: list of (label, path)
+    """
+    workbooks = []
+    for n_children in sizes:
+        for seed in range(variants):
+            path = os.path.join(folder, f'posyandu_{n_children}_{seed}.xlsx')
+            write_prd_workbook(path, n_children, seed=seed)
+            workbooks.append((f'{n_children} anak', path))
+    if multi_sheet:
+        path = os.path.join(folder, 'rekap_multi_sheet.xlsx')
+        write_multi_sheet_workbook(path, TEMPAT[:4], max(sizes) // 4)
+        workbooks.append((f'{max(sizes) // 4 * 4} anak, 4 sheet', path))
+    return workbooks
+
+def multipart_body(field, filename, content, content_type):
+    boundary = uuid.uuid4().hex
+    body = (f'--{boundary}\r\nContent-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n').encode() + content + f'\r\n--{boundary}--\r\n'.encode()
+    return body, f'multipart/form-data; boundary={boundary}'
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_gunicorn(port, workers, threads, env_overrides, work_dir, log_path):
+    """
+    Start gunicorn in the repo root with uploads / exports / sessions / archive in work_dir
+    """
+    env = dict(os.environ)
+    env.update({
+        'UPLOAD_FOLDER': os.path.join(work_dir, 'uploads'),
+        'EXPORT_FOLDER': os.path.join(work_dir, 'exports'),
+        'SESSION_FILE_DIR': os.path.join(work_dir, 'sessions'),
+        'DATA_DIR': os.path.join(work_dir, 'data'),
+        'ARCHIVE_DB_PATH': os.path.join(work_dir, 'arsip.sqlite3'),
+        'SERVER_THREADS': str(threads),
+        'PYTHONUNBUFFERED': '1',
+    })
+    env.update(env_overrides)
+    command = [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+               '--threads', str(threads), '--timeout', '600', 'app:app']
+    log = open(log_path, 'w')
+    process = subprocess.Popen(command, cwd=REPO_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+                               start_new_session=True)
+    return process, log
+
+def wait_until_healthy(base_url, process=None, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f'gunicorn exited with code {process.returncode}')
+        try:
+            with urllib.request.urlopen(base_url + '/health', timeout=2) as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, OSError):
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f'{base_url} not healthy after {timeout}s')
+
+def stop_gunicorn(process, log):
+    if process.poll() is None:
+        os.killpg(process.pid, signal.SIGTERM)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+            process.wait()
+    log.close()
+
+def _children_by_parent():
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # The command name may contain spaces, fields after ')' are fixed
+                fields = f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        children.setdefault(int(fields[1]), []).append(int(entry))
+    return children
+
+def _rss_bytes(pid):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+def sample_worker_rss(master_pid):
+    """
+    RSS per gunicorn worker, including the worker's own process pools (multi-sheet ingest, per-tempat export)
+    Returns: {worker pid: bytes}
+    """
+    tree = _children_by_parent()
+    samples = {}
+    for worker in tree.get(master_pid, []):
+        total = 0
+        pending = [worker]
+        while pending:
+            pid = pending.pop()
+            total += _rss_bytes(pid)
+            pending.extend(tree.get(pid, []))
+        samples[worker] = total
+    return samples
+
+class RssSampler(threading.Thread):
+    def __init__(self, master_pid, interval):
+        super().__init__(daemon=True)
+        self.master_pid = master_pid
+        self.interval = interval
+        self.samples = []
+        self._stop_event = threading.Event()
+        self._start = time.perf_counter()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.samples.append((time.perf_counter() - self._start, sample_worker_rss(self.master_pid)))
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+class Recorder:
+    """
+    Thread-safe store of (endpoint, start, seconds, status, outcome, error, workbook label) results
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.results = []
+
+    def add(self, endpoint, started, seconds, status, error=None, label=None):
+        if error is not None:
+            outcome = 'error'
+        elif status == 503:
+            outcome = 'rejected'
+        elif status >= 400:
+            outcome = 'error'
+        else:
+            outcome = 'ok'
+        with self._lock:
+            self.results.append((endpoint, started, seconds, status, outcome, error, label))
+
+def virtual_user(base_url, workbooks, mix, deadline, recorder, seed, think_time, clock_start):
+    rng = random.Random(seed)
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    endpoint = 'upload'
+    while time.perf_counter() < deadline:
+        method, path = ENDPOINTS[endpoint]
+        body, headers, label = None, {}, None
+        if endpoint == 'upload':
+            label, workbook = rng.choice(workbooks)
+            with open(workbook, 'rb') as f:
+                body, content_type = multipart_body('file', os.path.basename(workbook), f.read(), XLSX_TYPE)
+            headers['Content-Type'] = content_type
+        request = urllib.request.Request(base_url + path, data=body, headers=headers, method=method)
+        started = time.perf_counter()
+        status, error = None, None
+        try:
+            with opener.open(request, timeout=600) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            status = e.code
+        except (urllib.error.URLError, OSError) as e:
+            error = str(getattr(e, 'reason', e))
+        recorder.add(endpoint, started - clock_start, time.perf_counter() - started, status or 0, error, label)
+        if think_time:
+            time.sleep(rng.uniform(0, 2 * think_time))
+        endpoint = rng.choices(names, weights)[0]
+
+def _summarize(rows):
+    """
+    Latency percentiles over successful requests, plus rejected / error counts
+    """
+    ok = [r[2] for r in rows if r[4] == 'ok']
+    p50, p95, p99 = (np.percentile(ok, [50, 95, 99]) * 1000).tolist() if ok else (float('nan'),) * 3
+    errors = sum(1 for r in rows if r[4] == 'error')
+    rejected = sum(1 for r in rows if r[4] == 'rejected')
+    return {
+        'requests': len(rows), 'ok': len(ok), 'rejected': rejected, 'errors': errors,
+        'error_rate': errors / len(rows), 'rejected_rate': rejected / len(rows),
+        'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99, 'max_ms': max(ok) * 1000 if ok else float('nan'),
+        'statuses': {str(s): sum(1 for r in rows if r[3] == s) for s in sorted({r[3] for r in rows})},
+        'sample_errors': sorted({r[5] for r in rows if r[5]})[:5]
+    }
+
+def _table_line(name, stats, duration):
+    return (f"{name:<22}{stats['requests']:>9}{stats['requests'] / duration:>8.2f}{stats['ok']:>7}"
+            f"{stats['rejected']:>6}{stats['errors']:>8}{100 * stats['error_rate']:>6.1f}%"
+            f"{stats['p50_ms']:>10.0f}{stats['p95_ms']:>10.0f}{stats['p99_ms']:>10.0f}{stats['max_ms']:>10.0f}")
+
+def percentile_table(results, duration):
+    """
+    One line per endpoint, uploads also per workbook size
+    Returns: (lines, {endpoint: stats})
+    """
+    lines = [f"{'Endpoint':<22}{'Requests':>9}{'req/s':>8}{'OK':>7}{'503':>6}{'Errors':>8}{'Err %':>7}"
+             f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+    report = {}
+    for endpoint in ENDPOINTS:
+        rows = [r for r in results if r[0] == endpoint]
+        if not rows:
+            continue
+        report[endpoint] = _summarize(rows)
+        lines.append(_table_line(endpoint, report[endpoint], duration))
+        labels = list(dict.fromkeys(r[6] for r in rows if r[6] is not None))
+        if len(labels) > 1:
+            report[endpoint]['by_workbook'] = {}
+            for label in labels:
+                stats = _summarize([r for r in rows if r[6] == label])
+                report[endpoint]['by_workbook'][label] = stats
+                lines.append(_table_line(f'  {label}', stats, duration))
+    return lines, report
+
+def rss_table(samples, max_lines=20):
+    if not samples:
+        return ['No RSS samples'], {}
+    workers = sorted({pid for _, sample in samples for pid in sample})
+    step = max(1, -(-len(samples) // max_lines))
+    shown = samples[::step]
+    if shown[-1] is not samples[-1]:
+        shown.append(samples[-1])
+    lines = [f"{'t (s)':>7}" + ''.join(f"{'pid ' + str(pid):>12}" for pid in workers) + f"{'total MB':>12}"]
+    for seconds, sample in shown:
+        lines.append(f"{seconds:>7.1f}" + ''.join(f"{sample.get(pid, 0) / 1024 / 1024:>12.1f}" for pid in workers)
+                     + f"{sum(sample.values()) / 1024 / 1024:>12.1f}")
+    peak_total = max(sum(sample.values()) for _, sample in samples)
+    peak_worker = max((max(sample.values(), default=0) for _, sample in samples), default=0)
+    lines.append(f"Peak: {peak_worker / 1024 / 1024:.1f} MB per worker, {peak_total / 1024 / 1024:.1f} MB total")
+    return lines, {
+        'peak_worker_mb': round(peak_worker / 1024 / 1024, 1),
+        'peak_total_mb': round(peak_total / 1024 / 1024, 1),
+        'samples': [{'t': round(seconds, 2), 'rss_mb': {str(pid): round(rss / 1024 / 1024, 1)
+                                                        for pid, rss in sample.items()}}
+                    for seconds, sample in samples]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the web app under gunicorn with synthetic workbooks')
+    parser.add_argument('-u', '--users', type=int, default=8, help='Concurrent virtual users (default: 8)')
+    parser.add_argument('-d', '--duration', type=float, default=120, help='Seconds of load (default: 120)')
+    parser.add_argument('--ramp-up', type=float, default=10, help='Seconds over which users start (default: 10)')
+    parser.add_argument('--think-time', type=float, default=0.5,
+                        help='Mean pause between requests of one user in seconds (default: 0.5)')
+    parser.add_argument('--children', default='200,1000,5000',
+                        help='Children per synthetic workbook, comma separated (default: 200,1000,5000)')
+    parser.add_argument('--variants', type=int, default=2, help='Workbooks per size, different data (default: 2)')
+    parser.add_argument('--multi-sheet', action='store_true', help='Also upload a workbook with one sheet per posyandu')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f'Endpoint weights after the first upload (default: {DEFAULT_MIX})')
+    parser.add_argument('--workers', type=int, default=1, help='gunicorn worker processes (default: 1, as in Procfile)')
+    parser.add_argument('--threads', type=int, default=8, help='gunicorn threads per worker (default: 8, as in Procfile)')
+    parser.add_argument('--env', action='append', default=[], metavar='NAME=VALUE',
+                        help='Environment for the app, e.g. HEAVY_MAX_CONCURRENT=4 (repeatable)')
+    parser.add_argument('--url', default=None, help='Test a running server instead of starting gunicorn')
+    parser.add_argument('--rss-interval', type=float, default=1.0, help='Seconds between RSS samples (default: 1)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('-o', '--output', default=None, help='Also write the full report as JSON')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.children.split(',') if size.strip()]
+    env_overrides = dict(item.split('=', 1) for item in args.env)
+
+    with tempfile.TemporaryDirectory(prefix='load_test_') as work_dir:
+        print(f"Generating workbooks: {', '.join(map(str, sizes))} children x {args.variants}"
+              + (' + multi sheet' if args.multi_sheet else ''))
+        workbooks = generate_workbooks(work_dir, sizes, args.variants, args.multi_sheet)
+
+        process = log = None
+        base_url = args.url.rstrip('/') if args.url else None
+        log_path = os.path.join(work_dir, 'gunicorn.log')
+        if base_url is None:
+            port = free_port()
+            base_url = f'http://127.0.0.1:{port}'
+            process, log = start_gunicorn(port, args.workers, args.threads, env_overrides, work_dir, log_path)
+        try:
+            wait_until_healthy(base_url, process)
+            sampler = None
+            if process is not None:
+                sampler = RssSampler(process.pid, args.rss_interval)
+                sampler.start()
+
+            print(f"Load: {args.users} users for {args.duration:.0f}s against {base_url} "
+                  f"({args.workers} worker(s) x {args.threads} threads)")
+            recorder = Recorder()
+            clock_start = time.perf_counter()
+            deadline = clock_start + args.duration
+            users = []
+            for i in range(args.users):
+                user = threading.Thread(target=virtual_user, args=(
+                    base_url, workbooks, args.mix, deadline, recorder, args.seed * 1000 + i,
+                    args.think_time, clock_start), daemon=True)
+                users.append(user)
+                user.start()
+                time.sleep(args.ramp_up / max(args.users, 1))
+            for user in users:
+                user.join()
+            elapsed = time.perf_counter() - clock_start
+            if sampler is not None:
+                sampler.stop()
+        finally:
+            if process is not None:
+                stop_gunicorn(process, log)
+
+        if process is not None and process.returncode not in (0, -signal.SIGTERM):
+            with open(log_path) as f:
+                print(f.read()[-2000:])
+
+    lines, endpoints = percentile_table(recorder.results, elapsed)
+    print()
+    print(f"Wall time:          {elapsed:.1f}s (includes requests still running at the deadline)")
+    print(f"Requests:           {len(recorder.results)}")
+    print('\n'.join(lines))
+    for endpoint, stats in endpoints.items():
+        if stats['sample_errors']:
+            print(f"{endpoint} errors: {'; '.join(stats['sample_errors'])}")
+
+    rss = {}
+    if sampler is not None:
+        print()
+        print('Worker RSS (MB, including child process pools)')
+        rss_lines, rss = rss_table(sampler.samples)
+        print('\n'.join(rss_lines))
+
+    if args.output:
+        report = {
+            'config': {'users': args.users, 'duration': args.duration, 'think_time': args.think_time,
+                       'children': sizes, 'variants': args.variants, 'multi_sheet': args.multi_sheet,
+                       'mix': args.mix, 'workers': args.workers, 'threads': args.threads,
+                       'env': env_overrides, 'url': args.url},
+            'wall_seconds': round(elapsed, 2),
+            'endpoints': endpoints,
+            'rss': rss,
+            'timeline': [{'endpoint': r[0], 't': round(r[1], 3), 'seconds': round(r[2], 4), 'status': r[3],
+                          'outcome': r[4], 'workbook': r[6]} for r in recorder.results]
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+if __name__ == '__main__':
+    main()
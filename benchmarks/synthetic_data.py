@@ -0,0 +1,131 @@
+"""
+Synthetic posyandu data for benchmarks and load tests
+"""
+import random
+from datetime import date, timedelta
+
+import openpyxl
+
+BULAN = ['JANUARI', 'FEBRUARI', 'MARET', 'APRIL', 'MEI', 'JUNI',
+         'JULI', 'AGUSTUS', 'SEPTEMBER', 'OKTOBER', 'NOVEMBER', 'DESEMBER']
+
+TEMPAT = ['Posyandu Melati', 'Posyandu Mawar', 'Posyandu Anggrek', 'Posyandu Kenanga',
+          'Posyandu Dahlia', 'Posyandu Flamboyan', 'Posyandu Cempaka', 'Posyandu Teratai']
+
+SUB_COLUMNS = ['TGL UKUR', 'UMUR', 'BERAT', 'TINGGI', 'CARA UKUR']
+
+def period_label(period_index, start_year=2024):
+    return f"{BULAN[period_index % 12]} {start_year + period_index // 12}"
+
+def _child_rows(n_children, n_periods, seed):
+    """
+    Yield (identity, measurements) tuples with a plausible growth trajectory per child
+    """
+    rng = random.Random(seed)
+    for i in range(n_children):
+        birth = date(2023, 1, 1) + timedelta(days=rng.randint(0, 360))
+        identity = {
+            'no': i + 1,
+            'tempat': rng.choice(TEMPAT),
+            'nik': str(3201000000000000 + i),
+            'nama_anak': f"Anak {i + 1}",
+            'tanggal_lahir': birth,
+            'jenis_kelamin': rng.choice('LP'),
+        }
+        tinggi = 60 + rng.random() * 10
+        berat = 6 + rng.random() * 3
+        measurements = []
+        for p in range(n_periods):
+            if rng.random() < 0.05:
+                measurements.append(None)
+                continue
+            tgl = date(2024 + p // 12, p % 12 + 1, rng.randint(5, 25))
+            umur = (tgl.year - birth.year) * 12 + tgl.month - birth.month
+            tinggi += rng.uniform(-0.5, 1.5)
+            berat += rng.uniform(-0.2, 0.4)
+            measurements.append({
+                'tgl_ukur': tgl,
+                'umur_bulan': max(umur, 0),
+                'berat_kg': round(berat, 1) if rng.random() > 0.05 else None,
+                'tinggi_cm': round(tinggi, 1),
+                'cara_ukur': rng.choice(['BERDIRI', 'TERLENTANG']),
+            })
+        yield identity, measurements
+
+def generate_children(n_children, n_periods=12, seed=42):
+    """
+    Build children in the JSON shape produced by extract_child_data (before assessment)
+    """
+    children = []
+    for identity, measurements in _child_rows(n_children, n_periods, seed):
+        child = dict(identity)
+        child['tanggal_lahir'] = identity['tanggal_lahir'].strftime('%Y-%m-%d')
+        child['measurements'] = []
+        for p, m in enumerate(measurements):
+            if m is None:
+                continue
+            measurement = dict(m)
+            measurement['periode'] = period_label(p)
+            measurement['tgl_ukur'] = m['tgl_ukur'].strftime('%Y-%m-%d')
+            measurement['has_complete_data'] = m['berat_kg'] is not None or m['tinggi_cm'] is not None
+            measurement['is_incomplete'] = not measurement['has_complete_data']
+            child['measurements'].append(measurement)
+        children.append(child)
+    return children
+
+def _fill_prd_sheet(ws, n_children, n_periods, seed):
+    """
+    Write PRD layout into a worksheet (merged period names in row 1, headers in row 2, data from row 3)
+    """
+    for col_idx, header in enumerate(['NO', 'TEMPAT', 'NIK', 'NAMA ANAK', 'TANGGAL LAHIR', 'JENIS KELAMIN'], 1):
+        ws.cell(row=2, column=col_idx, value=header)
+
+    for p in range(n_periods):
+        start_col = 7 + p * 5
+        ws.cell(row=1, column=start_col, value=period_label(p))
+        ws.merge_cells(start_row=1, start_column=start_col, end_row=1, end_column=start_col + 4)
+        for offset, header in enumerate(SUB_COLUMNS):
+            ws.cell(row=2, column=start_col + offset, value=header)
+
+    for r, (identity, measurements) in enumerate(_child_rows(n_children, n_periods, seed)):
+        row = [identity['no'], identity['tempat'], identity['nik'], identity['nama_anak'],
+               identity['tanggal_lahir'], identity['jenis_kelamin']]
+        for m in measurements:
+            if m is None:
+                row.extend([None] * 5)
+            else:
+                row.extend([m['tgl_ukur'], m['umur_bulan'], m['berat_kg'], m['tinggi_cm'], m['cara_ukur']])
+        for col_idx, value in enumerate(row, 1):
+            ws.cell(row=3 + r, column=col_idx, value=value)
+
+def write_prd_workbook(path, n_children, n_periods=12, seed=42, sheet_title='Sheet1'):
+    """
+    Write a PRD format workbook (merged period names in row 1, headers in row 2, data from row 3)
+    """
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = sheet_title
+    _fill_prd_sheet(ws, n_children, n_periods, seed)
+
+    wb.save(path)
+    wb.close()
+    return path
+
+def write_multi_sheet_workbook(path, sheet_titles, n_children_per_sheet, n_periods=12, seed=42, cover_sheet=True):
+    """
+    Write a consolidated workbook with one PRD sheet per posyandu (and an optional non-template cover sheet)
+    """
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    if cover_sheet:
+        ws.title = 'Keterangan'
+        ws['A1'] = 'Rekap data posyandu'
+    else:
+        wb.remove(ws)
+
+    for i, title in enumerate(sheet_titles):
+        _fill_prd_sheet(wb.create_sheet(title), n_children_per_sheet, n_periods, seed + i)
+
+    wb.save(path)
+    wb.close()
+    return path
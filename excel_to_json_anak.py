@@ -1,52 +1,174 @@
 import pandas as pd
 import json
 import os
+import posixpath
+import re
+import time
+import zipfile
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
+from xml.etree import ElementTree
+import numpy as np
 import openpyxl
+from openpyxl.utils import range_boundaries
+from kecepatan_pertumbuhan import apply_growth_velocity
+from konversi_kolom import (check_age, convert_dates, convert_integers, convert_numbers, convert_text,
+                            parse_iso_dates, to_python)
+from kualitas_data import check_data_quality, merge_data_quality
+from pengukuran import compact_children, json_default
+from pool_proses import discard_pool, get_pool
+from perbandingan_upload import CHILD_FIELDS, FINGERPRINT_MASK, child_hashes, keyed_by_period, measurement_hashes
+from profil_cpu import is_active as cpu_profile_active
+from profil_memori import is_enabled as memory_profile_enabled, stage
+from progres import track
+from ringkasan_anak import add_measurement, finish_summary, new_summary
+from periode import parse_period_key, period_sort_key, generate_period_labels
 
 # Global variable to store WHO data
 who_table = None
 
-def extract_period_names_from_merged_cells(file_path):
+# Compiled lookup built from who_table: (umur_bulan, jenis_kelamin) -> reference
+who_reference_index = {}
+_who_reference_source = None
+
+# Assess with the age computed from TANGGAL LAHIR and TGL UKUR instead of the entered UMUR
+COMPUTED_AGE_ENV = 'USE_COMPUTED_AGE'
+
+def use_computed_age():
     """
-    Extract period names from merged cells in Excel file
-    Returns list of period names in order
+    True when USE_COMPUTED_AGE is set (read from the environment so worker processes inherit it)
+    """
+    return os.environ.get(COMPUTED_AGE_ENV, '').lower() in ('1', 'true', 'yes')
+
+def select_worksheet(wb, sheet_name=None):
+    """
+    Worksheet by name, or the active sheet when no name is given
+    """
+    return wb[sheet_name] if sheet_name is not None else wb.active
+
+def open_worksheet(file_path, sheet_name=None):
+    """
+    Read-only workbook and one of its worksheets; the caller closes the workbook
     """
+    wb = openpyxl.load_workbook(file_path, read_only=True)
     try:
-        wb = openpyxl.load_workbook(file_path)
-        ws = wb.active
+        return wb, select_worksheet(wb, sheet_name)
+    except Exception:
+        wb.close()
+        raise
 
-        period_names = []
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
 
-        # Iterate through merged cells to find period names
-        for merge_range in ws.merged_cells.ranges:
-            min_col, min_row, max_col, max_row = merge_range.min_col, merge_range.min_row, merge_range.max_col, merge_range.max_row
+def _relationship_targets(archive, rels_path):
+    """
+    Id -> Target of a package relationships part
+    """
+    root = ElementTree.fromstring(archive.read(rels_path))
+    return {rel.get('Id'): rel.get('Target') for rel in root if _local_name(rel.tag) == 'Relationship'}
 
-            # Only process merged cells in row 1 (index 1 in openpyxl, which is row 1 in Excel)
-            if min_row == 1 and max_row == 1 and min_col >= 6:  # Start from column 6 (after identity columns)
-                cell_value = ws.cell(row=min_row, column=min_col).value
-                if cell_value:
-                    period_names.append(str(cell_value).strip())
+def _resolve_part(base_dir, target):
+    return target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join(base_dir, target))
+
+def worksheet_part(archive, sheet_title):
+    """
+    Zip member of the worksheet named sheet_title, from the workbook part and its relationships
+    """
+    package = ElementTree.fromstring(archive.read('_rels/.rels'))
+    workbook_path = next(_resolve_part('', rel.get('Target')) for rel in package
+                         if rel.get('Type', '').endswith('/officeDocument'))
+    workbook_dir, workbook_name = posixpath.split(workbook_path)
+    targets = _relationship_targets(archive, posixpath.join(workbook_dir, '_rels', workbook_name + '.rels'))
+
+    workbook = ElementTree.fromstring(archive.read(workbook_path))
+    for sheet in workbook.iter():
+        if _local_name(sheet.tag) != 'sheet' or sheet.get('name') != sheet_title:
+            continue
+        relationship_id = next(value for key, value in sheet.attrib.items() if _local_name(key) == 'id')
+        return _resolve_part(workbook_dir, targets[relationship_id])
+    raise KeyError(f"Worksheet '{sheet_title}' not found")
+
+_MERGE_CELL = re.compile(rb'<(?:\w+:)?mergeCell\b[^>]*?\bref="([A-Z]+\d+:[A-Z]+\d+)"')
 
-        # Sort period names by column position
+def merged_cell_ranges(ws, file_path=None):
+    """
+    (min_col, min_row, max_col, max_row) of every merged range of a worksheet
+    Read-only worksheets do not parse merges: the sheet's XML part is then read from the
+    xlsx (file_path) and scanned for <mergeCell ref=...> in chunks. A byte scan, because
+    the merges follow all cell data and an XML parser takes ~10x longer to get there.
+    """
+    if hasattr(ws, 'merged_cells'):
+        return [(r.min_col, r.min_row, r.max_col, r.max_row) for r in ws.merged_cells.ranges]
+
+    ranges = set()
+    tail = b''
+    with zipfile.ZipFile(file_path) as archive:
+        with archive.open(worksheet_part(archive, ws.title)) as source:
+            while True:
+                chunk = source.read(1 << 20)
+                if not chunk:
+                    break
+                buffer = tail + chunk
+                for match in _MERGE_CELL.finditer(buffer):
+                    ranges.add(range_boundaries(match.group(1).decode()))
+                # Keep enough of the end to match a tag split across two chunks
+                tail = buffer[-256:]
+    return sorted(ranges, key=lambda r: (r[1], r[0]))
+
+def header_rows(ws, count=2):
+    """
+    Values of the first count rows (missing rows as empty tuples)
+    """
+    rows = list(ws.iter_rows(min_row=1, max_row=count, values_only=True))
+    return rows + [()] * (count - len(rows))
+
+def read_sheet(file_path, sheet_name=None):
+    """
+    pandas read of one sheet (the first sheet when no name is given)
+    """
+    return pd.read_excel(file_path, sheet_name=sheet_name if sheet_name is not None else 0)
+
+def extract_period_names_from_merged_cells(file_path, sheet_name=None, ws=None):
+    """
+    Extract period names from merged cells in Excel file
+    ws: worksheet already opened by the caller (the file is not opened again)
+    Returns list of period names in order
+    """
+    wb = None
+    try:
+        if ws is None:
+            wb, ws = open_worksheet(file_path, sheet_name)
+
+        first_row = header_rows(ws, 1)[0]
+
+        # Merged cells in row 1 from column 6 on (after identity columns), sorted by column position
         period_names_with_col = []
-        for merge_range in ws.merged_cells.ranges:
-            min_col, min_row, max_col, max_row = merge_range.min_col, merge_range.min_row, merge_range.max_col, merge_range.max_row
+        for min_col, min_row, max_col, max_row in merged_cell_ranges(ws, file_path):
             if min_row == 1 and max_row == 1 and min_col >= 6:
-                cell_value = ws.cell(row=min_row, column=min_col).value
+                cell_value = first_row[min_col - 1] if min_col <= len(first_row) else None
                 if cell_value:
                     period_names_with_col.append((min_col, str(cell_value).strip()))
 
         period_names_with_col.sort(key=lambda x: x[0])
-        period_names = [name for col, name in period_names_with_col]
-
-        wb.close()
-        return period_names
+        return [name for col, name in period_names_with_col]
 
     except Exception as e:
         print(f"Error extracting period names from merged cells: {str(e)}")
         # Fallback to default period names
         return []
+    finally:
+        if wb is not None:
+            wb.close()
+
+def sort_period_columns(period_columns):
+    """
+    Parse every period name into a canonical YYYYMM key and sort the period columns
+    chronologically once per dataset, so each child's measurements are extracted pre-sorted
+    """
+    for period in period_columns:
+        period['period_key'] = parse_period_key(period['period_name'])
+    period_columns.sort(key=lambda p: period_sort_key(p['period_key']))
+    return period_columns
 
 def load_who_table():
     """
@@ -70,66 +192,82 @@ def load_who_table():
 
     return who_table
 
-def get_who_reference(umur_bulan, jenis_kelamin):
+def _parse_range(range_str):
     """
-    Get WHO reference data for age and gender
-    Returns: (min_bb, max_bb, min_tb, max_tb) or None if out of range
+    Parse ranges like "5.3-8.8" to (min, max) values, (None, None) if not a range
     """
-    if who_table is None or who_table.empty:
-        return None
-
     try:
-        umur_bulan = int(umur_bulan)
-        if umur_bulan < 0 or umur_bulan > 59:  # WHO table covers 0-59 months
-            return None
-
-        # Find row for this age
-        age_row = who_table[who_table['Umur'] == umur_bulan]
-        if age_row.empty:
-            return None
-
-        age_data = age_row.iloc[0]
-
-        # Select columns based on gender - handle None case
-        if not jenis_kelamin:
-            return None
-
-        jk_upper = str(jenis_kelamin).upper()
-        if jk_upper == 'L':
-            bb_col = 'BB Ideal (L)'
-            tb_col = 'PB Ideal (L)'
-        elif jk_upper == 'P':
-            bb_col = 'BB Ideal (P)'
-            tb_col = 'PB Ideal (P)'
+        if '-' in str(range_str):
+            min_val, max_val = str(range_str).split('-')
+            return float(min_val.strip()), float(max_val.strip())
         else:
-            return None
+            return None, None
+    except:
+        return None, None
 
-        # Parse ranges like "5.3-8.8" to min and max values
-        def parse_range(range_str):
-            try:
-                if '-' in str(range_str):
-                    min_val, max_val = str(range_str).split('-')
-                    return float(min_val.strip()), float(max_val.strip())
-                else:
-                    return None, None
-            except:
-                return None, None
+def compile_who_reference(table):
+    """
+    Compile the WHO table into a dict (umur_bulan, 'L'/'P') -> reference, parsed once,
+    so each lookup is a dict access instead of a DataFrame filter
+    """
+    compiled = {}
+    if table is None or table.empty:
+        return compiled
 
-        min_bb, max_bb = parse_range(age_data[bb_col])
-        min_tb, max_tb = parse_range(age_data[tb_col])
+    columns = {'L': ('BB Ideal (L)', 'PB Ideal (L)'), 'P': ('BB Ideal (P)', 'PB Ideal (P)')}
+    for age_data in table.to_dict(orient='records'):
+        try:
+            umur = int(age_data['Umur'])
+            if umur != float(age_data['Umur']):
+                continue
+        except (KeyError, ValueError, TypeError):
+            continue
+        for jk, (bb_col, tb_col) in columns.items():
+            # First row for an age wins, as with the previous DataFrame lookup
+            if (umur, jk) in compiled or bb_col not in age_data or tb_col not in age_data:
+                continue
+            min_bb, max_bb = _parse_range(age_data[bb_col])
+            min_tb, max_tb = _parse_range(age_data[tb_col])
+            compiled[(umur, jk)] = {
+                'min_bb': min_bb,
+                'max_bb': max_bb,
+                'min_tb': min_tb,
+                'max_tb': max_tb,
+                'rentang_bb_ideal': f"{min_bb}-{max_bb}" if min_bb and max_bb else None,
+                'rentang_tb_ideal': f"{min_tb}-{max_tb}" if min_tb and max_tb else None
+            }
+    return compiled
 
-        return {
-            'min_bb': min_bb,
-            'max_bb': max_bb,
-            'min_tb': min_tb,
-            'max_tb': max_tb,
-            'rentang_bb_ideal': f"{min_bb}-{max_bb}" if min_bb and max_bb else None,
-            'rentang_tb_ideal': f"{min_tb}-{max_tb}" if min_tb and max_tb else None
-        }
-    except Exception as e:
-        print(f"Error getting WHO reference: {str(e)}")
+def lookup_who_reference(compiled, umur_bulan, jenis_kelamin):
+    """
+    Look up a compiled WHO reference (shared, read-only dict) or None if out of range
+    """
+    try:
+        umur_bulan = int(umur_bulan)
+    except (ValueError, TypeError, OverflowError):
+        return None
+    if umur_bulan < 0 or umur_bulan > 59:  # WHO table covers 0-59 months
+        return None
+    if not jenis_kelamin:
+        return None
+    return compiled.get((umur_bulan, str(jenis_kelamin).upper()))
+
+def get_who_reference(umur_bulan, jenis_kelamin):
+    """
+    Get WHO reference data for age and gender
+    Returns: dict (min_bb, max_bb, min_tb, max_tb, rentang_*_ideal) or None if out of range
+    """
+    global who_reference_index, _who_reference_source
+    if who_table is None or who_table.empty:
         return None
 
+    # Recompile when the global table was (re)loaded
+    if _who_reference_source is not who_table:
+        who_reference_index = compile_who_reference(who_table)
+        _who_reference_source = who_table
+
+    return lookup_who_reference(who_reference_index, umur_bulan, jenis_kelamin)
+
 def assess_nutritional_status(berat_kg, tinggi_cm, who_ref):
     """
     Assess nutritional status based on WHO reference
@@ -230,14 +368,36 @@ def apply_assessment_rules(child_data):
     """
     Apply WHO assessment rules and height rationality validation to child measurements
     Now applies assessment to ALL measurements (complete AND incomplete)
+    and stores the per-child summary (ringkasan_anak) as child_data['summary']
+    """
+    assess_child_measurements(child_data, get_who_reference, use_computed_age())
+
+def assess_children(children):
+    """
+    Apply WHO assessment and height validation to every extracted child
+    """
+    computed_age = use_computed_age()
+    with stage('assessment'):
+        for child_data in track(children, 'assessment', len(children)):
+            assess_child_measurements(child_data, get_who_reference, computed_age)
+
+def assess_child_measurements(child_data, reference_lookup, computed_age=False):
+    """
+    Assessment pass for one child; reference_lookup(umur_bulan, jenis_kelamin) returns the WHO reference
+    computed_age: look up the WHO reference by umur_bulan_hitung when it is known
+    The child's summary (counts, latest measurement, worst status, DANGER) is built in the same loop
     """
     try:
         # Apply height rationality validation first
         validate_height_rationality(child_data['measurements'])
 
+        summary = new_summary()
+
         # Apply WHO assessment for ALL measurements (complete AND incomplete)
         for measurement in child_data['measurements']:
             umur_bulan = measurement.get('umur_bulan')
+            if computed_age and measurement.get('umur_bulan_hitung') is not None:
+                umur_bulan = measurement['umur_bulan_hitung']
             jenis_kelamin = child_data.get('jenis_kelamin')
             berat_kg = measurement.get('berat_kg')
             tinggi_cm = measurement.get('tinggi_cm')
@@ -245,7 +405,7 @@ def apply_assessment_rules(child_data):
             # Get WHO reference for this age and gender (even if incomplete data)
             # Skip if jenis_kelamin is None or umur_bulan is None
             if jenis_kelamin and umur_bulan is not None:
-                who_ref = get_who_reference(umur_bulan, jenis_kelamin)
+                who_ref = reference_lookup(umur_bulan, jenis_kelamin)
             else:
                 who_ref = None
 
@@ -280,68 +440,196 @@ def apply_assessment_rules(child_data):
             # No need to change status for incomplete data - "TIDAK LENGKAP" is already appropriate
             # This ensures assessment data is displayed consistently for all measurements
 
+            add_measurement(summary, measurement)
+
+        child_data['summary'] = finish_summary(summary)
+
     except Exception as e:
         print(f"Error applying assessment rules: {str(e)}")
 
-def process_excel_to_json(file_path):
+def process_excel_to_json(file_path, max_workers=None):
     """
     Convert Excel file to JSON format for Balita Growth data
     Supports multiple formats:
     1. PRD Format: Header di baris 1, sub-header di baris 2, data di baris 3+
     2. Header Format: Header TGL UKUR, UMUR, dll di baris 1, data di baris 2+
     3. Direct Data: Data langsung tanpa header
+    Every worksheet that matches a supported format is processed (in a process pool
+    when there are several) and merged into one result; children carry their 'sheet'
     """
+    try:
+        sheet_names = list_sheet_names(file_path)
+    except Exception as e:
+        return {
+            'error': f'Error processing file: {str(e)}',
+            'file_name': os.path.basename(file_path)
+        }
+
+    if len(sheet_names) <= 1:
+        sheet_results = [process_sheet(file_path, sheet_names[0] if sheet_names else None)]
+    else:
+        workers = min(max_workers or os.cpu_count() or 1, len(sheet_names))
+        # Stage profiles are recorded in this process only
+        if memory_profile_enabled() or cpu_profile_active():
+            workers = 1
+        if workers <= 1:
+            sheet_results = [process_sheet(file_path, sheet_name) for sheet_name in sheet_names]
+        else:
+            # Shared long-lived pool (pool_proses), never forked from the threaded server process
+            pool = get_pool('ingest', min(max_workers or os.cpu_count() or 1, os.cpu_count() or 1))
+            try:
+                # Sheets run in worker processes: progress is reported per finished sheet
+                sheet_results = list(track(pool.map(process_sheet, [file_path] * len(sheet_names), sheet_names),
+                                           'sheets', len(sheet_names)))
+            except BrokenProcessPool:
+                discard_pool('ingest', pool)
+                raise
+
+    return merge_sheet_results(file_path, sheet_results)
+
+def process_sheet(file_path, sheet_name=None):
+    """
+    Detect the format of one worksheet and process it (runs in a worker process)
+    The workbook is opened once, read-only, for detection, period names and PRD rows
+    Returns: (sheet_name, result, seconds)
+    """
+    start = time.perf_counter()
+    wb = None
     try:
         # Load WHO reference table first
         load_who_table()
 
+        with stage('workbook_load'):
+            wb, ws = open_worksheet(file_path, sheet_name)
+
         # Detect format
-        format_type, format_description = detect_excel_format(file_path)
+        with stage('format_detection'):
+            format_type, format_description = detect_excel_format(file_path, sheet_name, ws=ws)
 
         if format_type == 'prd_format':
-            return process_prd_format(file_path)
+            result = process_prd_format(file_path, sheet_name, ws=ws)
         elif format_type == 'header_format':
-            return process_header_format(file_path)
+            result = process_header_format(file_path, sheet_name)
         elif format_type == 'direct_data':
-            return process_direct_data_format(file_path)
+            result = process_direct_data_format(file_path, sheet_name)
         else:
-            return {
+            result = {
                 'error': f'Format tidak didukung: {format_description}',
                 'file_name': os.path.basename(file_path),
                 'format_detected': format_type
             }
 
+        # Growth velocity is computed across all children at once (vectorized)
+        if 'error' not in result:
+            with stage('growth_velocity'):
+                apply_growth_velocity(result['children'])
+            for child in result['children']:
+                child['sheet'] = sheet_name
+            for row_errors in result.get('coercion_errors', []):
+                row_errors['sheet'] = sheet_name
+            with stage('data_quality'):
+                result['data_quality'] = check_data_quality(result['children'])
+            # Assessment is complete: keep measurements as compact records from here on
+            with stage('compaction'):
+                compact_children(result['children'])
+
     except Exception as e:
-        return {
+        result = {
             'error': f'Error processing file: {str(e)}',
             'file_name': os.path.basename(file_path)
         }
+    finally:
+        if wb is not None:
+            wb.close()
+
+    return sheet_name, result, round(time.perf_counter() - start, 4)
+
+def merge_sheet_results(file_path, sheet_results):
+    """
+    Merge per-sheet results into one dataset, with a per-sheet report (format, children, time, error)
+    A single-sheet workbook keeps its result as is (plus the report)
+    """
+    sheets = []
+    succeeded = []
+    for sheet_name, result, seconds in sheet_results:
+        sheets.append({
+            'name': sheet_name,
+            'format_type': result.get('format_type'),
+            'total_children': result.get('total_children', 0),
+            'seconds': seconds,
+            'error': result.get('error')
+        })
+        if 'error' not in result:
+            succeeded.append(result)
+
+    if not succeeded:
+        # Report the first failure, as for a single-sheet workbook
+        result = dict(sheet_results[0][1]) if sheet_results else {'error': 'Workbook tidak memiliki sheet'}
+        result['file_name'] = os.path.basename(file_path)
+        result['sheets'] = sheets
+        return result
+
+    if len(succeeded) == 1:
+        result = succeeded[0]
+        result['sheets'] = sheets
+        return result
+
+    children = []
+    coercion_errors = []
+    data_quality = []
+    periods = {}
+    for result in succeeded:
+        if 'data_quality' in result:
+            data_quality.append((result['data_quality'], len(children)))
+        children.extend(result['children'])
+        coercion_errors.extend(result.get('coercion_errors', []))
+        for period_name, period_key in zip(result['periods'], result['period_keys']):
+            periods.setdefault(period_name, period_key)
+
+    ordered_periods = sorted(periods.items(), key=lambda item: period_sort_key(item[1]))
+    format_types = list(dict.fromkeys(result['format_type'] for result in succeeded))
+
+    return {
+        'file_name': os.path.basename(file_path),
+        'format_type': format_types[0] if len(format_types) == 1 else ' + '.join(format_types),
+        'total_children': len(children),
+        'total_periods': len(ordered_periods),
+        'periods': [name for name, _ in ordered_periods],
+        'period_keys': [key for _, key in ordered_periods],
+        'coercion_errors': coercion_errors,
+        'data_quality': merge_data_quality(data_quality, children),
+        'sheets': sheets,
+        'children': children
+    }
 
-def process_prd_format(file_path):
+def process_prd_format(file_path, sheet_name=None, ws=None):
     """
     Process PRD format Excel file with merged cells for period names
     Row 1: Merged cells for period names (JANUARI 2024, FEBRUARI 2024, etc.)
     Row 2: Headers (NO, NIK, NAMA ANAK, TANGGAL LAHIR, JENIS KELAMIN, TGL UKUR, UMUR, etc.)
     Row 3+: Data
+    ws: worksheet already opened by the caller (read-only), otherwise the file is opened here
     """
+    wb = None
     try:
-        # Extract period names from merged cells
-        period_names = extract_period_names_from_merged_cells(file_path)
+        if ws is None:
+            with stage('workbook_load'):
+                wb, ws = open_worksheet(file_path, sheet_name)
 
-        # Read data with openpyxl to properly handle the structure
-        wb = openpyxl.load_workbook(file_path)
-        ws = wb.active
+        # Extract period names from merged cells
+        period_names = extract_period_names_from_merged_cells(file_path, sheet_name, ws=ws)
 
-        # Determine the data structure
+        # Determine the data structure (read-only sheets without a stored dimension are measured)
+        if not ws.max_row or not ws.max_column:
+            ws.calculate_dimension(force=True)
         max_row = ws.max_row
         max_col = ws.max_column
 
-        # Get headers from row 2 (index 2 in openpyxl)
+        # Get headers from row 2
         headers = {}
-        for col_idx in range(1, max_col + 1):
-            cell_value = ws.cell(row=2, column=col_idx).value
+        for col_idx, cell_value in enumerate(header_rows(ws)[1][:max_col]):
             if cell_value:
-                headers[col_idx - 1] = str(cell_value).strip()  # Convert to 0-based index
+                headers[col_idx] = str(cell_value).strip()  # 0-based index
 
         # Find period columns based on headers (start after 6 identity columns)
         period_columns = []
@@ -380,30 +668,17 @@ def process_prd_format(file_path):
                 'sub_columns': sub_columns
             })
 
-        # Process data from row 3 onwards (index 3 in openpyxl)
-        children = []
-        for row_idx in range(3, max_row + 1):  # 1-based for openpyxl
-            # Read the entire row
-            row_data = []
-            for col_idx in range(1, max_col + 1):
-                cell_value = ws.cell(row=row_idx, column=col_idx).value
-                row_data.append(cell_value)
-
-            # Convert to pandas Series for compatibility with extract_child_data
-            import pandas as pd
-            row_series = pd.Series(row_data)
-
-            # Skip empty rows
-            if row_series.isna().all():
-                continue
+        sort_period_columns(period_columns)
 
-            child_data = extract_child_data(row_series, period_columns, start_col=0)
-            if child_data['nama_anak'] or child_data['nik']:
-                # Apply WHO assessment and height validation
-                apply_assessment_rules(child_data)
-                children.append(child_data)
+        # Process data from row 3 onwards (index 3 in openpyxl), converted column by column
+        with stage('row_extraction'):
+            rows = list(track(ws.iter_rows(min_row=3, max_row=max_row, max_col=max_col, values_only=True),
+                              'row_extraction', max(max_row - 2, 0)))
+            frame = pd.DataFrame(rows, columns=range(max_col), dtype=object)
+            children, coercion_errors = extract_children(frame, period_columns, first_row_number=3)
 
-        wb.close()
+        # Apply WHO assessment and height validation
+        assess_children(children)
 
         return {
             'file_name': os.path.basename(file_path),
@@ -411,6 +686,8 @@ def process_prd_format(file_path):
             'total_children': len(children),
             'total_periods': len(period_columns),
             'periods': [p['period_name'] for p in period_columns],
+            'period_keys': [p['period_key'] for p in period_columns],
+            'coercion_errors': coercion_errors,
             'children': children
         }
 
@@ -419,13 +696,17 @@ def process_prd_format(file_path):
             'error': f'Error processing PRD format: {str(e)}',
             'file_name': os.path.basename(file_path)
         }
+    finally:
+        if wb is not None:
+            wb.close()
 
-def process_header_format(file_path):
+def process_header_format(file_path, sheet_name=None):
     """
     Process header format Excel file (header TGL UKUR, UMUR, dll di baris 1)
     """
     try:
-        df = pd.read_excel(file_path)
+        with stage('workbook_load'):
+            df = read_sheet(file_path, sheet_name)
         data_rows = df.iloc[1:].copy()  # Skip header row
         data_rows = data_rows.reset_index(drop=True)
 
@@ -433,11 +714,8 @@ def process_header_format(file_path):
         header_row = df.iloc[0].fillna('')
         period_columns = []
 
-        # Period names for sequential measurements
-        period_names = ['Jan 2025', 'Feb 2025', 'Mar 2025', 'Apr 2025', 'May 2025', 'Jun 2025',
-                       'Jul 2025', 'Aug 2025', 'Sep 2025', 'Oct 2025', 'Nov 2025', 'Dec 2025',
-                       'Jan 2024', 'Feb 2024', 'Mar 2024', 'Apr 2024', 'May 2024', 'Jun 2024',
-                       'Jul 2024', 'Aug 2024', 'Sep 2024', 'Oct 2024', 'Nov 2024', 'Dec 2024']
+        # Period names for sequential measurements (chronological from Jan 2025)
+        period_names = generate_period_labels(2025, 1, 24)
 
         sub_columns = []
         period_index = 0
@@ -465,16 +743,14 @@ def process_header_format(file_path):
                 'sub_columns': sub_columns
             })
 
-        children = []
-        for idx, row in data_rows.iterrows():
-            if row.isna().all():
-                continue
+        sort_period_columns(period_columns)
 
-            child_data = extract_child_data(row, period_columns, start_col=0)
-            if child_data['nama_anak'] or child_data['nik']:
-                # Apply WHO assessment and height validation
-                apply_assessment_rules(child_data)
-                children.append(child_data)
+        # Excel row 1 is the pandas header and row 2 the sub-header: data starts at row 3
+        with stage('row_extraction'):
+            children, coercion_errors = extract_children(data_rows, period_columns, first_row_number=3)
+
+        # Apply WHO assessment and height validation
+        assess_children(children)
 
         return {
             'file_name': os.path.basename(file_path),
@@ -482,6 +758,8 @@ def process_header_format(file_path):
             'total_children': len(children),
             'total_periods': len(period_columns),
             'periods': [p['period_name'] for p in period_columns],
+            'period_keys': [p['period_key'] for p in period_columns],
+            'coercion_errors': coercion_errors,
             'children': children
         }
 
@@ -491,31 +769,34 @@ def process_header_format(file_path):
             'file_name': os.path.basename(file_path)
         }
 
-def process_direct_data_format(file_path):
+def process_direct_data_format(file_path, sheet_name=None):
     """
     Process direct data format (data starts from first row)
     """
     try:
-        df = pd.read_excel(file_path)
+        with stage('workbook_load'):
+            df = read_sheet(file_path, sheet_name)
 
-        children = []
-        for idx, row in df.iterrows():
-            if row.isna().all():
-                continue
+        period_names = generate_period_labels(2025, 1, 9)
 
-            # For direct format, assume structure: NO, NIK, NAMA, TGL LAHIR, JENIS KELAMIN, then measurements
-            child_data = extract_child_data_direct_format(row)
-            if child_data['nama_anak'] or child_data['nik']:
-                # Apply WHO assessment and height validation
-                apply_assessment_rules(child_data)
-                children.append(child_data)
+        # For direct format, assume structure: NO, NIK, NAMA, TGL LAHIR, JENIS KELAMIN, then measurements
+        # (Excel row 1 is read as the pandas header, data starts at row 2)
+        with stage('row_extraction'):
+            period_columns = direct_period_columns(period_names, df.shape[1])
+            children, coercion_errors = extract_children(df, period_columns, DIRECT_IDENTITY_COLUMNS,
+                                                         first_row_number=2)
+
+        # Apply WHO assessment and height validation
+        assess_children(children)
 
         return {
             'file_name': os.path.basename(file_path),
             'format_type': 'Direct Data Format',
             'total_children': len(children),
             'total_periods': 'Multiple (detected from data)',
-            'periods': ['Jan 2025', 'Feb 2025', 'Mar 2025', 'Apr 2025', 'May 2025', 'Jun 2025', 'Jul 2025', 'Aug 2025', 'Sep 2025'],
+            'periods': period_names,
+            'period_keys': [parse_period_key(name) for name in period_names],
+            'coercion_errors': coercion_errors,
             'children': children
         }
 
@@ -525,210 +806,187 @@ def process_direct_data_format(file_path):
             'file_name': os.path.basename(file_path)
         }
 
-def extract_child_data(row, period_columns, start_col=0):
+# Identity columns of the PRD / header templates, and of the direct format (no TEMPAT)
+IDENTITY_COLUMNS = (('no', 0), ('tempat', 1), ('nik', 2), ('nama_anak', 3), ('tanggal_lahir', 4), ('jenis_kelamin', 5))
+DIRECT_IDENTITY_COLUMNS = (('no', 0), ('nik', 1), ('nama_anak', 2), ('tanggal_lahir', 3), ('jenis_kelamin', 4))
+IDENTITY_HEADERS = {
+    'no': 'NO', 'tempat': 'TEMPAT', 'nik': 'NIK', 'nama_anak': 'NAMA ANAK',
+    'tanggal_lahir': 'TANGGAL LAHIR', 'jenis_kelamin': 'JENIS KELAMIN'
+}
+
+def direct_period_columns(period_names, n_columns):
     """
-    Extract child data from a row given period columns configuration
+    Period columns of the direct format: 5 sub-columns per period after the 5 identity columns
     """
-    child_data = {
-        'no': None,
-        'tempat': None,
-        'nik': None,
-        'nama_anak': None,
-        'tanggal_lahir': None,
-        'jenis_kelamin': None,
-        'measurements': []
-    }
+    period_columns = []
+    for i, period_name in enumerate(period_names):
+        base_col = 5 + i * 5
+        if base_col + 4 < n_columns:
+            period_columns.append({
+                'period_name': period_name,
+                'period_key': parse_period_key(period_name),
+                'sub_columns': [(base_col + j, name) for j, name in
+                                enumerate(['TGL UKUR', 'UMUR', 'BERAT', 'TINGGI', 'CARA UKUR'])]
+            })
+    return period_columns
 
-    try:
-        # Extract identity information (first 6 columns: NO, TEMPAT, NIK, NAMA ANAK, TANGGAL LAHIR, JENIS KELAMIN)
-        if len(row) > start_col:
-            child_data['no'] = int(row.iloc[start_col]) if not pd.isna(row.iloc[start_col]) else None
-        if len(row) > start_col + 1:
-            child_data['tempat'] = str(row.iloc[start_col + 1]).strip() if not pd.isna(row.iloc[start_col + 1]) else None
-        if len(row) > start_col + 2:
-            child_data['nik'] = str(row.iloc[start_col + 2]).strip() if not pd.isna(row.iloc[start_col + 2]) else None
-        if len(row) > start_col + 3:
-            child_data['nama_anak'] = str(row.iloc[start_col + 3]).strip() if not pd.isna(row.iloc[start_col + 3]) else None
-        if len(row) > start_col + 4:
-            if not pd.isna(row.iloc[start_col + 4]):
-                if isinstance(row.iloc[start_col + 4], datetime):
-                    child_data['tanggal_lahir'] = row.iloc[start_col + 4].strftime('%Y-%m-%d')
-                else:
-                    try:
-                        date_obj = pd.to_datetime(row.iloc[start_col + 4])
-                        child_data['tanggal_lahir'] = date_obj.strftime('%Y-%m-%d')
-                    except:
-                        child_data['tanggal_lahir'] = str(row.iloc[start_col + 4])
-        if len(row) > start_col + 5:
-            child_data['jenis_kelamin'] = str(row.iloc[start_col + 5]).strip().upper() if not pd.isna(row.iloc[start_col + 5]) else None
-
-        # Process measurements
-        for period in period_columns:
-            measurement = {
-                'periode': period['period_name'],
-                'tgl_ukur': None,
-                'umur_bulan': None,
-                'berat_kg': None,
-                'tinggi_cm': None,
-                'cara_ukur': None
-            }
+def extract_children(frame, period_columns, identity_columns=IDENTITY_COLUMNS, first_row_number=1, drop_empty=True):
+    """
+    Extract children from all data rows at once: every column is converted in one pass
+    (konversi_kolom), then the child and measurement dicts are assembled.
+    frame: data rows only, columns by position; first_row_number: Excel row of the first data row
+    drop_empty: skip empty rows and rows without NAMA ANAK and NIK
+    Returns: (children, coercion_errors) - children carry their Excel 'row', measurements the age
+    computed from the dates (umur_bulan_hitung) and whether the entered UMUR disagrees (umur_tidak_sesuai);
+    children and measurements carry a 'fingerprint' for comparing uploads (perbandingan_upload);
+    coercion_errors lists the cells that could not be read, grouped per row
+    """
+    frame = frame.reset_index(drop=True)
+    frame.columns = range(frame.shape[1])
+    n_columns = frame.shape[1]
+    row_numbers = np.arange(len(frame)) + first_row_number
+    if drop_empty and len(frame):
+        non_empty = frame.notna().any(axis=1).to_numpy()
+        frame = frame[non_empty].reset_index(drop=True)
+        row_numbers = row_numbers[non_empty]
+    n_rows = len(frame)
+
+    cell_errors = {}
+
+    def report(invalid, column, period, values):
+        for pos in np.flatnonzero(invalid):
+            cell_errors.setdefault(pos, []).append({'column': column, 'period': period, 'value': str(values.iat[pos])})
+
+    identity = {}
+    for field, col_idx in identity_columns:
+        if col_idx >= n_columns:
+            identity[field] = [None] * n_rows
+            continue
+        values = frame[col_idx]
+        if field == 'no':
+            numbers, invalid = convert_integers(values)
+            identity[field] = to_python(numbers, integer=True)
+            report(invalid, IDENTITY_HEADERS[field], None, values)
+        elif field == 'tanggal_lahir':
+            identity[field], invalid = convert_dates(values)
+            report(invalid, IDENTITY_HEADERS[field], None, values)
+        else:
+            identity[field] = convert_text(values, upper=(field == 'jenis_kelamin'))
+
+    fields = [field for field, _ in identity_columns]
+    children = [dict(zip(fields, row_values), row=row_number, measurements=[])
+                for row_number, *row_values in zip(row_numbers.tolist(), *(identity[field] for field in fields))]
+
+    empty = [None] * n_rows
+    no_numbers = np.full(n_rows, np.nan)
+    no_mismatch = [False] * n_rows
+    tanggal_lahir = parse_iso_dates(identity['tanggal_lahir']).to_numpy() if 'tanggal_lahir' in identity else None
+    period_sums = np.zeros(n_rows, dtype=np.uint64)
+    for period in period_columns:
+        period_name = period['period_name']
+        period_key = period.get('period_key')
+
+        # Any filled sub-column cell makes a measurement (complete or incomplete)
+        has_any_data = np.zeros(n_rows, dtype=bool)
+        columns = {}
+        for col_idx, sub_col_name in period['sub_columns']:
+            if col_idx < n_columns:
+                has_any_data |= frame[col_idx].notna().to_numpy()
+                columns[str(sub_col_name).strip().upper()] = col_idx
+        if not has_any_data.any():
+            continue
 
-            has_complete_data = False
-            has_any_data = False
-
-            for col_idx, sub_col_name in period['sub_columns']:
-                if col_idx < len(row):
-                    value = row.iloc[col_idx]
-                    if not pd.isna(value):
-                        has_any_data = True
-
-                        if sub_col_name == 'TGL UKUR':
-                            if isinstance(value, datetime):
-                                measurement['tgl_ukur'] = value.strftime('%Y-%m-%d')
-                            else:
-                                try:
-                                    date_obj = pd.to_datetime(value)
-                                    measurement['tgl_ukur'] = date_obj.strftime('%Y-%m-%d')
-                                except:
-                                    measurement['tgl_ukur'] = str(value)
-                        elif sub_col_name == 'UMUR':
-                            try:
-                                measurement['umur_bulan'] = int(float(value))
-                            except (ValueError, TypeError):
-                                measurement['umur_bulan'] = None
-                        elif sub_col_name == 'BERAT':
-                            try:
-                                measurement['berat_kg'] = float(value)
-                                has_complete_data = True  # Berat adalah data kunci
-                            except (ValueError, TypeError):
-                                measurement['berat_kg'] = None
-                        elif sub_col_name == 'TINGGI':
-                            try:
-                                measurement['tinggi_cm'] = float(value)
-                                has_complete_data = True  # Tinggi adalah data kunci
-                            except (ValueError, TypeError):
-                                measurement['tinggi_cm'] = None
-                        elif sub_col_name == 'CARA UKUR':
-                            measurement['cara_ukur'] = str(value).strip().upper()
-
-            # Add status flags for UI display
-            measurement['has_complete_data'] = has_complete_data
-            measurement['is_incomplete'] = has_any_data and not has_complete_data
-
-            # Always add measurement (complete or incomplete) for JSON output
-            # UI will filter based on has_complete_data for count, but show all for transparency
-            if has_any_data:
-                child_data['measurements'].append(measurement)
+        tgl_ukur, umur, berat, tinggi, cara_ukur = empty, empty, no_numbers, no_numbers, empty
+        umur_numbers, umur_hitung, umur_tidak_sesuai = no_numbers, empty, no_mismatch
+        if 'TGL UKUR' in columns:
+            values = frame[columns['TGL UKUR']]
+            tgl_ukur, invalid = convert_dates(values)
+            report(invalid, 'TGL UKUR', period_name, values)
+        if 'UMUR' in columns:
+            values = frame[columns['UMUR']]
+            umur_numbers, invalid = convert_integers(values)
+            umur = to_python(umur_numbers, integer=True)
+            report(invalid, 'UMUR', period_name, values)
+        if tanggal_lahir is not None and 'TGL UKUR' in columns:
+            computed, mismatch = check_age(tanggal_lahir, parse_iso_dates(tgl_ukur).to_numpy(), umur_numbers)
+            umur_hitung = to_python(computed, integer=True)
+            umur_tidak_sesuai = mismatch.tolist()
+        if 'BERAT' in columns:
+            values = frame[columns['BERAT']]
+            berat, invalid = convert_numbers(values)
+            report(invalid, 'BERAT', period_name, values)
+        if 'TINGGI' in columns:
+            values = frame[columns['TINGGI']]
+            tinggi, invalid = convert_numbers(values)
+            report(invalid, 'TINGGI', period_name, values)
+        if 'CARA UKUR' in columns:
+            cara_ukur = convert_text(frame[columns['CARA UKUR']], upper=True)
+
+        # Berat or tinggi is the key data of a measurement
+        has_complete_data = (~np.isnan(berat) | ~np.isnan(tinggi)).tolist()
+
+        hashes = measurement_hashes(tgl_ukur, umur_numbers, berat, tinggi, cara_ukur)
+        period_sums[has_any_data] += keyed_by_period(hashes[has_any_data],
+                                                     [period_key if period_key is not None else period_name])
+        fingerprints = (hashes & FINGERPRINT_MASK).tolist()
+        berat_kg = to_python(berat)
+        tinggi_cm = to_python(tinggi)
+
+        for pos in np.flatnonzero(has_any_data).tolist():
+            complete = has_complete_data[pos]
+            children[pos]['measurements'].append({
+                'periode': period_name,
+                'periode_key': period_key,
+                'tgl_ukur': tgl_ukur[pos],
+                'umur_bulan': umur[pos],
+                'umur_bulan_hitung': umur_hitung[pos],
+                'umur_tidak_sesuai': umur_tidak_sesuai[pos],
+                'berat_kg': berat_kg[pos],
+                'tinggi_cm': tinggi_cm[pos],
+                'cara_ukur': cara_ukur[pos],
+                'has_complete_data': complete,
+                'is_incomplete': not complete,
+                'fingerprint': fingerprints[pos]
+            })
 
-    except Exception as e:
-        print(f"Error extracting child data: {str(e)}")
+    fingerprints = child_hashes([np.array(identity.get(field, empty), dtype=object) for field in CHILD_FIELDS],
+                                period_sums).tolist()
+    for child, fingerprint in zip(children, fingerprints):
+        child['fingerprint'] = fingerprint
 
-    return child_data
+    keep = range(n_rows)
+    if drop_empty:
+        keep = [pos for pos in keep if children[pos].get('nama_anak') or children[pos].get('nik')]
 
-def extract_child_data_direct_format(row):
-    """
-    Extract child data from direct format (no headers)
-    """
-    child_data = {
-        'no': None,
-        'nik': None,
-        'nama_anak': None,
-        'tanggal_lahir': None,
-        'jenis_kelamin': None,
-        'measurements': []
-    }
+    coercion_errors = [{
+        'row': children[pos]['row'],
+        'nik': children[pos].get('nik'),
+        'nama_anak': children[pos].get('nama_anak'),
+        'cells': cell_errors[pos]
+    } for pos in keep if pos in cell_errors]
 
-    try:
-        # Extract basic info (first 5 columns)
-        if len(row) > 0:
-            child_data['no'] = int(row.iloc[0]) if not pd.isna(row.iloc[0]) else None
-        if len(row) > 1:
-            child_data['nik'] = str(row.iloc[1]).strip() if not pd.isna(row.iloc[1]) else None
-        if len(row) > 2:
-            child_data['nama_anak'] = str(row.iloc[2]).strip() if not pd.isna(row.iloc[2]) else None
-        if len(row) > 3:
-            if isinstance(row.iloc[3], datetime):
-                child_data['tanggal_lahir'] = row.iloc[3].strftime('%Y-%m-%d')
-            else:
-                try:
-                    date_obj = pd.to_datetime(row.iloc[3])
-                    child_data['tanggal_lahir'] = date_obj.strftime('%Y-%m-%d')
-                except:
-                    child_data['tanggal_lahir'] = str(row.iloc[3])
-        if len(row) > 4:
-            child_data['jenis_kelamin'] = str(row.iloc[4]).strip().upper() if not pd.isna(row.iloc[4]) else None
-
-        # Extract measurements (assuming pattern: TGL UKUR, UMUR, BERAT, TINGGI, CARA UKUR for each period)
-        period_names = ['Jan 2025', 'Feb 2025', 'Mar 2025', 'Apr 2025', 'May 2025', 'Jun 2025', 'Jul 2025', 'Aug 2025', 'Sep 2025']
-        measurement_start_col = 5
-
-        for i, period_name in enumerate(period_names):
-            base_col = measurement_start_col + (i * 5)
-
-            if base_col + 4 < len(row):
-                measurement = {
-                    'periode': period_name,
-                    'tgl_ukur': None,
-                    'umur_bulan': None,
-                    'berat_kg': None,
-                    'tinggi_cm': None,
-                    'cara_ukur': None
-                }
-
-                # TGL UKUR
-                if not pd.isna(row.iloc[base_col]):
-                    if isinstance(row.iloc[base_col], datetime):
-                        measurement['tgl_ukur'] = row.iloc[base_col].strftime('%Y-%m-%d')
-                    else:
-                        try:
-                            date_obj = pd.to_datetime(row.iloc[base_col])
-                            measurement['tgl_ukur'] = date_obj.strftime('%Y-%m-%d')
-                        except:
-                            measurement['tgl_ukur'] = str(row.iloc[base_col])
-
-                # UMUR
-                if not pd.isna(row.iloc[base_col + 1]):
-                    try:
-                        measurement['umur_bulan'] = int(float(row.iloc[base_col + 1]))
-                    except (ValueError, TypeError):
-                        measurement['umur_bulan'] = None
-
-                # BERAT
-                if not pd.isna(row.iloc[base_col + 2]):
-                    try:
-                        measurement['berat_kg'] = float(row.iloc[base_col + 2])
-                    except (ValueError, TypeError):
-                        measurement['berat_kg'] = None
-
-                # TINGGI
-                if not pd.isna(row.iloc[base_col + 3]):
-                    try:
-                        measurement['tinggi_cm'] = float(row.iloc[base_col + 3])
-                    except (ValueError, TypeError):
-                        measurement['tinggi_cm'] = None
-
-                # CARA UKUR
-                if not pd.isna(row.iloc[base_col + 4]):
-                    measurement['cara_ukur'] = str(row.iloc[base_col + 4]).strip().upper()
-
-                # Check if measurement has complete data (berat or tinggi)
-                has_complete_data = (measurement['berat_kg'] is not None or measurement['tinggi_cm'] is not None)
-                has_any_data = (measurement['tgl_ukur'] is not None or measurement['umur_bulan'] is not None or
-                               measurement['berat_kg'] is not None or measurement['tinggi_cm'] is not None or
-                               measurement['cara_ukur'] is not None)
-
-                # Add status flags for UI display
-                measurement['has_complete_data'] = has_complete_data
-                measurement['is_incomplete'] = has_any_data and not has_complete_data
-
-                # Always add measurement (complete or incomplete) for JSON output
-                if has_any_data:
-                    child_data['measurements'].append(measurement)
+    return [children[pos] for pos in keep], coercion_errors
 
-    except Exception as e:
-        print(f"Error extracting child data direct format: {str(e)}")
+def extract_child_data(row, period_columns, start_col=0):
+    """
+    Extract child data from a single row given period columns configuration
+    (row-at-a-time form of extract_children)
+    """
+    identity_columns = tuple((field, start_col + offset) for field, offset in IDENTITY_COLUMNS)
+    frame = pd.DataFrame([list(row)], dtype=object)
+    children, _ = extract_children(frame, period_columns, identity_columns, drop_empty=False)
+    return children[0]
 
-    return child_data
+def extract_child_data_direct_format(row, period_names=None):
+    """
+    Extract child data from a single row of the direct format (no headers)
+    """
+    if period_names is None:
+        period_names = generate_period_labels(2025, 1, 9)
+    frame = pd.DataFrame([list(row)], dtype=object)
+    period_columns = direct_period_columns(period_names, frame.shape[1])
+    children, _ = extract_children(frame, period_columns, DIRECT_IDENTITY_COLUMNS, drop_empty=False)
+    return children[0]
 
 def save_json_to_file(data, output_path):
     """
@@ -736,34 +994,29 @@ def save_json_to_file(data, output_path):
     """
     try:
         with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+            json.dump(data, f, indent=2, ensure_ascii=False, default=json_default)
         return True
     except Exception as e:
         print(f'Error saving JSON: {str(e)}')
         return False
 
-def detect_excel_format(file_path):
+def detect_excel_format(file_path, sheet_name=None, ws=None):
     """
     Detect the format of Excel file
+    ws: worksheet already opened by the caller (read-only), otherwise the file is opened here
     Returns: format_type, description
     """
     try:
         # First check for merged cells PRD format
+        wb = None
         try:
-            period_names = extract_period_names_from_merged_cells(file_path)
+            if ws is None:
+                wb, ws = open_worksheet(file_path, sheet_name)
+            period_names = extract_period_names_from_merged_cells(file_path, sheet_name, ws=ws)
             if period_names and len(period_names) > 0:
-                # Use openpyxl to check the actual structure
-                wb = openpyxl.load_workbook(file_path)
-                ws = wb.active
-
-                # Check row 2 (index 2 in openpyxl) for identity headers
-                identity_headers = []
-                for col_idx in range(1, 7):  # Check first 6 columns (including TEMPAT)
-                    cell_value = ws.cell(row=2, column=col_idx).value  # Row 2 = index 2
-                    if cell_value:
-                        identity_headers.append(str(cell_value).strip().upper())
-
-                wb.close()
+                # Check row 2 for identity headers, first 6 columns (including TEMPAT)
+                identity_headers = [str(cell_value).strip().upper()
+                                    for cell_value in header_rows(ws)[1][:6] if cell_value]
 
                 required_identity = ['NO', 'NIK', 'NAMA ANAK', 'TANGGAL LAHIR', 'JENIS KELAMIN', 'TEMPAT']
                 identity_count = sum(1 for col in required_identity if col in identity_headers)
@@ -773,8 +1026,11 @@ def detect_excel_format(file_path):
         except Exception as e:
             print(f"Debug: Error checking merged cells: {e}")
             pass  # Continue with other detection methods
+        finally:
+            if wb is not None:
+                wb.close()
 
-        df = pd.read_excel(file_path)
+        df = read_sheet(file_path, sheet_name)
 
         # Check if first row looks like headers (contains strings like 'TGL UKUR', 'UMUR', etc.)
         first_row = df.iloc[0].fillna('').astype(str)
@@ -829,13 +1085,43 @@ def validate_excel_format(file_path):
 
     return True, f"Format terdeteksi: {message}"
 
+def list_sheet_names(file_path):
+    """
+    Names of all worksheets in the workbook, in workbook order
+    """
+    with pd.ExcelFile(file_path) as excel_file:
+        return list(excel_file.sheet_names)
+
 def validate_template_compliance(file_path):
+    """
+    Validate a workbook: it complies when at least one sheet follows a supported template
+    Returns: (is_valid, validation_result) - result of the first compliant sheet, or of the first sheet
+    """
+    try:
+        sheet_names = list_sheet_names(file_path)
+    except Exception:
+        sheet_names = []
+
+    if len(sheet_names) <= 1:
+        return validate_sheet_compliance(file_path)
+
+    first_result = None
+    for sheet_name in sheet_names:
+        is_valid, validation_result = validate_sheet_compliance(file_path, sheet_name)
+        if is_valid:
+            validation_result['sheet'] = sheet_name
+            return is_valid, validation_result
+        if first_result is None:
+            first_result = (is_valid, validation_result)
+    return first_result
+
+def validate_sheet_compliance(file_path, sheet_name=None):
     """
     Flexible template validation - accepts both PRD and current Data Test.xlsx format
     Returns: (is_valid, validation_result)
     """
     try:
-        df = pd.read_excel(file_path)
+        df = read_sheet(file_path, sheet_name)
 
         # Check minimum data requirements
         if df.empty:
@@ -856,7 +1142,7 @@ def validate_template_compliance(file_path):
         }
 
         # Detect format
-        format_type, format_description = detect_excel_format(file_path)
+        format_type, format_description = detect_excel_format(file_path, sheet_name)
         validation_result['format_detected'] = format_type
 
         # Accept both PRD format and current Data Test.xlsx format (which is detected as header_format)
@@ -948,7 +1234,7 @@ if __name__ == '__main__':
                     # Show first child as example
                     if result['children']:
                         print("\nExample child data:")
-                        print(json.dumps(result['children'][0], indent=2))
+                        print(json.dumps(result['children'][0], indent=2, default=json_default))
 
                     # Save to JSON file
                     output_file = f"output_{os.path.basename(test_file).replace('.xlsx', '.json').replace('.xls', '.json')}"
@@ -1,9 +1,45 @@
 import pandas as pd
 import openpyxl
-from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
+from openpyxl.styles import PatternFill, Font, Alignment, Border, NamedStyle, Side
+from openpyxl.formatting.rule import CellIsRule, FormulaRule
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
 from openpyxl.utils.dataframe import dataframe_to_rows
 from datetime import datetime
+from concurrent.futures import as_completed
+from concurrent.futures.process import BrokenProcessPool
 import os
+import re
+import shutil
+import tempfile
+import zipfile
+
+from pool_proses import discard_pool, get_pool
+from progres import begin_stage, track
+
+try:
+    import xlsxwriter
+except ImportError:  # Optional: only needed for the 'xlsxwriter' export backend
+    xlsxwriter = None
+
+# Kolom sheet analisis (dipakai semua backend export)
+ANALISIS_HEADERS = [
+    "No", "Tempat", "NIK", "Nama Anak", "Tanggal Lahir",
+    "Bulan", "Tanggal Ukur", "Umur (bulan)", "Berat (kg)", "Tinggi (cm)",
+    "Cara Ukur", "Status Berat", "Status Tinggi", "Validasi Input", "Keterangan",
+    "Kecepatan BB (kg/bln)", "Kecepatan TB (cm/bln)", "Status Pertumbuhan"
+]
+
+EXPORT_BACKENDS = ('openpyxl', 'xlsxwriter')
+
+# Field pengukuran yang wajib terisi sebelum status DANGER / OK dinilai (selain itu WARNING)
+VALIDATION_REQUIRED_FIELDS = ('tgl_ukur', 'umur_bulan', 'berat_kg', 'tinggi_cm', 'cara_ukur')
+
+def has_validation_data(measurement):
+    """
+    True jika semua VALIDATION_REQUIRED_FIELDS terisi
+    """
+    return all(measurement.get(field) is not None for field in VALIDATION_REQUIRED_FIELDS)
 
 def get_validation_status(measurement, prev_measurement=None):
     """
@@ -12,13 +48,7 @@ def get_validation_status(measurement, prev_measurement=None):
     issues = []
 
     # Cek data lengkap
-    has_complete_data = (
-        measurement.get('tgl_ukur') is not None and
-        measurement.get('umur_bulan') is not None and
-        measurement.get('berat_kg') is not None and
-        measurement.get('tinggi_cm') is not None and
-        measurement.get('cara_ukur') is not None
-    )
+    has_complete_data = has_validation_data(measurement)
 
     if not has_complete_data:
         if measurement.get('berat_kg') is None and measurement.get('tinggi_cm') is None:
@@ -78,15 +108,86 @@ def generate_keterangan(status, issues, measurement, child_data, prev_measuremen
 
     return "; ".join(keterangan_list)
 
-def export_to_excel_analisis(data, output_path=None):
+def count_analisis_rows(data, selection=None):
+    """
+    Number of rows iter_analisis_rows yields (one per measurement, or per selected measurement)
+    """
+    if selection is not None:
+        return len(selection)
+    return sum(len(child.get('measurements', [])) for child in data.get('children', []))
+
+def _analisis_row(no, child, measurement, prev_measurement):
+    """
+    (row_data, status) for one measurement, in ANALISIS_HEADERS column order
+    """
+    # Get status and issues
+    status, issues = get_validation_status(measurement, prev_measurement)
+
+    # Generate keterangan
+    keterangan = generate_keterangan(status, issues, measurement, child, prev_measurement)
+
+    # Prepare row data
+    row_data = [
+        no, child.get('tempat', ''), child.get('nik', ''), child.get('nama_anak', ''),
+        child.get('tanggal_lahir', ''),
+        measurement.get('periode', ''),
+        measurement.get('tgl_ukur', ''),
+        measurement.get('umur_bulan', ''),
+        measurement.get('berat_kg', ''),
+        measurement.get('tinggi_cm', ''),
+        measurement.get('cara_ukur', ''),
+        measurement.get('status_bb', ''),
+        measurement.get('status_tb', ''),
+        status,
+        keterangan,
+        measurement.get('kecepatan_bb_kg_per_bulan', ''),
+        measurement.get('kecepatan_tb_cm_per_bulan', ''),
+        measurement.get('status_pertumbuhan', '')
+    ]
+    return row_data, status
+
+def iter_analisis_rows(data, selection=None):
+    """
+    Yield (row_data, status, measurement) for every measurement of every child,
+    in ANALISIS_HEADERS column order
+    selection: only these (child position, measurement position) pairs, in that order
+    (filter_analisis); 'No' and the previous measurement stay those of the full dataset
+    """
+    children = data.get('children', [])
+    if selection is not None:
+        for child_idx, measurement_idx in selection:
+            child = children[child_idx]
+            measurements = child['measurements']
+            measurement = measurements[measurement_idx]
+            prev_measurement = measurements[measurement_idx - 1] if measurement_idx > 0 else None
+            row_data, status = _analisis_row(child.get('no', child_idx + 1), child, measurement, prev_measurement)
+            yield row_data, status, measurement
+        return
+
+    for child_counter, child in enumerate(children, 1):
+        no = child.get('no', child_counter)
+        prev_measurement = None
+
+        # Measurements are stored pre-sorted by periode_key at ingest
+        for measurement in child.get('measurements', []):
+            row_data, status = _analisis_row(no, child, measurement, prev_measurement)
+            yield row_data, status, measurement
+            prev_measurement = measurement
+
+def export_to_excel_analisis(data, output_path=None, conditional_formatting=False, selection=None):
     """
     Export data anak yang sudah dianalisis ke format Excel dengan analisis status
+    conditional_formatting=True: warna status lewat conditional formatting + style per kolom
+    selection: hanya baris (posisi anak, posisi pengukuran) ini (export terfilter)
     """
     try:
         if output_path is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             output_path = f"analisis_pertumbuhan_anak_{timestamp}.xlsx"
 
+        if conditional_formatting:
+            return _export_to_excel_analisis_conditional(data, output_path, selection)
+
         # Buat workbook baru
         wb = openpyxl.Workbook()
         ws = wb.active
@@ -110,15 +211,8 @@ def export_to_excel_analisis(data, output_path=None):
         center_alignment = Alignment(horizontal='center', vertical='center')
         left_alignment = Alignment(horizontal='left', vertical='center')
 
-        # Header columns
-        headers = [
-            "No", "Tempat", "NIK", "Nama Anak", "Tanggal Lahir",
-            "Bulan", "Tanggal Ukur", "Umur (bulan)", "Berat (kg)", "Tinggi (cm)",
-            "Cara Ukur", "Status Berat", "Status Tinggi", "Validasi Input", "Keterangan"
-        ]
-
         # Set header row
-        for col_idx, header in enumerate(headers, 1):
+        for col_idx, header in enumerate(ANALISIS_HEADERS, 1):
             cell = ws.cell(row=1, column=col_idx, value=header)
             cell.fill = header_fill
             cell.font = header_font
@@ -127,84 +221,47 @@ def export_to_excel_analisis(data, output_path=None):
 
         # Data rows
         row_idx = 2
-        child_counter = 1
-
-        for child in data.get('children', []):
-            # Extract identity info
-            no = child.get('no', child_counter)
-            tempat = child.get('tempat', '')
-            nik = child.get('nik', '')
-            nama_anak = child.get('nama_anak', '')
-            tanggal_lahir = child.get('tanggal_lahir', '')
-
-            # Get measurements
-            measurements = child.get('measurements', [])
-
-            # Sort measurements by umur_bulan if available
-            measurements_sorted = sorted(measurements, key=lambda x: x.get('umur_bulan', 0))
-
-            prev_measurement = None
-
-            for measurement in measurements_sorted:
-                # Get status and issues
-                status, issues = get_validation_status(measurement, prev_measurement)
-
-                # Generate keterangan
-                keterangan = generate_keterangan(status, issues, measurement, child, prev_measurement)
-
-                # Prepare row data
-                row_data = [
-                    no, tempat, nik, nama_anak, tanggal_lahir,
-                    measurement.get('periode', ''),
-                    measurement.get('tgl_ukur', ''),
-                    measurement.get('umur_bulan', ''),
-                    measurement.get('berat_kg', ''),
-                    measurement.get('tinggi_cm', ''),
-                    measurement.get('cara_ukur', ''),
-                    measurement.get('status_bb', ''),
-                    measurement.get('status_tb', ''),
-                    status,
-                    keterangan
-                ]
 
-                # Write row data
-                for col_idx, value in enumerate(row_data, 1):
-                    cell = ws.cell(row=row_idx, column=col_idx, value=value)
-                    cell.border = thin_border
-
-                    # Set alignment based on column type
-                    if col_idx in [1, 8]:  # No, Umur - center
-                        cell.alignment = center_alignment
-                    elif col_idx in [2, 3, 4, 5, 6, 7, 11]:  # Text columns - left
-                        cell.alignment = left_alignment
-                    else:  # Numbers - center
-                        cell.alignment = center_alignment
-
-                # Apply color based on validation status (column 14 - Validasi Input)
-                validation_cell = ws.cell(row=row_idx, column=14)
+        rows = track(iter_analisis_rows(data, selection), 'export_rows', lambda: count_analisis_rows(data, selection))
+        for row_data, status, measurement in rows:
+            keterangan = row_data[14]
+
+            # Write row data
+            for col_idx, value in enumerate(row_data, 1):
+                cell = ws.cell(row=row_idx, column=col_idx, value=value)
+                cell.border = thin_border
+
+                # Set alignment based on column type
+                if col_idx in [1, 8]:  # No, Umur - center
+                    cell.alignment = center_alignment
+                elif col_idx in [2, 3, 4, 5, 6, 7, 11]:  # Text columns - left
+                    cell.alignment = left_alignment
+                else:  # Numbers - center
+                    cell.alignment = center_alignment
+
+            # Apply color based on validation status (column 14 - Validasi Input)
+            validation_cell = ws.cell(row=row_idx, column=14)
+            if status == "OK":
+                validation_cell.fill = ok_fill
+            elif status == "WARNING":
+                validation_cell.fill = warning_fill
+            elif status == "DANGER":
+                validation_cell.fill = danger_fill
+
+            # Also apply color to Keterangan column (column 15)
+            if keterangan:
+                keterangan_cell = ws.cell(row=row_idx, column=15)
                 if status == "OK":
-                    validation_cell.fill = ok_fill
+                    keterangan_cell.fill = ok_fill
                 elif status == "WARNING":
-                    validation_cell.fill = warning_fill
+                    keterangan_cell.fill = warning_fill
                 elif status == "DANGER":
-                    validation_cell.fill = danger_fill
-
-                # Also apply color to Keterangan column (column 15)
-                if keterangan:
-                    keterangan_cell = ws.cell(row=row_idx, column=15)
-                    if status == "OK":
-                        keterangan_cell.fill = ok_fill
-                    elif status == "WARNING":
-                        keterangan_cell.fill = warning_fill
-                    elif status == "DANGER":
-                        keterangan_cell.fill = danger_fill
+                    keterangan_cell.fill = danger_fill
 
-                row_idx += 1
-                prev_measurement = measurement
-
-            child_counter += 1
+            row_idx += 1
 
         # Auto-adjust column widths
+        begin_stage('export_save')
         for column in ws.columns:
             max_length = 0
             column_letter = column[0].column_letter
@@ -224,21 +281,380 @@ def export_to_excel_analisis(data, output_path=None):
     except Exception as e:
         return False, f"Error exporting to Excel: {str(e)}"
 
-def export_analisis_from_json(json_data, output_filename=None):
+def _export_to_excel_analisis_conditional(data, output_path, selection=None):
+    """
+    openpyxl export without per-cell styling work: OK/WARNING/DANGER colors are a few
+    conditional-formatting rules over the data range, and every data cell references one of
+    two shared named styles (border + left / center alignment) instead of its own style objects
+    """
+    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+    header_font = Font(color="FFFFFF", bold=True, size=11)
+
+    status_fills = {
+        "OK": PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid"),  # Hijau muda
+        "WARNING": PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid"),  # Oranye
+        "DANGER": PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid"),  # Merah muda
+    }
+
+    thin_border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+
+    center_alignment = Alignment(horizontal='center', vertical='center')
+    left_alignment = Alignment(horizontal='left', vertical='center')
+
+    # Rows are collected first: column widths must be known before a write-only sheet starts streaming
+    rows = [row_data for row_data, status, measurement in
+            track(iter_analisis_rows(data, selection), 'export_rows', lambda: count_analisis_rows(data, selection))]
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Analisis Pertumbuhan Anak")
+
+    for col_idx, width in enumerate(_column_widths(ANALISIS_HEADERS, rows), 1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = width
+
+    # Shared cell styles: registered once, each data cell only points at one of them
+    # (Excel applies column styles only to cells that do not exist, so cells carry their own)
+    for name, alignment in (('analisis_kiri', left_alignment), ('analisis_tengah', center_alignment)):
+        wb.add_named_style(NamedStyle(name=name, border=thin_border, alignment=alignment))
+    column_styles = ['analisis_kiri' if col_idx in [2, 3, 4, 5, 6, 7, 11] else 'analisis_tengah'
+                     for col_idx in range(1, len(ANALISIS_HEADERS) + 1)]
+
+    last_row = len(rows) + 1
+    if rows:
+        for status, fill in status_fills.items():
+            ws.conditional_formatting.add(f"N2:N{last_row}",
+                                          CellIsRule(operator='equal', formula=[f'"{status}"'], fill=fill))
+            ws.conditional_formatting.add(f"O2:O{last_row}",
+                                          FormulaRule(formula=[f'AND($O2<>"",$N2="{status}")'], fill=fill))
+
+    header_cells = []
+    for header in ANALISIS_HEADERS:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = center_alignment
+        cell.border = thin_border
+        header_cells.append(cell)
+    ws.append(header_cells)
+
+    for row_data in track(rows, 'export_write', len(rows)):
+        row_cells = []
+        for value, style in zip(row_data, column_styles):
+            cell = WriteOnlyCell(ws, value=value)
+            cell.style = style
+            row_cells.append(cell)
+        ws.append(row_cells)
+
+    begin_stage('export_save')
+    wb.save(output_path)
+    return True, output_path
+
+# Summary sheet counters: column -> (ANALISIS_HEADERS column, value counted)
+SUMMARY_FLAGS = (
+    ('OK', 'Validasi Input', 'OK'),
+    ('WARNING', 'Validasi Input', 'WARNING'),
+    ('DANGER', 'Validasi Input', 'DANGER'),
+    ('BB Kurang', 'Status Berat', 'KURANG'),
+    ('BB Lebih', 'Status Berat', 'LEBIH'),
+    ('TB Pendek', 'Status Tinggi', 'PENDEK'),
+    ('Growth Faltering', 'Status Pertumbuhan', 'FALTERING'),
+)
+
+class AnalisisSummary:
+    """
+    Status counts per group, accumulated row by row while the detail sheet is written
+    (memory grows with the number of groups and children, not with the rows)
+    """
+
+    def __init__(self):
+        self._groups = {}
+        self._flag_positions = [(ANALISIS_HEADERS.index(column), value) for _, column, value in SUMMARY_FLAGS]
+
+    def add(self, key, nik, row_data):
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = [set(), 0, [0] * len(SUMMARY_FLAGS)]
+        if nik is not None:
+            group[0].add(nik)
+        group[1] += 1
+        counts = group[2]
+        for i, (position, value) in enumerate(self._flag_positions):
+            if row_data[position] == value:
+                counts[i] += 1
+
+    def frame(self, key_columns):
+        """
+        One row per group: key columns, Jumlah Anak, Jumlah Pengukuran, flag counts and prevalences
+        """
+        rows = [list(key) + [len(niks), total] + counts for key, (niks, total, counts) in self._groups.items()]
+        summary = pd.DataFrame(rows, columns=list(key_columns) + ['Jumlah Anak', 'Jumlah Pengukuran']
+                               + [name for name, _, _ in SUMMARY_FLAGS])
+        base = summary['Jumlah Pengukuran'].where(summary['Jumlah Pengukuran'] > 0)
+        summary['% TB Pendek'] = (summary['TB Pendek'] / base * 100).round(2).fillna(0.0)
+        summary['% BB Kurang'] = (summary['BB Kurang'] / base * 100).round(2).fillna(0.0)
+        return summary
+
+def summarize_analisis_rows(rows):
+    """
+    Consume (row_data, status, measurement) and yield row_data, aggregating the
+    per-tempat summary and per-period trend on the way; the returned finish()
+    gives (tempat_df, periode_df) once the rows are exhausted
+    """
+    tempat_summary = AnalisisSummary()
+    periode_summary = AnalisisSummary()
+    tempat_idx = ANALISIS_HEADERS.index('Tempat')
+    nik_idx = ANALISIS_HEADERS.index('NIK')
+    bulan_idx = ANALISIS_HEADERS.index('Bulan')
+
+    def generate():
+        for row_data, status, measurement in rows:
+            nik = row_data[nik_idx]
+            tempat = row_data[tempat_idx]
+            tempat_summary.add((tempat if tempat is not None else 'Tidak Diketahui',), nik, row_data)
+            periode_summary.add((measurement.get('periode_key'), row_data[bulan_idx]), nik, row_data)
+            yield row_data
+
+    def finish():
+        tempat_df = tempat_summary.frame(['Tempat'])
+        if tempat_df.empty:
+            return pd.DataFrame(), pd.DataFrame()
+        tempat_df = tempat_df.sort_values('Tempat', kind='stable')
+        periode_df = periode_summary.frame(['Kode Periode', 'Bulan'])
+        periode_df['Kode Periode'] = periode_df['Kode Periode'].astype('float64')
+        periode_df = periode_df.sort_values('Kode Periode', kind='stable', na_position='last')
+        periode_df['Kode Periode'] = periode_df['Kode Periode'].map(lambda k: '' if pd.isna(k) else int(k))
+        return tempat_df, periode_df
+
+    return generate(), finish
+
+def _column_widths(header, rows):
+    """
+    Column widths (max text length + 2, capped at 50) like the openpyxl auto-adjust
+    """
+    widths = [len(str(h)) for h in header]
+    for row in rows:
+        for i, value in enumerate(row):
+            length = len(str(value)) if value is not None else 4
+            if length > widths[i]:
+                widths[i] = length
+    return [min(width + 2, 50) for width in widths]
+
+def _track_widths(widths, row):
+    """
+    Widen the raw (text length) column widths for one row, as _column_widths does
+    """
+    for i, value in enumerate(row):
+        length = len(str(value)) if value is not None else 4
+        if length > widths[i]:
+            widths[i] = length
+    return row
+
+def export_to_excel_analisis_xlsxwriter(data, output_path=None, selection=None):
+    """
+    Export analisis dengan backend XlsxWriter (streaming, constant memory)
+    Baris detail ditulis langsung saat dibuat; ringkasan dihitung bertahap sambil menulis
+    Sheet: detail analisis, ringkasan per tempat, tren per periode
+    """
+    try:
+        if xlsxwriter is None:
+            return False, "Backend 'xlsxwriter' membutuhkan paket XlsxWriter (pip install XlsxWriter)"
+
+        if output_path is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_path = f"analisis_pertumbuhan_anak_{timestamp}.xlsx"
+
+        wb = xlsxwriter.Workbook(output_path, {'constant_memory': True})
+
+        header_format = wb.add_format({'bg_color': '#366092', 'font_color': '#FFFFFF', 'bold': True,
+                                       'font_size': 11, 'align': 'center', 'valign': 'vcenter', 'border': 1})
+        center_format = wb.add_format({'align': 'center', 'valign': 'vcenter', 'border': 1})
+        left_format = wb.add_format({'align': 'left', 'valign': 'vcenter', 'border': 1})
+        ok_format = wb.add_format({'bg_color': '#C6EFCE'})
+        warning_format = wb.add_format({'bg_color': '#FFEB9C'})
+        danger_format = wb.add_format({'bg_color': '#FFC7CE'})
+
+        # Sheet 1: detail rows streamed in order. A cell written without a format takes its
+        # column's format when its row is flushed, so the column formats are set before any row;
+        # widths only go into <cols> when the workbook is closed and are set after the loop
+        ws = wb.add_worksheet("Analisis Pertumbuhan Anak")
+        # Same alignment rules as the openpyxl writer (1-based columns 2-7 and 11 are left aligned)
+        column_formats = [left_format if col_idx in [2, 3, 4, 5, 6, 7, 11] else center_format
+                          for col_idx in range(1, len(ANALISIS_HEADERS) + 1)]
+        for col_idx, column_format in enumerate(column_formats):
+            ws.set_column(col_idx, col_idx, None, column_format)
+        ws.write_row(0, 0, ANALISIS_HEADERS, header_format)
+        widths = [len(str(h)) for h in ANALISIS_HEADERS]
+        rows, finish_summary = summarize_analisis_rows(
+            track(iter_analisis_rows(data, selection), 'export_rows', lambda: count_analisis_rows(data, selection)))
+        last_row = 0
+        for last_row, row_data in enumerate(rows, 1):
+            ws.write_row(last_row, 0, _track_widths(widths, row_data))
+
+        for col_idx, (width, column_format) in enumerate(zip(widths, column_formats)):
+            ws.set_column(col_idx, col_idx, min(width + 2, 50), column_format)
+
+        # Status colors as conditional formatting over the data range
+        if last_row > 0:
+            for status, status_format in (('OK', ok_format), ('WARNING', warning_format), ('DANGER', danger_format)):
+                ws.conditional_format(1, 13, last_row, 13, {
+                    'type': 'cell', 'criteria': '==', 'value': f'"{status}"', 'format': status_format
+                })
+                ws.conditional_format(1, 14, last_row, 14, {
+                    'type': 'formula', 'criteria': f'=AND($O2<>"",$N2="{status}")', 'format': status_format
+                })
+
+        tempat_df, periode_df = finish_summary()
+
+        # Sheet 2 & 3: pre-aggregated summaries written from the frames
+        for sheet_name, frame in (("Ringkasan Tempat", tempat_df), ("Tren Periode", periode_df)):
+            summary_ws = wb.add_worksheet(sheet_name)
+            header = list(frame.columns)
+            rows = frame.values.tolist()
+            for col_idx, width in enumerate(_column_widths(header, rows)):
+                summary_ws.set_column(col_idx, col_idx, width, center_format)
+            summary_ws.write_row(0, 0, header, header_format)
+            for row_idx, row_data in enumerate(rows, 1):
+                summary_ws.write_row(row_idx, 0, row_data)
+
+        begin_stage('export_save')
+        wb.close()
+        return True, output_path
+
+    except Exception as e:
+        return False, f"Error exporting to Excel (xlsxwriter): {str(e)}"
+
+def partition_children_by_tempat(data):
+    """
+    Group children by tempat (posyandu), preserving input order within each group
+    """
+    partitions = {}
+    for child in data.get('children', []):
+        tempat = child.get('tempat') or 'Tidak Diketahui'
+        partitions.setdefault(tempat, []).append(child)
+    return partitions
+
+def _safe_filename(name):
+    """
+    Make a tempat name usable as a file name
+    """
+    cleaned = re.sub(r'[^A-Za-z0-9._-]+', '_', str(name)).strip('._')
+    return cleaned or 'Tidak_Diketahui'
+
+def _export_partition(children, output_path, backend, conditional_formatting):
+    """
+    Build one partition workbook (runs in a worker process; only this partition's children are sent)
+    """
+    partition_data = {'children': children}
+    if backend == 'xlsxwriter':
+        return export_to_excel_analisis_xlsxwriter(partition_data, output_path)
+    return export_to_excel_analisis(partition_data, output_path, conditional_formatting=conditional_formatting)
+
+def export_analisis_per_tempat_zip(json_data, output_filename=None, backend='openpyxl',
+                                   conditional_formatting=False, max_workers=None, output_dir="exports"):
+    """
+    Export analisis satu workbook per tempat (posyandu), dibuat paralel di process pool
+    bersama (pool_proses, dipakai ulang antar request), lalu digabung dalam satu file zip
+    max_workers=1 atau satu tempat saja: dibuat di proses ini tanpa pool
+    output_dir: direktori file zip (dan workbook sementara per tempat)
+    """
+    try:
+        if backend not in EXPORT_BACKENDS:
+            return False, f"Backend export tidak dikenal: {backend}"
+
+        if output_filename is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_filename = f"Analisis_Pertumbuhan_Anak_{timestamp}.zip"
+
+        os.makedirs(output_dir, exist_ok=True)
+        output_path = os.path.join(output_dir, output_filename)
+
+        partitions = partition_children_by_tempat(json_data)
+        if not partitions:
+            return False, "Tidak ada data anak untuk di-export"
+
+        parts_dir = tempfile.mkdtemp(prefix='parts_', dir=output_dir)
+        try:
+            # Largest partitions first so the pool stays busy until the end
+            ordered = sorted(partitions.items(), key=lambda item: -sum(len(c.get('measurements', [])) for c in item[1]))
+
+            part_paths = []
+            used_names = set()
+            for tempat, children in ordered:
+                part_name = _safe_filename(tempat)
+                while part_name in used_names:
+                    part_name += '_'
+                used_names.add(part_name)
+                part_paths.append((tempat, children, os.path.join(parts_dir, f"Analisis_{part_name}.xlsx")))
+
+            part_files = {}
+            errors = []
+            workers = max_workers or os.cpu_count() or 1
+            if workers <= 1 or len(part_paths) == 1:
+                results = ((tempat, part_path, _export_partition(children, part_path, backend, conditional_formatting))
+                           for tempat, children, part_path in part_paths)
+            else:
+                pool = get_pool('export', workers)
+                try:
+                    futures = {pool.submit(_export_partition, children, part_path, backend, conditional_formatting):
+                               (tempat, part_path) for tempat, children, part_path in part_paths}
+                    results = [futures[future] + (future.result(),) for future in as_completed(futures)]
+                except BrokenProcessPool:
+                    discard_pool('export', pool)
+                    raise
+
+            for tempat, part_path, (success, result) in results:
+                if success:
+                    part_files[tempat] = part_path
+                else:
+                    errors.append(f"{tempat}: {result}")
+
+            if errors:
+                return False, "; ".join(errors)
+
+            # Workbooks are already deflate-compressed, store them as-is
+            with zipfile.ZipFile(output_path, 'w', compression=zipfile.ZIP_STORED) as zf:
+                for tempat, _ in sorted(partitions.items()):
+                    part_path = part_files[tempat]
+                    zf.write(part_path, arcname=os.path.basename(part_path))
+        finally:
+            shutil.rmtree(parts_dir, ignore_errors=True)
+
+        return True, output_path
+
+    except Exception as e:
+        return False, f"Error in per-tempat export: {str(e)}"
+
+def export_analisis_from_json(json_data, output_filename=None, backend='openpyxl', conditional_formatting=False,
+                              selection=None, output_dir="exports"):
     """
     Export analisis dari data JSON yang sudah diproses
+    backend: 'openpyxl' (default, satu sheet) atau 'xlsxwriter' (cepat, dengan sheet ringkasan)
+    conditional_formatting: untuk backend openpyxl, warna status via conditional formatting
+    selection: hanya baris terpilih (filter_analisis.select_rows), None untuk semua baris
+    output_dir: direktori file export
     """
     try:
+        if backend not in EXPORT_BACKENDS:
+            return False, f"Backend export tidak dikenal: {backend}"
+
         if output_filename is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             output_filename = f"Analisis_Pertumbuhan_Anak_{timestamp}.xlsx"
 
         # Ensure output directory exists
-        output_dir = "exports"
         os.makedirs(output_dir, exist_ok=True)
         output_path = os.path.join(output_dir, output_filename)
 
-        success, result = export_to_excel_analisis(json_data, output_path)
+        if backend == 'xlsxwriter':
+            success, result = export_to_excel_analisis_xlsxwriter(json_data, output_path, selection)
+        else:
+            success, result = export_to_excel_analisis(json_data, output_path,
+                                                       conditional_formatting=conditional_formatting,
+                                                       selection=selection)
 
         if success:
             return True, output_path
@@ -248,6 +664,87 @@ def export_analisis_from_json(json_data, output_filename=None):
     except Exception as e:
         return False, f"Error in export process: {str(e)}"
 
+DIFF_CHANGE_LABELS = {'added': 'Ditambah', 'removed': 'Dihapus', 'changed': 'Diubah'}
+DIFF_CHILD_HEADERS = ["NIK", "Nama Anak", "Tempat", "Sheet", "Baris", "Jumlah Pengukuran"]
+
+def _diff_sheets(diff, base_label, current_label):
+    """
+    (sheet name, header, rows) for every sheet of the diff workbook
+    """
+    summary = diff['summary']
+    ringkasan = [
+        ["Upload dasar", base_label],
+        ["Upload baru", current_label],
+        ["Anak (dasar / baru)", f"{summary['base_children']} / {summary['current_children']}"],
+        ["Anak ditambah", summary['children_added']],
+        ["Anak dihapus", summary['children_removed']],
+        ["Anak berubah", summary['children_changed']],
+        ["Anak tidak berubah", summary['children_unchanged']],
+        ["Perubahan identitas", summary['identity_changes']],
+        ["Pengukuran ditambah", summary['measurements_added']],
+        ["Pengukuran dihapus", summary['measurements_removed']],
+        ["Pengukuran diubah", summary['measurements_changed']],
+    ]
+    for field, counts in summary['status_transitions'].items():
+        for transition, count in counts.items():
+            ringkasan.append([f"Transisi {field}: {transition}", count])
+
+    def child_rows(children):
+        return [[c['nik'], c['nama_anak'], c['tempat'], c['sheet'], c['row'], c['total_measurements']]
+                for c in children]
+
+    identity_rows = [[c['nik'], c['nama_anak'], c['tempat'], field, old, new]
+                     for c in diff['identity_changes'] for field, (old, new) in c['fields'].items()]
+    measurement_rows = []
+    for change in diff['measurement_changes']:
+        label = DIFF_CHANGE_LABELS[change['change']]
+        for field, (old, new) in change['fields'].items():
+            measurement_rows.append([change['nik'], change['nama_anak'], change['tempat'], change['periode'],
+                                     label, field, old, new])
+    status_rows = [[t['nik'], t['nama_anak'], t['tempat'], t['periode'], t['field'], t['from'], t['to']]
+                   for t in diff['status_transitions']]
+
+    return [
+        ("Ringkasan", ["Keterangan", "Jumlah"], ringkasan),
+        ("Anak Baru", DIFF_CHILD_HEADERS, child_rows(diff['children_added'])),
+        ("Anak Dihapus", DIFF_CHILD_HEADERS, child_rows(diff['children_removed'])),
+        ("Perubahan Identitas", ["NIK", "Nama Anak", "Tempat", "Kolom", "Nilai Lama", "Nilai Baru"], identity_rows),
+        ("Perubahan Pengukuran", ["NIK", "Nama Anak", "Tempat", "Periode", "Perubahan", "Kolom",
+                                  "Nilai Lama", "Nilai Baru"], measurement_rows),
+        ("Perubahan Status", ["NIK", "Nama Anak", "Tempat", "Periode", "Status", "Dari", "Ke"], status_rows),
+    ]
+
+def export_diff_to_excel(diff, output_path, base_label=None, current_label=None):
+    """
+    Export perbandingan dua upload (perbandingan_upload.diff_results) ke Excel, satu sheet per jenis perubahan
+    """
+    try:
+        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+        header_font = Font(color="FFFFFF", bold=True, size=11)
+        center_alignment = Alignment(horizontal='center', vertical='center')
+
+        wb = openpyxl.Workbook(write_only=True)
+        for sheet_name, header, rows in _diff_sheets(diff, base_label, current_label):
+            ws = wb.create_sheet(sheet_name)
+            for col_idx, width in enumerate(_column_widths(header, rows), 1):
+                ws.column_dimensions[get_column_letter(col_idx)].width = width
+            header_cells = []
+            for value in header:
+                cell = WriteOnlyCell(ws, value=value)
+                cell.fill = header_fill
+                cell.font = header_font
+                cell.alignment = center_alignment
+                header_cells.append(cell)
+            ws.append(header_cells)
+            for row in rows:
+                ws.append(row)
+
+        wb.save(output_path)
+        return True, output_path
+
+    except Exception as e:
+        return False, f"Error exporting diff to Excel: {str(e)}"
+
 # Fungsi untuk testing
 if __name__ == "__main__":
     # Sample data for testing
@@ -0,0 +1,107 @@
+"""
+Row filters for /export-analisis (validation status, status BB / TB, tempat, period range, NIK)
+
+The first filtered export of a dataset builds an index with one entry per measurement
+(child position, measurement position, period, statuses and the validation status the
+export would print) and per child (tempat, normalized NIK). Each export then selects its
+rows with column masks over that index and writes only the selected measurements, so
+nothing outside the filter is formatted or written.
+"""
+import numpy as np
+
+from export_analisis import get_validation_status
+from nik import normalize_nik
+from pengukuran import STATUS_BB, STATUS_TB
+
+VALIDATION_STATUSES = ('OK', 'WARNING', 'DANGER')
+
+# Query parameter -> allowed values (None: any value); comma separated values are OR-ed
+LIST_FILTERS = {
+    'validasi': VALIDATION_STATUSES,
+    'status_bb': STATUS_BB,
+    'status_tb': STATUS_TB,
+    'tempat': None
+}
+
+def parse_list_filters(args):
+    """
+    LIST_FILTERS present in args (a request.args-like mapping) as field -> list of values
+    Statuses are case-insensitive; raises ValueError for an unknown status
+    """
+    filters = {}
+    for field, allowed in LIST_FILTERS.items():
+        values = [value.strip() for value in args.get(field, '').split(',') if value.strip()]
+        if not values:
+            continue
+        if allowed is not None:
+            values = [value.upper() for value in values]
+            unknown = [value for value in values if value not in allowed]
+            if unknown:
+                raise ValueError(f"Nilai {field} tidak dikenali: {', '.join(unknown)} "
+                                 f"(pilihan: {', '.join(allowed)})")
+        filters[field] = values
+    return filters
+
+def build_export_index(data):
+    """
+    Column arrays over all measurements (in export order) and children of a processed dataset
+    """
+    children = data.get('children', [])
+    child_positions = []
+    measurement_positions = []
+    period_keys = []
+    status_bb = []
+    status_tb = []
+    validasi = []
+
+    for child_idx, child in enumerate(children):
+        prev_measurement = None
+        for measurement_idx, measurement in enumerate(child.get('measurements', [])):
+            child_positions.append(child_idx)
+            measurement_positions.append(measurement_idx)
+            period_key = measurement.get('periode_key')
+            period_keys.append(np.nan if period_key is None else period_key)
+            status_bb.append(measurement.get('status_bb'))
+            status_tb.append(measurement.get('status_tb'))
+            validasi.append(get_validation_status(measurement, prev_measurement)[0])
+            prev_measurement = measurement
+
+    return {
+        'child': np.array(child_positions, dtype=np.int64),
+        'measurement': np.array(measurement_positions, dtype=np.int64),
+        'periode_key': np.array(period_keys, dtype=np.float64),
+        'status_bb': np.array(status_bb, dtype=object),
+        'status_tb': np.array(status_tb, dtype=object),
+        'validasi': np.array(validasi, dtype=object),
+        'tempat': np.array([(child.get('tempat') or '').strip() for child in children], dtype=object),
+        'nik': np.array([normalize_nik(child.get('nik')) for child in children], dtype=object)
+    }
+
+def select_rows(index, filters=None, periode_dari=None, periode_sampai=None, niks=None):
+    """
+    (child position, measurement position) pairs matching every filter, in export order
+    filters: field -> list of values (parse_list_filters); a period bound drops measurements without a period
+    """
+    filters = filters or {}
+    mask = np.ones(len(index['child']), dtype=bool)
+    for field in ('validasi', 'status_bb', 'status_tb'):
+        if field in filters:
+            mask &= np.isin(index[field], filters[field])
+    if periode_dari is not None:
+        mask &= index['periode_key'] >= periode_dari
+    if periode_sampai is not None:
+        mask &= index['periode_key'] <= periode_sampai
+
+    # Child-level filters are evaluated per child and broadcast to its measurements
+    child_mask = None
+    if 'tempat' in filters:
+        child_mask = np.isin(index['tempat'], filters['tempat'])
+    if niks:
+        wanted = [nik for nik in (normalize_nik(nik) for nik in niks) if nik]
+        nik_mask = np.isin(index['nik'], wanted)
+        child_mask = nik_mask if child_mask is None else child_mask & nik_mask
+    if child_mask is not None:
+        mask &= child_mask[index['child']]
+
+    positions = np.flatnonzero(mask)
+    return list(zip(index['child'][positions].tolist(), index['measurement'][positions].tolist()))
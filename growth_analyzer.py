@@ -0,0 +1,251 @@
+"""
+In-process growth assessment API (no Flask, no Excel files)
+
+    analyzer = GrowthAnalyzer()
+    result = analyzer.analyze(df)          # long DataFrame: one row per measurement
+    result = analyzer.analyze(records)     # iterable of measurement dicts (same columns)
+    result = analyzer.analyze(json_data)   # existing JSON shape ({'children': [...]} or list of children)
+
+The result has the same shape as process_excel_to_json (children, periods, period_keys).
+"""
+
+import numpy as np
+import pandas as pd
+
+from excel_to_json_anak import assess_child_measurements, compile_who_reference, load_who_table, lookup_who_reference
+from kecepatan_pertumbuhan import apply_growth_velocity
+from konversi_kolom import (check_age, convert_dates, convert_integers, convert_numbers, convert_text,
+                            parse_iso_dates, to_python)
+from pengukuran import compact_children
+from periode import parse_period_key, period_sort_key
+
+IDENTITY_FIELDS = ['no', 'tempat', 'nik', 'nama_anak', 'tanggal_lahir', 'jenis_kelamin']
+MEASUREMENT_FIELDS = ['periode', 'periode_key', 'tgl_ukur', 'umur_bulan', 'berat_kg', 'tinggi_cm', 'cara_ukur']
+
+# Excel-style column names accepted for DataFrame / record input
+COLUMN_ALIASES = {
+    'NO': 'no', 'TEMPAT': 'tempat', 'NIK': 'nik', 'NAMA ANAK': 'nama_anak',
+    'TANGGAL LAHIR': 'tanggal_lahir', 'JENIS KELAMIN': 'jenis_kelamin', 'PERIODE': 'periode',
+    'TGL UKUR': 'tgl_ukur', 'UMUR': 'umur_bulan', 'BERAT': 'berat_kg', 'TINGGI': 'tinggi_cm',
+    'CARA UKUR': 'cara_ukur'
+}
+
+def add_computed_age(children):
+    """
+    Fill umur_bulan_hitung / umur_tidak_sesuai on measurements that do not carry them yet,
+    in one vectorized pass over all children
+    """
+    pending = [(child.get('tanggal_lahir'), measurement)
+               for child in children for measurement in child['measurements']
+               if measurement.get('umur_bulan_hitung') is None]
+    if not pending:
+        return children
+    tanggal_lahir = parse_iso_dates([lahir for lahir, _ in pending]).to_numpy()
+    tgl_ukur = parse_iso_dates([measurement.get('tgl_ukur') for _, measurement in pending]).to_numpy()
+    umur_bulan = np.array([measurement.get('umur_bulan') for _, measurement in pending], dtype=np.float64)
+    computed, mismatch = check_age(tanggal_lahir, tgl_ukur, umur_bulan)
+    for (_, measurement), umur_hitung, tidak_sesuai in zip(pending, computed.tolist(), mismatch.tolist()):
+        measurement['umur_bulan_hitung'] = None if umur_hitung != umur_hitung else int(umur_hitung)
+        measurement['umur_tidak_sesuai'] = tidak_sesuai
+    return children
+
+class GrowthAnalyzer:
+    """
+    Holds the compiled WHO reference and assesses children in batch.
+    The compiled reference is never mutated after construction, so one instance
+    can be shared between threads; every analyze() call works on its own copies.
+    """
+
+    def __init__(self, who_table=None, use_computed_age=False):
+        """
+        who_table: WHO reference DataFrame, CSV path (';'-separated) or None for the bundled table
+        use_computed_age: assess by the age computed from tanggal_lahir and tgl_ukur instead of umur_bulan
+        """
+        self.use_computed_age = use_computed_age
+        if who_table is None:
+            who_table = load_who_table()
+        elif isinstance(who_table, str):
+            who_table = pd.read_csv(who_table, sep=';')
+        self._reference = compile_who_reference(who_table)
+
+    def reference(self, umur_bulan, jenis_kelamin):
+        """
+        WHO reference for age (months) and gender, or None if out of range
+        """
+        return lookup_who_reference(self._reference, umur_bulan, jenis_kelamin)
+
+    def assess_child(self, child):
+        """
+        Assess one child in place (height rationality + WHO status); returns the child
+        """
+        assess_child_measurements(child, self.reference, self.use_computed_age)
+        return child
+
+    def analyze(self, data, velocity=True, compact=False):
+        """
+        Assess a batch given as a DataFrame, an iterable of measurement records,
+        or the JSON shape; returns a new result dict (input is not modified).
+        compact=True returns measurements as pengukuran.Measurement records (less memory)
+        """
+        children = self.to_children(data)
+        for child in children:
+            assess_child_measurements(child, self.reference, self.use_computed_age)
+        if velocity:
+            apply_growth_velocity(children)
+        if compact:
+            compact_children(children)
+
+        periods = {}
+        for child in children:
+            for measurement in child['measurements']:
+                periods.setdefault(measurement.get('periode'), measurement.get('periode_key'))
+        ordered_periods = sorted(periods.items(), key=lambda item: period_sort_key(item[1]))
+
+        return {
+            'total_children': len(children),
+            'total_periods': len(ordered_periods),
+            'periods': [name for name, _ in ordered_periods],
+            'period_keys': [key for _, key in ordered_periods],
+            'children': children
+        }
+
+    def to_children(self, data):
+        """
+        Normalize supported inputs to a fresh list of child dicts with chronologically sorted measurements
+        and the age computed from the dates (add_computed_age)
+        """
+        if isinstance(data, pd.DataFrame):
+            children = self._children_from_frame(data)
+        elif isinstance(data, dict):
+            children = self._children_from_json(data.get('children', []))
+        else:
+            records = list(data)
+            if records and 'measurements' in records[0]:
+                children = self._children_from_json(records)
+            else:
+                children = self._children_from_frame(pd.DataFrame.from_records(records))
+        return add_computed_age(children)
+
+    def _children_from_json(self, children):
+        result = []
+        for child in children:
+            copied = dict(child)
+            measurements = []
+            for measurement in child.get('measurements', []):
+                measurement = dict(measurement)
+                if measurement.get('periode_key') is None:
+                    measurement['periode_key'] = parse_period_key(measurement.get('periode'))
+                measurements.append(measurement)
+            measurements.sort(key=lambda m: period_sort_key(m['periode_key']))
+            copied['measurements'] = measurements
+            result.append(copied)
+        return result
+
+    def _children_from_frame(self, frame):
+        """
+        Group long-format rows (one per measurement) into children, keyed by NIK
+        (or name + birth date when NIK is empty), in first-seen order.
+        Every column is converted once for all rows (konversi_kolom, as in extract_children);
+        only the child / measurement dicts are assembled per row
+        """
+        frame = frame.rename(columns=lambda column: COLUMN_ALIASES.get(str(column).strip().upper(), column))
+        if frame.columns.duplicated().any():
+            # Same field under several spellings ('NIK' and 'nik'): first filled value per row
+            frame = pd.DataFrame({name: frame.loc[:, frame.columns == name].bfill(axis=1).iloc[:, 0]
+                                  for name in dict.fromkeys(frame.columns)})
+        frame = frame.reset_index(drop=True)
+        n_rows = len(frame)
+        empty = [None] * n_rows
+
+        def column(field):
+            return frame[field] if field in frame.columns else None
+
+        def integers(field):
+            values = column(field)
+            if values is None:
+                return np.full(n_rows, np.nan)
+            return convert_integers(values)[0]
+
+        def numbers(field):
+            values = column(field)
+            return np.full(n_rows, np.nan) if values is None else convert_numbers(values)[0]
+
+        def dates(field):
+            values = column(field)
+            return empty if values is None else convert_dates(values)[0]
+
+        def texts(field, upper=False):
+            values = column(field)
+            return empty if values is None else convert_text(values, upper=upper)
+
+        identity = {
+            'no': to_python(integers('no'), integer=True),
+            'tempat': texts('tempat'),
+            'nik': texts('nik'),
+            'nama_anak': texts('nama_anak'),
+            'tanggal_lahir': dates('tanggal_lahir'),
+            'jenis_kelamin': texts('jenis_kelamin', upper=True)
+        }
+
+        periode = texts('periode')
+        tgl_ukur = dates('tgl_ukur')
+        umur = integers('umur_bulan')
+        berat = numbers('berat_kg')
+        tinggi = numbers('tinggi_cm')
+        cara_ukur = texts('cara_ukur', upper=True)
+
+        # Berat or tinggi is the key data of a measurement; any filled field makes one
+        has_complete_data = ~np.isnan(berat) | ~np.isnan(tinggi)
+        has_any_data = (has_complete_data | ~np.isnan(umur)
+                        | ~np.equal(np.array(tgl_ukur, dtype=object), None)
+                        | ~np.equal(np.array(cara_ukur, dtype=object), None)).tolist()
+        has_complete_data = has_complete_data.tolist()
+
+        # Periods without PERIODE_KEY are parsed once per distinct label (or date)
+        periode_keys = to_python(integers('periode_key'), integer=True)
+        parsed_keys = {}
+        for pos, periode_key in enumerate(periode_keys):
+            if periode_key is None:
+                label = periode[pos] or tgl_ukur[pos]
+                if label not in parsed_keys:
+                    parsed_keys[label] = parse_period_key(label)
+                periode_keys[pos] = parsed_keys[label]
+
+        umur = to_python(umur, integer=True)
+        berat = to_python(berat)
+        tinggi = to_python(tinggi)
+
+        children = {}
+        fields = list(identity)
+        for pos, values in enumerate(zip(*identity.values())):
+            child_fields = dict(zip(fields, values))
+            if not (child_fields['nik'] or child_fields['nama_anak']):
+                continue
+
+            key = child_fields['nik'] or (child_fields['nama_anak'], child_fields['tanggal_lahir'])
+            child = children.get(key)
+            if child is None:
+                child = dict(child_fields, measurements=[])
+                children[key] = child
+            if not has_any_data[pos]:
+                continue
+
+            complete = has_complete_data[pos]
+            child['measurements'].append({
+                'periode': periode[pos],
+                'periode_key': periode_keys[pos],
+                'tgl_ukur': tgl_ukur[pos],
+                'umur_bulan': umur[pos],
+                'umur_bulan_hitung': None,
+                'umur_tidak_sesuai': False,
+                'berat_kg': berat[pos],
+                'tinggi_cm': tinggi[pos],
+                'cara_ukur': cara_ukur[pos],
+                'has_complete_data': complete,
+                'is_incomplete': not complete
+            })
+
+        result = list(children.values())
+        for child in result:
+            child['measurements'].sort(key=lambda m: period_sort_key(m['periode_key']))
+        return result
@@ -0,0 +1,166 @@
+import os
+import threading
+import time
+from datetime import datetime
+
+# Files the janitor never touches (upload index); dotfiles (in-flight temp files) are skipped too
+PROTECTED_FILENAMES = {'index.json'}
+
+class Janitor:
+    """
+    Background maintenance thread: evicts files by max age and max total bytes
+    (oldest first) for each configured directory, and keeps reclaim statistics
+    """
+
+    def __init__(self, interval_seconds=600):
+        self.interval_seconds = interval_seconds
+        self._directories = {}
+        self._stats_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._stats = {
+            'runs': 0,
+            'last_run_at': None,
+            'last_run_seconds': None,
+            'directories': {}
+        }
+
+    def add_directory(self, name, path, max_age_seconds=None, max_total_bytes=None, on_evict=None):
+        """
+        Register a directory; on_evict(filename) is called after a file is deleted
+        """
+        self._directories[name] = {
+            'path': path,
+            'max_age_seconds': max_age_seconds,
+            'max_total_bytes': max_total_bytes,
+            'on_evict': on_evict
+        }
+        self._stats['directories'][name] = {
+            'path': path,
+            'max_age_seconds': max_age_seconds,
+            'max_total_bytes': max_total_bytes,
+            'files': 0,
+            'bytes': 0,
+            'evicted_files_total': 0,
+            'reclaimed_bytes_total': 0,
+            'last_evicted_files': 0,
+            'last_reclaimed_bytes': 0,
+            'errors': 0
+        }
+
+    def _scan(self, path):
+        """
+        Single scandir pass: returns [(mtime, size, name)] sorted oldest first
+        """
+        files = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.name in PROTECTED_FILENAMES or entry.name.startswith('.'):
+                        continue
+                    try:
+                        if not entry.is_file(follow_symlinks=False):
+                            continue
+                        stat = entry.stat(follow_symlinks=False)
+                    except FileNotFoundError:
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, entry.name))
+        except FileNotFoundError:
+            return []
+        files.sort()
+        return files
+
+    def clean_directory(self, name):
+        """
+        Evict expired files, then oldest files until the directory is under its byte quota
+        Returns: (evicted_files, reclaimed_bytes)
+        """
+        config = self._directories[name]
+        files = self._scan(config['path'])
+        total_bytes = sum(size for _, size, _ in files)
+        now = time.time()
+
+        evicted_files = 0
+        reclaimed_bytes = 0
+        errors = 0
+        remaining = []
+
+        for mtime, size, filename in files:
+            expired = config['max_age_seconds'] is not None and now - mtime > config['max_age_seconds']
+            over_quota = config['max_total_bytes'] is not None and total_bytes > config['max_total_bytes']
+            if not (expired or over_quota):
+                remaining.append((mtime, size, filename))
+                continue
+
+            try:
+                os.remove(os.path.join(config['path'], filename))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"Janitor: error removing {filename}: {str(e)}")
+                errors += 1
+                remaining.append((mtime, size, filename))
+                continue
+
+            total_bytes -= size
+            evicted_files += 1
+            reclaimed_bytes += size
+            if config['on_evict'] is not None:
+                try:
+                    config['on_evict'](filename)
+                except Exception as e:
+                    print(f"Janitor: on_evict error for {filename}: {str(e)}")
+
+        with self._stats_lock:
+            stats = self._stats['directories'][name]
+            stats['files'] = len(remaining)
+            stats['bytes'] = total_bytes
+            stats['last_evicted_files'] = evicted_files
+            stats['last_reclaimed_bytes'] = reclaimed_bytes
+            stats['evicted_files_total'] += evicted_files
+            stats['reclaimed_bytes_total'] += reclaimed_bytes
+            stats['errors'] += errors
+
+        return evicted_files, reclaimed_bytes
+
+    def run_once(self):
+        """
+        Clean every registered directory once
+        """
+        start = time.perf_counter()
+        for name in list(self._directories):
+            try:
+                self.clean_directory(name)
+            except Exception as e:
+                print(f"Janitor: error cleaning {name}: {str(e)}")
+
+        with self._stats_lock:
+            self._stats['runs'] += 1
+            self._stats['last_run_at'] = datetime.now().isoformat()
+            self._stats['last_run_seconds'] = round(time.perf_counter() - start, 4)
+
+    def _loop(self):
+        while not self._stop_event.is_set():
+            self.run_once()
+            self._stop_event.wait(self.interval_seconds)
+
+    def start(self):
+        """
+        Start the background daemon thread (requests are never blocked by a cleanup run)
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, name='janitor', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def get_stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+            stats['directories'] = {name: dict(d) for name, d in self._stats['directories'].items()}
+        stats['interval_seconds'] = self.interval_seconds
+        stats['running'] = self._thread is not None and self._thread.is_alive()
+        return stats
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+
+# Rata-rata jumlah hari per bulan untuk normalisasi selang tgl_ukur
+DAYS_PER_MONTH = 30.4375
+
+# Jumlah interval berturut-turut tanpa kenaikan berat untuk dianggap growth faltering
+FALTERING_MIN_PERIODS = 2
+
+def _velocity(df, value_col):
+    """
+    Velocity per month of value_col between consecutive dated measurements of the same child
+    Only rows with both a date and a value take part; other rows get NaN
+    """
+    valid = df['tgl'].notna() & df[value_col].notna()
+    sub = df.loc[valid, ['child', 'tgl', value_col]]
+
+    prev_tgl = sub.groupby('child', sort=False)['tgl'].shift()
+    prev_val = sub.groupby('child', sort=False)[value_col].shift()
+
+    selang_bulan = (sub['tgl'] - prev_tgl).dt.days / DAYS_PER_MONTH
+    delta = sub[value_col] - prev_val
+    velocity = delta / selang_bulan.where(selang_bulan > 0)
+
+    return (
+        velocity.reindex(df.index),
+        delta.reindex(df.index),
+        selang_bulan.reindex(df.index)
+    )
+
+def compute_growth_velocity(children):
+    """
+    Hitung kecepatan pertumbuhan BB dan TB per bulan untuk semua anak sekaligus (vectorized)
+    Returns DataFrame indexed like the flattened measurement list, plus the list of measurement dicts
+    """
+    measurement_refs = []
+    child_ids = []
+    tgl_values = []
+    berat_values = []
+    tinggi_values = []
+
+    for child_idx, child in enumerate(children):
+        for measurement in child.get('measurements', []):
+            measurement_refs.append(measurement)
+            child_ids.append(child_idx)
+            tgl_values.append(measurement.get('tgl_ukur'))
+            berat_values.append(measurement.get('berat_kg'))
+            tinggi_values.append(measurement.get('tinggi_cm'))
+
+    df = pd.DataFrame({
+        'child': np.asarray(child_ids, dtype=np.int64),
+        'tgl': pd.to_datetime(pd.Series(tgl_values, dtype=object), format='%Y-%m-%d', errors='coerce'),
+        'berat': pd.to_numeric(pd.Series(berat_values, dtype=object), errors='coerce'),
+        'tinggi': pd.to_numeric(pd.Series(tinggi_values, dtype=object), errors='coerce'),
+    })
+
+    # Urutkan per anak berdasarkan tanggal ukur (stable, urutan periode sebagai tie-breaker)
+    df = df.sort_values(['child', 'tgl'], kind='stable')
+
+    df['kecepatan_bb'], df['delta_bb'], df['selang_bulan_bb'] = _velocity(df, 'berat')
+    df['kecepatan_tb'], _, df['selang_bulan_tb'] = _velocity(df, 'tinggi')
+
+    # Weight stagnation: no weight gain versus the previous weighed measurement
+    stagnan = (df['delta_bb'] <= 0).fillna(False)
+    weighed = df['tgl'].notna() & df['berat'].notna()
+
+    # Panjang run stagnan berturut-turut per anak (reset saat ada kenaikan berat)
+    run_breaker = (~stagnan & weighed) | (df['child'] != df['child'].shift())
+    run_id = run_breaker.cumsum()
+    stagnan_run = stagnan.astype(np.int64).groupby(run_id).cumsum()
+
+    status = np.full(len(df), 'NO_DATA', dtype=object)
+    status[weighed.to_numpy()] = 'NO_BASELINE'
+    status[(weighed & df['delta_bb'].notna()).to_numpy()] = 'NORMAL'
+    status[(stagnan & (stagnan_run < FALTERING_MIN_PERIODS)).to_numpy()] = 'STAGNAN'
+    status[(stagnan & (stagnan_run >= FALTERING_MIN_PERIODS)).to_numpy()] = 'FALTERING'
+    df['status_pertumbuhan'] = status
+    df['periode_stagnan'] = stagnan_run.where(stagnan, 0)
+
+    return df.sort_index(), measurement_refs
+
+def apply_growth_velocity(children):
+    """
+    Tambahkan field kecepatan pertumbuhan ke setiap measurement:
+    kecepatan_bb_kg_per_bulan, kecepatan_tb_cm_per_bulan, selang_bulan, status_pertumbuhan
+    """
+    try:
+        df, measurement_refs = compute_growth_velocity(children)
+        if df.empty:
+            return
+
+        selang = df['selang_bulan_bb'].fillna(df['selang_bulan_tb'])
+        columns = zip(
+            df['kecepatan_bb'].round(3).to_numpy(),
+            df['kecepatan_tb'].round(3).to_numpy(),
+            selang.round(2).to_numpy(),
+            df['status_pertumbuhan'].to_numpy(),
+            df['periode_stagnan'].to_numpy()
+        )
+
+        for measurement, (kec_bb, kec_tb, selang_bulan, status, periode_stagnan) in zip(measurement_refs, columns):
+            measurement['kecepatan_bb_kg_per_bulan'] = None if np.isnan(kec_bb) else float(kec_bb)
+            measurement['kecepatan_tb_cm_per_bulan'] = None if np.isnan(kec_tb) else float(kec_tb)
+            measurement['selang_bulan'] = None if np.isnan(selang_bulan) else float(selang_bulan)
+            measurement['status_pertumbuhan'] = status
+            measurement['periode_stagnan'] = int(periode_stagnan)
+
+    except Exception as e:
+        print(f"Error applying growth velocity: {str(e)}")
@@ -0,0 +1,214 @@
+"""
+Column-wise cell conversion for ingestion
+
+Every column (TANGGAL LAHIR, TGL UKUR, UMUR, BERAT, ...) is converted once for all rows
+instead of cell by cell. Converters return the converted values plus an 'invalid' mask:
+filled cells that could not be converted, used for the per-row error report.
+"""
+import re
+import warnings
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from periode import MONTH_NUMBERS
+
+DATE_FORMAT = '%Y-%m-%d'
+
+# Entered UMUR may differ this many months from the age computed from the dates
+UMUR_TOLERANCE_BULAN = 1
+
+# Numbers in a date column are Excel serial day numbers (date cell without date formatting)
+EXCEL_EPOCH = pd.Timestamp('1899-12-30')
+EXCEL_MAX_SERIAL = 2958465  # 9999-12-31
+
+# "10,5" / "1.234,5": Indonesian decimal comma, dot as thousands separator
+_DECIMAL_COMMA_PATTERN = r'[+-]?(?:\d{1,3}(?:\.\d{3})+|\d*),\d+'
+# "5 Januari 2024", "05-Agu-2024"
+_MONTH_NAME_DATE_PATTERN = re.compile(r'^(\d{1,2})[\s\-/.]+([A-Za-z]+)[\s\-/.,]+(\d{4})$')
+
+def _as_series(values):
+    if isinstance(values, pd.Series):
+        return values.reset_index(drop=True)
+    return pd.Series(list(values), dtype=object)
+
+def _blank_text(cells):
+    """
+    True for cells holding only whitespace (kept as data, but not reported as invalid)
+    """
+    return np.fromiter((isinstance(v, str) and not v.strip() for v in cells), dtype=bool, count=len(cells))
+
+def to_python(numbers, integer=False):
+    """
+    float64 array -> list of Python floats (or ints), None where NaN
+    """
+    valid = ~np.isnan(numbers)
+    result = np.full(len(numbers), None, dtype=object)
+    if integer:
+        result[valid] = numbers[valid].astype(np.int64).tolist()
+    else:
+        result[valid] = numbers[valid].tolist()
+    return result.tolist()
+
+def convert_numbers(values):
+    """
+    Numbers as float64 (NaN when empty or invalid); text may use a decimal comma ("10,5")
+    Returns: (numbers, invalid)
+    """
+    series = _as_series(values)
+    filled = series.notna().to_numpy()
+    if pd.api.types.is_numeric_dtype(series):
+        numbers = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    else:
+        numbers = pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+
+    retry = np.flatnonzero(filled & np.isnan(numbers))
+    if len(retry):
+        cells = series.to_numpy(dtype=object)[retry]
+        text = pd.Series([v.strip() if isinstance(v, str) else '' for v in cells], dtype=object)
+        comma = text.str.fullmatch(_DECIMAL_COMMA_PATTERN).to_numpy(dtype=bool)
+        if comma.any():
+            normalized = text[comma].str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+            numbers[retry[comma]] = pd.to_numeric(normalized, errors='coerce').to_numpy(dtype=np.float64)
+        filled[retry[_blank_text(cells)]] = False
+
+    invalid = filled & ~np.isfinite(numbers)
+    numbers[~np.isfinite(numbers)] = np.nan
+    return numbers, invalid
+
+def convert_integers(values):
+    """
+    Whole numbers (truncated, like int(float(value))) as float64 with NaN for missing
+    Returns: (numbers, invalid)
+    """
+    numbers, invalid = convert_numbers(values)
+    return np.trunc(numbers), invalid
+
+def _parse_date_texts(texts):
+    """
+    Parse unique date strings in one call; Indonesian month names ("5 Januari 2024") as fallback
+    Returns: dict text -> 'YYYY-MM-DD' (only for the texts that parsed)
+    """
+    with warnings.catch_warnings():
+        # Day-first strings ("15/01/2024") are parsed as before, without the per-call warning
+        warnings.simplefilter('ignore', UserWarning)
+        try:
+            parsed = list(pd.to_datetime(pd.Index(texts, dtype=object), errors='coerce', format='mixed'))
+        except (ValueError, TypeError, OverflowError):
+            parsed = []
+            for text in texts:
+                try:
+                    parsed.append(pd.to_datetime(text))
+                except (ValueError, TypeError, OverflowError):
+                    parsed.append(pd.NaT)
+
+    result = {}
+    for text, timestamp in zip(texts, parsed):
+        if not pd.isna(timestamp):
+            result[text] = timestamp.strftime(DATE_FORMAT)
+            continue
+        match = _MONTH_NAME_DATE_PATTERN.match(text.strip())
+        month = MONTH_NUMBERS.get(match.group(2).upper()) if match else None
+        if month:
+            try:
+                result[text] = date(int(match.group(3)), month, int(match.group(1))).strftime(DATE_FORMAT)
+            except ValueError:
+                pass
+    return result
+
+def _serial_dates(serials):
+    """
+    Excel serial day numbers -> 'YYYY-MM-DD' (None when out of range)
+    """
+    serials = np.asarray(serials, dtype=np.float64)
+    valid = (serials >= 1) & (serials <= EXCEL_MAX_SERIAL)
+    result = np.full(len(serials), None, dtype=object)
+    if valid.any():
+        days = pd.to_timedelta(np.floor(serials[valid]), unit='D')
+        result[valid] = (EXCEL_EPOCH + days).strftime(DATE_FORMAT).to_numpy()
+    return result
+
+def convert_dates(values):
+    """
+    Dates as 'YYYY-MM-DD' strings (None when empty). A cell that is not a date keeps its
+    text, as before, and is marked invalid
+    Returns: (texts, invalid)
+    """
+    series = _as_series(values)
+    n = len(series)
+    texts = np.full(n, None, dtype=object)
+    invalid = np.zeros(n, dtype=bool)
+    filled = series.notna().to_numpy()
+    if not filled.any():
+        return texts.tolist(), invalid
+
+    if pd.api.types.is_datetime64_any_dtype(series):
+        texts[filled] = series[filled].dt.strftime(DATE_FORMAT).to_numpy()
+        return texts.tolist(), invalid
+
+    positions = np.flatnonzero(filled)
+    cells = series.to_numpy(dtype=object)[positions]
+    converted = np.full(len(cells), None, dtype=object)
+
+    is_date = np.fromiter((isinstance(v, date) for v in cells), dtype=bool, count=len(cells))
+    is_number = np.fromiter((isinstance(v, (int, float, np.number)) and not isinstance(v, (bool, np.bool_))
+                             for v in cells), dtype=bool, count=len(cells))
+    is_text = np.fromiter((isinstance(v, str) for v in cells), dtype=bool, count=len(cells))
+
+    if is_date.any():
+        converted[is_date] = [v.strftime(DATE_FORMAT) for v in cells[is_date]]
+    if is_number.any():
+        converted[is_number] = _serial_dates(cells[is_number])
+    if is_text.any():
+        text_cells = cells[is_text]
+        parsed = _parse_date_texts(list(dict.fromkeys(text_cells)))
+        converted[is_text] = [parsed.get(text) for text in text_cells]
+
+    failed = np.equal(converted, None)
+    if failed.any():
+        converted[failed] = [str(v) for v in cells[failed]]
+        invalid[positions[failed & ~_blank_text(cells)]] = True
+    texts[positions] = converted
+    return texts.tolist(), invalid
+
+def convert_text(values, upper=False):
+    """
+    Stripped text (optionally uppercase, e.g. CARA UKUR, JENIS KELAMIN), None when empty
+    """
+    series = _as_series(values)
+    result = np.full(len(series), None, dtype=object)
+    filled = series.notna().to_numpy()
+    if filled.any():
+        text = series[filled].astype(str).str.strip()
+        if upper:
+            text = text.str.upper()
+        result[filled] = text.to_numpy()
+    return result.tolist()
+
+def parse_iso_dates(texts):
+    """
+    'YYYY-MM-DD' strings (as produced by convert_dates) -> datetime64 Series, NaT when empty or unreadable
+    """
+    return pd.to_datetime(pd.Series(texts, dtype=object), format=DATE_FORMAT, errors='coerce')
+
+def age_in_months(tanggal_lahir, tgl_ukur):
+    """
+    Completed months between birth and measurement dates (vectorized, NaN where a date is missing)
+    """
+    lahir = pd.DatetimeIndex(tanggal_lahir)
+    ukur = pd.DatetimeIndex(tgl_ukur)
+    months = (ukur.year - lahir.year) * 12 + (ukur.month - lahir.month) - (ukur.day < lahir.day)
+    return np.asarray(months, dtype=np.float64)
+
+def check_age(tanggal_lahir, tgl_ukur, umur_bulan):
+    """
+    Age in completed months from the dates, and whether the entered UMUR differs from it
+    by more than UMUR_TOLERANCE_BULAN (arrays of datetime64 / float64, one entry per measurement)
+    Returns: (computed, mismatch) - computed is NaN when a date is missing or tgl_ukur is before birth
+    """
+    computed = age_in_months(tanggal_lahir, tgl_ukur)
+    computed[computed < 0] = np.nan
+    with np.errstate(invalid='ignore'):
+        mismatch = np.abs(np.asarray(umur_bulan, dtype=np.float64) - computed) > UMUR_TOLERANCE_BULAN
+    return computed, mismatch
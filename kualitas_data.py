@@ -0,0 +1,282 @@
+"""
+Data quality checks over a whole dataset at once
+
+check_data_quality(children) flattens identity and measurement fields into column arrays and
+runs every check as one column operation. The result is a compact issue list grouped per row:
+
+    {'summary': {...},
+     'issues': [{'child_index', 'row', 'sheet', 'nik', 'nama_anak',
+                 'issues': [{'code', 'severity', 'column', 'period', 'value'}, ...]}, ...]}
+
+Severity and message per code are in ISSUE_TYPES; describe_issues adds the messages for API pages.
+"""
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from konversi_kolom import UMUR_TOLERANCE_BULAN, age_in_months, parse_iso_dates
+
+ERROR = 'error'
+WARNING = 'warning'
+
+# Physiologically possible values for children under five
+BERAT_RANGE_KG = (0.5, 40.0)
+TINGGI_RANGE_CM = (35.0, 130.0)
+UMUR_RANGE_BULAN = (0, 60)
+
+NIK_LENGTH = 16
+JENIS_KELAMIN_VALUES = ('L', 'P')
+CARA_UKUR_VALUES = ('BERDIRI', 'TERLENTANG')
+
+ISSUE_TYPES = {
+    'NIK_KOSONG': (WARNING, 'NIK kosong'),
+    'NIK_TIDAK_VALID': (ERROR, f'NIK harus {NIK_LENGTH} digit angka'),
+    'NIK_GANDA': (WARNING, 'NIK sama dengan anak lain'),
+    'JENIS_KELAMIN_TIDAK_VALID': (ERROR, 'Jenis kelamin harus L atau P'),
+    'TANGGAL_LAHIR_KOSONG': (WARNING, 'Tanggal lahir kosong, umur tidak dapat diperiksa'),
+    'TANGGAL_LAHIR_TIDAK_VALID': (ERROR, 'Tanggal lahir tidak terbaca'),
+    'TANGGAL_LAHIR_MASA_DEPAN': (ERROR, 'Tanggal lahir di masa depan'),
+    'TGL_UKUR_TIDAK_VALID': (ERROR, 'Tanggal ukur tidak terbaca'),
+    'TGL_UKUR_SEBELUM_LAHIR': (ERROR, 'Tanggal ukur sebelum tanggal lahir'),
+    'TGL_UKUR_MASA_DEPAN': (ERROR, 'Tanggal ukur di masa depan'),
+    'UMUR_TIDAK_SESUAI': (WARNING, 'Umur tidak sesuai dengan tanggal lahir dan tanggal ukur'),
+    'UMUR_DI_LUAR_RENTANG': (WARNING, f'Umur di luar {UMUR_RANGE_BULAN[0]}-{UMUR_RANGE_BULAN[1]} bulan'),
+    'BERAT_TIDAK_MUNGKIN': (ERROR, f'Berat badan di luar {BERAT_RANGE_KG[0]}-{BERAT_RANGE_KG[1]} kg'),
+    'TINGGI_TIDAK_MUNGKIN': (ERROR, f'Tinggi badan di luar {TINGGI_RANGE_CM[0]}-{TINGGI_RANGE_CM[1]} cm'),
+    'CARA_UKUR_TIDAK_VALID': (WARNING, 'Cara ukur harus BERDIRI atau TERLENTANG'),
+}
+
+def _numbers(values):
+    return pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=np.float64)
+
+def _flatten(children):
+    """
+    Identity columns (one entry per child) and measurement columns (one entry per measurement)
+    """
+    identity = {'nik': [], 'jenis_kelamin': [], 'tanggal_lahir': []}
+    measurements = {'child': [], 'periode': [], 'tgl_ukur': [], 'umur_bulan': [],
+                    'berat_kg': [], 'tinggi_cm': [], 'cara_ukur': []}
+    for child_pos, child in enumerate(children):
+        identity['nik'].append(child.get('nik'))
+        identity['jenis_kelamin'].append(child.get('jenis_kelamin'))
+        identity['tanggal_lahir'].append(child.get('tanggal_lahir'))
+        for measurement in child.get('measurements', []):
+            measurements['child'].append(child_pos)
+            measurements['periode'].append(measurement.get('periode'))
+            measurements['tgl_ukur'].append(measurement.get('tgl_ukur'))
+            measurements['umur_bulan'].append(measurement.get('umur_bulan'))
+            measurements['berat_kg'].append(measurement.get('berat_kg'))
+            measurements['tinggi_cm'].append(measurement.get('tinggi_cm'))
+            measurements['cara_ukur'].append(measurement.get('cara_ukur'))
+    return identity, measurements
+
+class _IssueCollector:
+    """
+    Collects issues per check as arrays (child position, cell value) and groups them per row at the end
+    """
+
+    def __init__(self):
+        self._parts = []
+
+    def add(self, mask, code, column, child_positions, values, periods=None):
+        positions = np.flatnonzero(mask)
+        if len(positions):
+            self._parts.append((code, column, np.asarray(child_positions)[positions],
+                                np.asarray(values, dtype=object)[positions],
+                                None if periods is None else np.asarray(periods, dtype=object)[positions]))
+
+    def group(self, children):
+        rows = {}
+        for code, column, child_positions, values, periods in self._parts:
+            severity = ISSUE_TYPES[code][0]
+            for k, child_pos in enumerate(child_positions.tolist()):
+                value = values[k]
+                rows.setdefault(child_pos, []).append({
+                    'code': code,
+                    'severity': severity,
+                    'column': column,
+                    'period': None if periods is None else periods[k],
+                    'value': value.item() if isinstance(value, np.generic) else value
+                })
+
+        issues = []
+        for child_pos in sorted(rows):
+            child = children[child_pos]
+            issues.append({
+                'child_index': child_pos,
+                'row': child.get('row'),
+                'sheet': child.get('sheet'),
+                'nik': child.get('nik'),
+                'nama_anak': child.get('nama_anak'),
+                'issues': rows[child_pos]
+            })
+        return issues
+
+def _duplicate_nik(nik):
+    """
+    Mask of filled NIKs that occur more than once (nik: Series, one entry per child)
+    """
+    nik_filled = nik.notna() & (nik.astype(str).str.strip() != '')
+    return (nik_filled & nik.duplicated(keep=False)).to_numpy()
+
+def check_data_quality(children, today=None):
+    """
+    Run all data quality checks on a list of children (dicts or compact measurements)
+    Returns: {'summary': {...}, 'issues': [...]} - issues grouped per row, in child order
+    """
+    start = time.perf_counter()
+    today = pd.Timestamp(today or date.today())
+    identity, measurements = _flatten(children)
+    n_children = len(children)
+    child_positions = np.arange(n_children)
+    collector = _IssueCollector()
+
+    # NIK: present, 16 digits, unique
+    nik = pd.Series(identity['nik'], dtype=object)
+    nik_filled = nik.notna() & (nik.astype(str).str.strip() != '')
+    nik_digits = nik.astype(str).str.fullmatch(rf'\d{{{NIK_LENGTH}}}')
+    collector.add(~nik_filled.to_numpy(), 'NIK_KOSONG', 'NIK', child_positions, nik)
+    collector.add((nik_filled & ~nik_digits).to_numpy(), 'NIK_TIDAK_VALID', 'NIK', child_positions, nik)
+    collector.add(_duplicate_nik(nik), 'NIK_GANDA', 'NIK', child_positions, nik)
+
+    # JENIS KELAMIN: L or P (needed for the WHO reference)
+    jenis_kelamin = pd.Series(identity['jenis_kelamin'], dtype=object)
+    collector.add((~jenis_kelamin.isin(JENIS_KELAMIN_VALUES)).to_numpy(), 'JENIS_KELAMIN_TIDAK_VALID',
+                  'JENIS KELAMIN', child_positions, jenis_kelamin)
+
+    # TANGGAL LAHIR: present, readable, not in the future
+    lahir_text = pd.Series(identity['tanggal_lahir'], dtype=object)
+    lahir = parse_iso_dates(lahir_text)
+    lahir_filled = lahir_text.notna().to_numpy()
+    collector.add(~lahir_filled, 'TANGGAL_LAHIR_KOSONG', 'TANGGAL LAHIR', child_positions, lahir_text)
+    collector.add(lahir_filled & lahir.isna().to_numpy(), 'TANGGAL_LAHIR_TIDAK_VALID', 'TANGGAL LAHIR',
+                  child_positions, lahir_text)
+    collector.add((lahir > today).to_numpy(), 'TANGGAL_LAHIR_MASA_DEPAN', 'TANGGAL LAHIR', child_positions, lahir_text)
+
+    # Measurements
+    owner = np.asarray(measurements['child'], dtype=np.int64)
+    periods = measurements['periode']
+    tgl_text = pd.Series(measurements['tgl_ukur'], dtype=object)
+    tgl = parse_iso_dates(tgl_text)
+    tgl_filled = tgl_text.notna().to_numpy()
+    lahir_per_measurement = lahir.to_numpy()[owner] if len(owner) else np.array([], dtype='datetime64[ns]')
+
+    collector.add(tgl_filled & tgl.isna().to_numpy(), 'TGL_UKUR_TIDAK_VALID', 'TGL UKUR', owner, tgl_text, periods)
+    collector.add((tgl.to_numpy() < lahir_per_measurement), 'TGL_UKUR_SEBELUM_LAHIR', 'TGL UKUR', owner, tgl_text, periods)
+    collector.add((tgl > today).to_numpy(), 'TGL_UKUR_MASA_DEPAN', 'TGL UKUR', owner, tgl_text, periods)
+
+    # UMUR: within the WHO range and consistent with the dates
+    umur = _numbers(measurements['umur_bulan'])
+    computed = age_in_months(lahir_per_measurement, tgl.to_numpy())
+    with np.errstate(invalid='ignore'):
+        collector.add((umur < UMUR_RANGE_BULAN[0]) | (umur > UMUR_RANGE_BULAN[1]), 'UMUR_DI_LUAR_RENTANG', 'UMUR',
+                      owner, measurements['umur_bulan'], periods)
+        collector.add(np.abs(umur - computed) > UMUR_TOLERANCE_BULAN, 'UMUR_TIDAK_SESUAI', 'UMUR',
+                      owner, measurements['umur_bulan'], periods)
+
+        # BERAT / TINGGI: physically possible
+        berat = _numbers(measurements['berat_kg'])
+        collector.add((berat < BERAT_RANGE_KG[0]) | (berat > BERAT_RANGE_KG[1]), 'BERAT_TIDAK_MUNGKIN', 'BERAT',
+                      owner, measurements['berat_kg'], periods)
+        tinggi = _numbers(measurements['tinggi_cm'])
+        collector.add((tinggi < TINGGI_RANGE_CM[0]) | (tinggi > TINGGI_RANGE_CM[1]), 'TINGGI_TIDAK_MUNGKIN', 'TINGGI',
+                      owner, measurements['tinggi_cm'], periods)
+
+    cara_ukur = pd.Series(measurements['cara_ukur'], dtype=object)
+    collector.add((cara_ukur.notna() & ~cara_ukur.isin(CARA_UKUR_VALUES)).to_numpy(), 'CARA_UKUR_TIDAK_VALID',
+                  'CARA UKUR', owner, cara_ukur, periods)
+
+    issues = collector.group(children)
+    return {
+        'summary': summarize(issues, n_children, len(owner), time.perf_counter() - start),
+        'issues': issues
+    }
+
+def summarize(issues, total_children, total_measurements, seconds=None):
+    by_code = {}
+    for row in issues:
+        for issue in row['issues']:
+            by_code[issue['code']] = by_code.get(issue['code'], 0) + 1
+    return {
+        'total_children': total_children,
+        'total_measurements': total_measurements,
+        'rows_with_issues': len(issues),
+        'total_issues': sum(by_code.values()),
+        'errors': sum(count for code, count in by_code.items() if ISSUE_TYPES[code][0] == ERROR),
+        'warnings': sum(count for code, count in by_code.items() if ISSUE_TYPES[code][0] == WARNING),
+        'by_code': by_code,
+        'seconds': round(seconds, 4) if seconds is not None else None
+    }
+
+def merge_data_quality(reports, children=None):
+    """
+    Combine per-sheet reports; reports: [(report, child_offset)] in the order children were merged
+    children: the merged children; NIK_GANDA is then also checked across sheets
+    """
+    start = time.perf_counter()
+    issues = []
+    total_children = 0
+    total_measurements = 0
+    seconds = 0.0
+    for report, child_offset in reports:
+        for row in report['issues']:
+            issues.append(dict(row, child_index=row['child_index'] + child_offset))
+        total_children += report['summary']['total_children']
+        total_measurements += report['summary']['total_measurements']
+        seconds += report['summary']['seconds'] or 0.0
+
+    if children is not None and len(reports) > 1:
+        issues = _add_duplicate_nik(issues, children)
+        seconds += time.perf_counter() - start
+    return {'summary': summarize(issues, total_children, total_measurements, seconds), 'issues': issues}
+
+def _add_duplicate_nik(issues, children):
+    """
+    Flag NIK_GANDA over all merged children (per-sheet checks only see their own sheet)
+    """
+    nik = pd.Series([child.get('nik') for child in children], dtype=object)
+    duplicates = np.flatnonzero(_duplicate_nik(nik)).tolist()
+    if not duplicates:
+        return issues
+
+    rows = {row['child_index']: row for row in issues}
+    for child_pos in duplicates:
+        child = children[child_pos]
+        issue = {'code': 'NIK_GANDA', 'severity': ISSUE_TYPES['NIK_GANDA'][0], 'column': 'NIK',
+                 'period': None, 'value': child.get('nik')}
+        row = rows.get(child_pos)
+        if row is None:
+            rows[child_pos] = {
+                'child_index': child_pos,
+                'row': child.get('row'),
+                'sheet': child.get('sheet'),
+                'nik': child.get('nik'),
+                'nama_anak': child.get('nama_anak'),
+                'issues': [issue]
+            }
+        elif not any(existing['code'] == 'NIK_GANDA' for existing in row['issues']):
+            row['issues'] = row['issues'] + [issue]
+    return [rows[child_pos] for child_pos in sorted(rows)]
+
+def filter_issues(issues, severity=None, code=None):
+    """
+    Rows that have issues of the given severity / code, keeping only those issues
+    """
+    if not severity and not code:
+        return issues
+    filtered = []
+    for row in issues:
+        matching = [issue for issue in row['issues']
+                    if (not severity or issue['severity'] == severity) and (not code or issue['code'] == code)]
+        if matching:
+            filtered.append(dict(row, issues=matching))
+    return filtered
+
+def describe_issues(rows):
+    """
+    Add the message text to each issue (for API pages; the stored report keeps codes only)
+    """
+    return [dict(row, issues=[dict(issue, message=ISSUE_TYPES[issue['code']][1]) for issue in row['issues']])
+            for row in rows]
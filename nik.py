@@ -0,0 +1,20 @@
+"""
+NIK (Nomor Induk Kependudukan) normalization, shared by the archive, statistics,
+upload comparison and filters so a child gets the same key everywhere
+"""
+import re
+
+_NON_DIGITS = re.compile(r'\D')
+
+def normalize_nik(nik):
+    """
+    NIK as digits only ("'3201 0101.0101-0001" -> "3201010101010001"); None when no digits are left.
+    A trailing '.0' from a numeric Excel cell is dropped first.
+    """
+    if nik is None:
+        return None
+    text = str(nik).strip()
+    if text.endswith('.0'):
+        text = text[:-2]
+    text = _NON_DIGITS.sub('', text)
+    return text or None
@@ -0,0 +1,212 @@
+"""
+Compact measurement record: one slotted object per measurement instead of a ~20-key dict.
+Status fields are stored as small integer codes, reference ranges and (per dataset) period
+labels and dates are interned, and the record keeps the original key order, so it reads,
+compares and serializes exactly like the dict.
+"""
+from collections.abc import MutableMapping
+
+# Code tables: value stored as its index; values outside a table are stored unchanged
+STATUS_BB = ('TIDAK LENGKAP', 'NORMAL', 'KURANG', 'LEBIH', 'OUT_OF_RANGE')
+STATUS_TB = ('TIDAK LENGKAP', 'NORMAL', 'PENDEK', 'TINGGI', 'OUT_OF_RANGE')
+STATUS_TB_RASIONAL = ('NO_BASELINE', 'NORMAL', 'DANGER', 'AMBIGU_METHODOLOGY')
+STATUS_PERTUMBUHAN = ('NO_DATA', 'NO_BASELINE', 'NORMAL', 'STAGNAN', 'FALTERING')
+CARA_UKUR = ('BERDIRI', 'TERLENTANG')
+CATATAN_TB_RASIONAL = (
+    "Tidak ada data sebelumnya untuk memverifikasi rasionalitas tinggi badan.",
+    "Tidak ada data tinggi badan untuk periode ini.",
+    "Tinggi badan menurun, tidak rasional.",
+    "Penurunan kecil bisa karena beda metode ukur.",
+    "Penurunan besar, kemungkinan data salah.",
+    "Tinggi badan stabil dibanding bulan sebelumnya.",
+    "Pertumbuhan tinggi badan normal.",
+)
+
+CODE_TABLES = {
+    'status_bb': STATUS_BB,
+    'status_tb': STATUS_TB,
+    'status_tb_rasional': STATUS_TB_RASIONAL,
+    'status_pertumbuhan': STATUS_PERTUMBUHAN,
+    'cara_ukur': CARA_UKUR,
+    'catatan_tb_rasional': CATATAN_TB_RASIONAL,
+}
+_CODES = {field: {value: code for code, value in enumerate(table)} for field, table in CODE_TABLES.items()}
+
+# WHO reference ranges: a fixed, small set of strings, interned for the life of the process
+REFERENCE_FIELDS = frozenset(('rentang_bb_ideal', 'rentang_tb_ideal'))
+# Period labels and measurement dates (many children are measured on the same posyandu day):
+# interned in a table that lives only while one dataset is compacted (compact_children)
+DATASET_INTERNED_FIELDS = frozenset(('periode', 'tgl_ukur'))
+
+FIELDS = (
+    'periode', 'periode_key', 'tgl_ukur', 'umur_bulan', 'umur_bulan_hitung', 'umur_tidak_sesuai',
+    'berat_kg', 'tinggi_cm', 'cara_ukur',
+    'has_complete_data', 'is_incomplete', 'fingerprint', 'status_tb_rasional', 'catatan_tb_rasional',
+    'status_bb', 'status_tb', 'rentang_bb_ideal', 'rentang_tb_ideal',
+    'kecepatan_bb_kg_per_bulan', 'kecepatan_tb_cm_per_bulan', 'selang_bulan',
+    'status_pertumbuhan', 'periode_stagnan',
+)
+_FIELD_SET = frozenset(FIELDS)
+
+# Shared instances of key layouts and reference ranges (both bounded by the code, not the data)
+_layouts = {}
+_reference_ranges = {}
+
+def _layout(keys):
+    keys = tuple(keys)
+    return _layouts.setdefault(keys, keys)
+
+def _encode(key, value):
+    if value.__class__ is str:
+        codes = _CODES.get(key)
+        if codes is not None:
+            return codes.get(value, value)
+        if key in REFERENCE_FIELDS:
+            return _reference_ranges.setdefault(value, value)
+    return value
+
+def _decode(key, value):
+    if value.__class__ is int and key in CODE_TABLES:
+        return CODE_TABLES[key][value]
+    return value
+
+class Measurement(MutableMapping):
+    """
+    Dict-compatible measurement record (get, [], in, items, ==, dict(m) all behave like the dict)
+    """
+    __slots__ = FIELDS + ('_keys', '_extra')
+
+    def __init__(self, data=()):
+        self._keys = ()
+        self._extra = None
+        if data:
+            self.update(data)
+
+    @classmethod
+    def from_dict(cls, data, interned=None):
+        """
+        Compact record from a dict; interned: per-dataset table for DATASET_INTERNED_FIELDS
+        """
+        measurement = cls.__new__(cls)
+        extra = None
+        for key, value in data.items():
+            if key in _FIELD_SET:
+                # _encode inlined: this runs for every field of every measurement
+                if value.__class__ is str:
+                    codes = _CODES.get(key)
+                    if codes is not None:
+                        value = codes.get(value, value)
+                    elif key in REFERENCE_FIELDS:
+                        value = _reference_ranges.setdefault(value, value)
+                    elif interned is not None and key in DATASET_INTERNED_FIELDS:
+                        value = interned.setdefault(value, value)
+                setattr(measurement, key, value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        measurement._keys = _layout(data.keys())
+        measurement._extra = extra
+        return measurement
+
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            try:
+                return _decode(key, object.__getattribute__(self, key))
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __setitem__(self, key, value):
+        if key not in self._keys:
+            self._keys = _layout(self._keys + (key,))
+        if key in _FIELD_SET:
+            object.__setattr__(self, key, _encode(key, value))
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        self._keys = _layout(k for k in self._keys if k != key)
+        if key in _FIELD_SET:
+            object.__delattr__(self, key)
+        else:
+            del self._extra[key]
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __eq__(self, other):
+        if isinstance(other, (Measurement, dict)):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"Measurement({self.to_dict()!r})"
+
+    def to_dict(self):
+        """
+        Expand to a plain dict (strings decoded), in the original key order
+        """
+        result = {}
+        for key in self._keys:
+            if key in _FIELD_SET:
+                value = getattr(self, key)
+                if value.__class__ is int and key in CODE_TABLES:
+                    value = CODE_TABLES[key][value]
+                result[key] = value
+            else:
+                result[key] = self._extra[key]
+        return result
+
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state):
+        restored = Measurement.from_dict(state)
+        for slot in Measurement.__slots__:
+            try:
+                object.__setattr__(self, slot, object.__getattribute__(restored, slot))
+            except AttributeError:
+                pass
+
+    def __deepcopy__(self, memo):
+        return Measurement.from_dict(self.to_dict())
+
+def compact_children(children):
+    """
+    Replace every measurement dict with a compact Measurement (in place)
+    Period labels and dates are shared within this dataset; the table is dropped afterwards
+    """
+    interned = {}
+    for child in children:
+        child['measurements'] = [
+            m if isinstance(m, Measurement) else Measurement.from_dict(m, interned)
+            for m in child.get('measurements', [])
+        ]
+    return children
+
+def json_default(obj):
+    """
+    json.dump(s) default hook: serialize Measurement records as plain dicts
+    """
+    if isinstance(obj, Measurement):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
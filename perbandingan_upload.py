@@ -0,0 +1,233 @@
+"""
+Fingerprints and diff between two processed uploads (e.g. a corrected file re-uploaded)
+
+Every child and measurement gets a stable hash at ingest, computed column-wise for the
+whole sheet (pandas hash_array: SipHash with a fixed key, so every worker process gets
+the same value). Two datasets are compared in linear time: children are matched by
+normalized NIK (name + birth date when NIK is empty), measurements by period, and only
+children whose fingerprint differs are compared field by field.
+"""
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from nik import normalize_nik
+
+# Fields entered in the sheet; 'no' and the Excel row are left out, inserting a row is not a change
+CHILD_FIELDS = ('nama_anak', 'tanggal_lahir', 'jenis_kelamin', 'tempat')
+MEASUREMENT_FIELDS = ('tgl_ukur', 'umur_bulan', 'berat_kg', 'tinggi_cm', 'cara_ukur')
+NUMERIC_MEASUREMENT_FIELDS = frozenset(('umur_bulan', 'berat_kg', 'tinggi_cm'))
+STATUS_FIELDS = ('status_bb', 'status_tb', 'status_tb_rasional', 'status_pertumbuhan')
+
+# Fingerprints are kept to 53 bits: exact as JSON numbers in the browser
+FINGERPRINT_MASK = np.uint64((1 << 53) - 1)
+
+def _mix(values):
+    """
+    splitmix64 finalizer (uint64 arrays, wrapping arithmetic)
+    """
+    values = values ^ (values >> np.uint64(30))
+    values = values * np.uint64(0xBF58476D1CE4E5B9)
+    values = values ^ (values >> np.uint64(27))
+    values = values * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+def _hash_columns(columns):
+    """
+    One uint64 per row from several columns (order matters)
+    """
+    combined = np.zeros(len(columns[0]), dtype=np.uint64)
+    for column in columns:
+        combined = _mix(combined ^ pd.util.hash_array(column, categorize=False))
+    return combined
+
+def measurement_hashes(tgl_ukur, umur_bulan, berat_kg, tinggi_cm, cara_ukur):
+    """
+    Unmasked measurement hashes from column arrays: dates and cara ukur as object arrays,
+    umur / berat / tinggi as float64 (NaN when empty)
+    """
+    return _hash_columns([np.asarray(tgl_ukur, dtype=object), np.asarray(umur_bulan, dtype=np.float64),
+                          np.asarray(berat_kg, dtype=np.float64), np.asarray(tinggi_cm, dtype=np.float64),
+                          np.asarray(cara_ukur, dtype=object)])
+
+def keyed_by_period(hashes, periods):
+    """
+    Measurement hashes tied to their period; a child's fingerprint is the sum of these,
+    so the order of the period columns does not matter
+    """
+    return _mix(hashes ^ pd.util.hash_array(np.asarray(periods, dtype=object), categorize=False))
+
+def child_hashes(identity, period_sums):
+    """
+    Child fingerprints from the CHILD_FIELDS columns (object arrays) and the summed keyed measurement hashes
+    """
+    return _mix(_hash_columns(identity) ^ period_sums) & FINGERPRINT_MASK
+
+def fingerprint_children(children):
+    """
+    Fingerprints for children that were not fingerprinted at ingest (same values as extract_children)
+    Returns: (child fingerprints, measurement fingerprints per child) as Python ints
+    """
+    measurements = [measurement for child in children for measurement in child.get('measurements', [])]
+    counts = np.array([len(child.get('measurements', [])) for child in children], dtype=np.int64)
+    hashes = measurement_hashes(*[[measurement.get(field) for measurement in measurements]
+                                  for field in MEASUREMENT_FIELDS])
+    keyed = keyed_by_period(hashes, [_period(measurement) for measurement in measurements])
+    cumulative = np.concatenate((np.zeros(1, dtype=np.uint64), np.cumsum(keyed, dtype=np.uint64)))
+    ends = np.cumsum(counts)
+    period_sums = cumulative[ends] - cumulative[ends - counts]
+    identity = [np.array([child.get(field) for child in children], dtype=object) for field in CHILD_FIELDS]
+
+    measurement_list = (hashes & FINGERPRINT_MASK).tolist()
+    per_child = []
+    position = 0
+    for count in counts.tolist():
+        per_child.append(measurement_list[position:position + count])
+        position += count
+    return child_hashes(identity, period_sums).tolist(), per_child
+
+def add_fingerprints(children):
+    """
+    Set 'fingerprint' on every measurement and child (in place)
+    """
+    child_hashes, measurement_hashes = fingerprint_children(children)
+    for child, child_hash, hashes in zip(children, child_hashes, measurement_hashes):
+        for measurement, measurement_hash in zip(child.get('measurements', []), hashes):
+            measurement['fingerprint'] = measurement_hash
+        child['fingerprint'] = child_hash
+    return children
+
+def _stored_fingerprints(children):
+    """
+    Fingerprints set at ingest, or computed now for data processed without them
+    Returns: (child fingerprints, measurement fingerprints per child or None when stored on the measurements)
+    """
+    if all('fingerprint' in child for child in children):
+        return [child['fingerprint'] for child in children], None
+    return fingerprint_children(children)
+
+def _measurement_fingerprints(children, per_child, position):
+    if per_child is not None:
+        return per_child[position]
+    return [measurement.get('fingerprint') for measurement in children[position].get('measurements', [])]
+
+def _period(measurement):
+    period_key = measurement.get('periode_key')
+    return period_key if period_key is not None else measurement.get('periode')
+
+def _index_children(children):
+    """
+    Child positions by key; a NIK entered twice in one upload is told apart by its occurrence
+    """
+    index = {}
+    seen = Counter()
+    for position, child in enumerate(children):
+        base_key = normalize_nik(child.get('nik')) or (child.get('nama_anak'), child.get('tanggal_lahir'))
+        key = (base_key, seen[base_key])
+        seen[base_key] += 1
+        index[key] = position
+    return index
+
+def _child_item(child):
+    return {
+        'nik': child.get('nik'),
+        'nama_anak': child.get('nama_anak'),
+        'tempat': child.get('tempat'),
+        'sheet': child.get('sheet'),
+        'row': child.get('row'),
+        'total_measurements': len(child.get('measurements', []))
+    }
+
+def _changed_fields(old, new, fields):
+    return {field: [old.get(field), new.get(field)] for field in fields if old.get(field) != new.get(field)}
+
+def diff_results(base, current):
+    """
+    Compare two processed datasets (process_excel_to_json shape), base = earlier upload
+    Returns: summary plus lists of added / removed children, identity changes,
+    measurement changes (added / removed / changed with old and new values) and status transitions
+    """
+    base_children = base.get('children', [])
+    current_children = current.get('children', [])
+    base_index = _index_children(base_children)
+    current_index = _index_children(current_children)
+    base_hashes, base_measurement_hashes = _stored_fingerprints(base_children)
+    current_hashes, current_measurement_hashes = _stored_fingerprints(current_children)
+
+    children_added = []
+    identity_changes = []
+    measurement_changes = []
+    status_transitions = []
+    transition_counts = {field: Counter() for field in STATUS_FIELDS}
+    unchanged = 0
+
+    for key, position in current_index.items():
+        child = current_children[position]
+        old_position = base_index.get(key)
+        if old_position is None:
+            children_added.append(_child_item(child))
+            continue
+        if base_hashes[old_position] == current_hashes[position]:
+            unchanged += 1
+            continue
+        old_child = base_children[old_position]
+
+        item = _child_item(child)
+        fields = _changed_fields(old_child, child, CHILD_FIELDS)
+        if fields:
+            identity_changes.append(dict(item, fields=fields))
+
+        old_measurements = {_period(m): (m, h) for m, h in zip(
+            old_child.get('measurements', []),
+            _measurement_fingerprints(base_children, base_measurement_hashes, old_position))}
+        for measurement, measurement_hash in zip(
+                child.get('measurements', []),
+                _measurement_fingerprints(current_children, current_measurement_hashes, position)):
+            old, old_hash = old_measurements.pop(_period(measurement), (None, None))
+            change = {'nik': item['nik'], 'nama_anak': item['nama_anak'], 'tempat': item['tempat'],
+                      'periode': measurement.get('periode'), 'periode_key': measurement.get('periode_key')}
+            if old is None:
+                measurement_changes.append(dict(change, change='added',
+                                                fields=_changed_fields({}, measurement, MEASUREMENT_FIELDS)))
+                continue
+            if old_hash != measurement_hash:
+                measurement_changes.append(dict(change, change='changed',
+                                                fields=_changed_fields(old, measurement, MEASUREMENT_FIELDS)))
+            # Statuses also move when only the previous period was corrected (height rationality, velocity)
+            for field in STATUS_FIELDS:
+                before, after = old.get(field), measurement.get(field)
+                if before != after:
+                    transition_counts[field][f'{before} → {after}'] += 1
+                    status_transitions.append(dict(change, field=field, **{'from': before, 'to': after}))
+        for old, _ in old_measurements.values():
+            measurement_changes.append({'nik': item['nik'], 'nama_anak': item['nama_anak'], 'tempat': item['tempat'],
+                                        'periode': old.get('periode'), 'periode_key': old.get('periode_key'),
+                                        'change': 'removed',
+                                        'fields': _changed_fields(old, {}, MEASUREMENT_FIELDS)})
+
+    children_removed = [_child_item(base_children[position]) for key, position in base_index.items()
+                        if key not in current_index]
+    changes_by_type = Counter(change['change'] for change in measurement_changes)
+
+    return {
+        'summary': {
+            'base_children': len(base_index),
+            'current_children': len(current_index),
+            'children_added': len(children_added),
+            'children_removed': len(children_removed),
+            'children_changed': len(current_index) - len(children_added) - unchanged,
+            'children_unchanged': unchanged,
+            'identity_changes': len(identity_changes),
+            'measurements_added': changes_by_type['added'],
+            'measurements_removed': changes_by_type['removed'],
+            'measurements_changed': changes_by_type['changed'],
+            'status_transitions': {field: dict(counts.most_common())
+                                   for field, counts in transition_counts.items() if counts}
+        },
+        'children_added': children_added,
+        'children_removed': children_removed,
+        'identity_changes': identity_changes,
+        'measurement_changes': measurement_changes,
+        'status_transitions': status_transitions
+    }
@@ -0,0 +1,96 @@
+import re
+from datetime import date, datetime
+
+# Nama bulan Indonesia & Inggris (lengkap dan singkatan) -> nomor bulan
+MONTH_NUMBERS = {
+    'JANUARI': 1, 'JANUARY': 1, 'JAN': 1,
+    'FEBRUARI': 2, 'FEBRUARY': 2, 'PEBRUARI': 2, 'FEB': 2, 'PEB': 2,
+    'MARET': 3, 'MARCH': 3, 'MAR': 3,
+    'APRIL': 4, 'APR': 4,
+    'MEI': 5, 'MAY': 5,
+    'JUNI': 6, 'JUNE': 6, 'JUN': 6,
+    'JULI': 7, 'JULY': 7, 'JUL': 7,
+    'AGUSTUS': 8, 'AUGUST': 8, 'AGU': 8, 'AGS': 8, 'AGT': 8, 'AUG': 8,
+    'SEPTEMBER': 9, 'SEPT': 9, 'SEP': 9,
+    'OKTOBER': 10, 'OCTOBER': 10, 'OKT': 10, 'OCT': 10,
+    'NOVEMBER': 11, 'NOPEMBER': 11, 'NOV': 11, 'NOP': 11,
+    'DESEMBER': 12, 'DECEMBER': 12, 'DES': 12, 'DEC': 12,
+}
+
+MONTH_LABELS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+_MONTH_NAME_PATTERN = re.compile(r'^([A-Z]+)[\s\-/.,]*(\d{2}|\d{4})$')
+_YEAR_MONTH_PATTERN = re.compile(r'^(\d{4})[\-/.](\d{1,2})(?:[\-/.]\d{1,2})?(?:[ T].*)?$')
+_MONTH_YEAR_PATTERN = re.compile(r'^(\d{1,2})[\-/.](\d{4})$')
+
+def make_period_key(year, month):
+    """
+    Canonical integer period key: YYYYMM (e.g. 202401)
+    """
+    return year * 100 + month
+
+def _normalize_year(year_str):
+    year = int(year_str)
+    return year + 2000 if year < 100 else year
+
+def parse_period_key(label):
+    """
+    Parse a period label ("JANUARI 2024", "Jan 2025", "2024-01", "01/2024", date) to YYYYMM
+    Returns None if the label cannot be parsed (e.g. "Periode 3")
+    """
+    if label is None:
+        return None
+
+    if isinstance(label, (datetime, date)):
+        return make_period_key(label.year, label.month)
+
+    text = str(label).strip().upper()
+    if not text:
+        return None
+
+    match = _MONTH_NAME_PATTERN.match(text)
+    if match and match.group(1) in MONTH_NUMBERS:
+        return make_period_key(_normalize_year(match.group(2)), MONTH_NUMBERS[match.group(1)])
+
+    match = _YEAR_MONTH_PATTERN.match(text)
+    if match and 1 <= int(match.group(2)) <= 12:
+        return make_period_key(int(match.group(1)), int(match.group(2)))
+
+    match = _MONTH_YEAR_PATTERN.match(text)
+    if match and 1 <= int(match.group(1)) <= 12:
+        return make_period_key(int(match.group(2)), int(match.group(1)))
+
+    return None
+
+def period_sort_key(period_key):
+    """
+    Sort key that keeps unparsed periods (None) after all parsed ones
+    """
+    return (period_key is None, period_key or 0)
+
+def generate_period_labels(start_year, start_month, count):
+    """
+    Generate chronological labels "Jan 2025", "Feb 2025", ... for formats without period names
+    """
+    labels = []
+    year, month = start_year, start_month
+    for _ in range(count):
+        labels.append(f"{MONTH_LABELS[month - 1]} {year}")
+        month += 1
+        if month > 12:
+            month = 1
+            year += 1
+    return labels
+
+def build_period_index(children):
+    """
+    Build index: period key -> list of [child offset, measurement offset]
+    Keys are strings so the index serializes to JSON unchanged; unparsed periods use their label
+    """
+    period_index = {}
+    for child_idx, child in enumerate(children):
+        for measurement_idx, measurement in enumerate(child.get('measurements', [])):
+            period_key = measurement.get('periode_key')
+            index_key = str(period_key) if period_key is not None else str(measurement.get('periode'))
+            period_index.setdefault(index_key, []).append([child_idx, measurement_idx])
+    return period_index
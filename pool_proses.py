@@ -0,0 +1,61 @@
+"""
+Long-lived process pools for sheet ingestion and per-tempat exports
+
+Requests run on gunicorn threads (plus the janitor thread), so worker processes are
+never forked from the serving process: the pools use the 'forkserver' start method
+('spawn' where it is unavailable) and are created once per serving process, on first
+use, then reused by every request. Workers import the pipeline modules once
+(FORKSERVER_PRELOAD) and keep their caches (WHO table) between tasks.
+"""
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Imported by the fork server once, so new workers start with them loaded
+FORKSERVER_PRELOAD = ['excel_to_json_anak', 'export_analisis']
+
+_lock = threading.Lock()
+_pools = {}
+
+def _context():
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+    if context.get_start_method() == 'forkserver':
+        context.set_forkserver_preload(FORKSERVER_PRELOAD)
+    return context
+
+def get_pool(name, max_workers):
+    """
+    Shared pool for name ('ingest', 'export'), created on first use with max_workers processes
+    A pool whose size changed or whose workers died is replaced
+    """
+    with _lock:
+        entry = _pools.get(name)
+        if entry is not None:
+            pool, workers = entry
+            if workers == max_workers and not getattr(pool, '_broken', False):
+                return pool
+            pool.shutdown(wait=False, cancel_futures=True)
+        pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=_context())
+        _pools[name] = (pool, max_workers)
+        return pool
+
+def discard_pool(name, pool):
+    """
+    Drop a pool after BrokenProcessPool so the next request starts a fresh one
+    """
+    with _lock:
+        entry = _pools.get(name)
+        if entry is not None and entry[0] is pool:
+            del _pools[name]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def shutdown():
+    with _lock:
+        pools = [pool for pool, _ in _pools.values()]
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+atexit.register(shutdown)
@@ -0,0 +1,177 @@
+"""
+Opt-in cProfile capture of single requests, for reproducing a slow customer file
+without keeping the file itself.
+
+Off unless CPU_PROFILE=1 and CPU_PROFILE_TOKEN are set; a request is profiled only
+when it carries the token (X-Profile-Token header or ?profile_token=). Each profile
+is written to CPU_PROFILE_DIR (default 'cpu_profiles') as <id>.prof (pstats, e.g. for
+snakeviz), <id>.txt (top functions) and <id>.json (input metadata such as rows,
+periods and format, plus the duration of every pipeline stage).
+
+cProfile follows the request thread only: work in worker processes is not captured,
+so a profiled upload processes its sheets in-process.
+"""
+import cProfile
+import hmac
+import io
+import json
+import os
+import pstats
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+PROFILE_ENV = 'CPU_PROFILE'
+PROFILE_DIR_ENV = 'CPU_PROFILE_DIR'
+TOKEN_ENV = 'CPU_PROFILE_TOKEN'
+DEFAULT_PROFILE_DIR = 'cpu_profiles'
+TOKEN_HEADER = 'X-Profile-Token'
+TOKEN_PARAM = 'profile_token'
+TOP_FUNCTIONS = 40
+
+_PROFILE_ID = re.compile(r'^[A-Za-z0-9._-]+$')
+
+_local = threading.local()
+# Only one profiler can be attached at a time (sys.monitoring on Python 3.12+)
+_profiler_lock = threading.Lock()
+
+def is_enabled():
+    return (os.environ.get(PROFILE_ENV, '').lower() in ('1', 'true', 'yes')
+            and bool(os.environ.get(TOKEN_ENV)))
+
+def profile_dir():
+    return os.environ.get(PROFILE_DIR_ENV, DEFAULT_PROFILE_DIR)
+
+def token_matches(token):
+    """
+    Constant-time comparison with CPU_PROFILE_TOKEN; always False while profiling is disabled
+    """
+    expected = os.environ.get(TOKEN_ENV, '')
+    return is_enabled() and bool(token) and hmac.compare_digest(token.encode(), expected.encode())
+
+def is_active():
+    """
+    True while the current thread is being profiled
+    """
+    return getattr(_local, 'session', None) is not None
+
+@contextmanager
+def profile_session(label, metadata=None):
+    """
+    Run the block under cProfile and write the profile when it ends
+    Yields the session dict (its 'id' names the files), or None when another request holds the profiler
+    """
+    if is_active() or not _profiler_lock.acquire(blocking=False):
+        yield None
+        return
+
+    started_at = datetime.now()
+    safe_label = re.sub(r'[^A-Za-z0-9._-]+', '_', label)[:80]
+    session = {
+        'id': f"{started_at.strftime('%Y%m%d_%H%M%S_%f')}_{safe_label}",
+        'label': label,
+        'started_at': started_at.isoformat(),
+        'metadata': dict(metadata or {}),
+        'stages': []
+    }
+    profiler = cProfile.Profile()
+    _local.session = session
+    start = time.perf_counter()
+    try:
+        profiler.enable()
+        try:
+            yield session
+        finally:
+            profiler.disable()
+    finally:
+        _local.session = None
+        session['seconds'] = round(time.perf_counter() - start, 4)
+        try:
+            write_profile(session, profiler)
+        except Exception as e:
+            print(f"Error writing CPU profile: {str(e)}")
+        finally:
+            _profiler_lock.release()
+
+def annotate(**metadata):
+    """
+    Add input metadata (rows, periods, format, ...) to the current session, if any
+    """
+    session = getattr(_local, 'session', None)
+    if session is not None:
+        session['metadata'].update(metadata)
+
+@contextmanager
+def timed_stage(name):
+    """
+    Record the duration of a pipeline stage in the current session (no-op otherwise)
+    """
+    session = getattr(_local, 'session', None)
+    if session is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        session['stages'].append({'stage': name, 'seconds': round(time.perf_counter() - start, 4)})
+
+def format_report(session, profiler):
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+    lines = [
+        f"CPU profile: {session['label']} ({session['started_at']})",
+        f"Metadata: {json.dumps(session['metadata'], ensure_ascii=False, default=str)}",
+        f"Total: {session['seconds']:.3f}s",
+        ''
+    ]
+    lines.extend(f"{entry['stage']:<22}{entry['seconds']:>9.3f}s" for entry in session['stages'])
+    return '\n'.join(lines) + '\n\n' + stream.getvalue()
+
+def write_profile(session, profiler):
+    """
+    Write <id>.prof, <id>.txt and <id>.json into the profile directory
+    Returns: path of the JSON metadata
+    """
+    output_dir = profile_dir()
+    os.makedirs(output_dir, exist_ok=True)
+    base = os.path.join(output_dir, session['id'])
+    profiler.dump_stats(base + '.prof')
+    with open(base + '.txt', 'w', encoding='utf-8') as f:
+        f.write(format_report(session, profiler))
+    with open(base + '.json', 'w', encoding='utf-8') as f:
+        json.dump(session, f, ensure_ascii=False, indent=2, default=str)
+    return base + '.json'
+
+def list_profiles():
+    """
+    Metadata of the saved profiles, newest first
+    """
+    output_dir = profile_dir()
+    if not os.path.isdir(output_dir):
+        return []
+    profiles = []
+    for name in sorted(os.listdir(output_dir), reverse=True):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(output_dir, name), encoding='utf-8') as f:
+                profile = json.load(f)
+        except (OSError, ValueError):
+            continue
+        profile['files'] = [ext for ext in ('prof', 'txt', 'json')
+                            if os.path.exists(os.path.join(output_dir, f"{profile['id']}.{ext}"))]
+        profiles.append(profile)
+    return profiles
+
+def profile_path(profile_id, ext):
+    """
+    Path of one saved profile file, or None for an unknown id / extension
+    """
+    if ext not in ('prof', 'txt', 'json') or not _PROFILE_ID.match(profile_id or ''):
+        return None
+    path = os.path.join(profile_dir(), f'{profile_id}.{ext}')
+    return path if os.path.isfile(path) else None
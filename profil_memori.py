@@ -0,0 +1,189 @@
+"""
+Memory profiling per pipeline stage (tracemalloc), off by default.
+
+Enable with MEMORY_PROFILE=1 (reports in MEMORY_PROFILE_DIR, default 'memory_profiles')
+or with --memory-profile on batch_processor.py. Entry points open a profile_session();
+pipeline code marks its stages with stage('...'), which also feed the progress stream
+and the stage timings of a CPU profile (profil_cpu). Each session writes a JSON and a text
+report with duration, net and peak memory and the top allocation sites per stage.
+
+tracemalloc is process-wide: concurrent requests in the same process show up in each
+other's numbers, so profile with a single request in flight.
+"""
+import json
+import os
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+from profil_cpu import timed_stage
+from progres import begin_stage
+
+PROFILE_ENV = 'MEMORY_PROFILE'
+PROFILE_DIR_ENV = 'MEMORY_PROFILE_DIR'
+DEFAULT_PROFILE_DIR = 'memory_profiles'
+TOP_SITES = 10
+
+_local = threading.local()
+_tracing_lock = threading.Lock()
+_tracing_sessions = 0
+
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+def is_enabled():
+    return os.environ.get(PROFILE_ENV, '').lower() in ('1', 'true', 'yes')
+
+def enable(output_dir=None):
+    """
+    Switch profiling on for this process and its child processes (CLI flag)
+    """
+    os.environ[PROFILE_ENV] = '1'
+    if output_dir:
+        os.environ[PROFILE_DIR_ENV] = output_dir
+
+def profile_dir():
+    return os.environ.get(PROFILE_DIR_ENV, DEFAULT_PROFILE_DIR)
+
+def _start_tracing():
+    global _tracing_sessions
+    with _tracing_lock:
+        if _tracing_sessions == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracing_sessions += 1
+
+def _stop_tracing():
+    global _tracing_sessions
+    with _tracing_lock:
+        _tracing_sessions -= 1
+        if _tracing_sessions == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+def _snapshot():
+    return tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+@contextmanager
+def profile_session(label, metadata=None):
+    """
+    Profile everything inside the block (one report per session); no-op unless enabled
+    """
+    if not is_enabled() or getattr(_local, 'session', None) is not None:
+        yield None
+        return
+
+    _start_tracing()
+    session = {
+        'label': label,
+        'started_at': datetime.now().isoformat(),
+        'metadata': metadata or {},
+        'stages': []
+    }
+    _local.session = session
+    start = time.perf_counter()
+    try:
+        yield session
+    finally:
+        _local.session = None
+        session['seconds'] = round(time.perf_counter() - start, 4)
+        session['peak_bytes'] = max((s['peak_bytes'] for s in session['stages']), default=0)
+        _stop_tracing()
+        try:
+            write_report(session)
+        except Exception as e:
+            print(f"Error writing memory profile: {str(e)}")
+
+def annotate(**metadata):
+    """
+    Add input metadata (file name, row counts, ...) to the current session, if any
+    """
+    session = getattr(_local, 'session', None)
+    if session is not None:
+        session['metadata'].update(metadata)
+
+@contextmanager
+def stage(name):
+    """
+    Mark a pipeline stage; records duration, net / peak memory and top allocation sites,
+    announces the stage on the progress stream of the current request (progres) and
+    times it in a CPU profile of the request (profil_cpu)
+    """
+    begin_stage(name)
+    with timed_stage(name), _memory_stage(name):
+        yield
+
+@contextmanager
+def _memory_stage(name):
+    session = getattr(_local, 'session', None)
+    if session is None or not tracemalloc.is_tracing():
+        yield
+        return
+
+    before = _snapshot()
+    current_before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        current_after, peak = tracemalloc.get_traced_memory()
+        after = _snapshot()
+        top_sites = [{
+            'site': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            'size_diff_bytes': stat.size_diff,
+            'size_bytes': stat.size,
+            'count_diff': stat.count_diff
+        } for stat in after.compare_to(before, 'lineno')[:TOP_SITES]]
+        session['stages'].append({
+            'stage': name,
+            'seconds': round(seconds, 4),
+            'start_bytes': current_before,
+            'end_bytes': current_after,
+            'net_bytes': current_after - current_before,
+            'peak_bytes': peak,
+            'peak_above_start_bytes': peak - current_before,
+            'top_sites': top_sites
+        })
+
+def _mb(n_bytes):
+    return f"{n_bytes / 1024 / 1024:8.2f} MB"
+
+def format_report(session):
+    lines = [
+        f"Memory profile: {session['label']} ({session['started_at']})",
+        f"Metadata: {json.dumps(session['metadata'], ensure_ascii=False)}",
+        f"Total: {session['seconds']:.2f}s, peak {_mb(session['peak_bytes']).strip()}",
+        '',
+        f"{'Stage':<22}{'Seconds':>9}{'Net':>14}{'Peak':>14}{'Peak/start':>14}"
+    ]
+    for entry in session['stages']:
+        lines.append(f"{entry['stage']:<22}{entry['seconds']:>9.3f}{_mb(entry['net_bytes']):>14}"
+                     f"{_mb(entry['peak_bytes']):>14}{_mb(entry['peak_above_start_bytes']):>14}")
+    for entry in session['stages']:
+        lines.append('')
+        lines.append(f"[{entry['stage']}] top allocation sites")
+        for site in entry['top_sites']:
+            lines.append(f"  {site['size_diff_bytes'] / 1024:>+12.1f} KiB  {site['count_diff']:>+9}  {site['site']}")
+    return '\n'.join(lines) + '\n'
+
+def write_report(session):
+    """
+    Write <timestamp>_<label>.json and .txt into the profile directory
+    Returns: path of the JSON report
+    """
+    output_dir = profile_dir()
+    os.makedirs(output_dir, exist_ok=True)
+    safe_label = re.sub(r'[^A-Za-z0-9._-]+', '_', session['label'])[:80]
+    base = os.path.join(output_dir, f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{safe_label}")
+    with open(base + '.json', 'w', encoding='utf-8') as f:
+        json.dump(session, f, ensure_ascii=False, indent=2)
+    with open(base + '.txt', 'w', encoding='utf-8') as f:
+        f.write(format_report(session))
+    return base + '.json'
@@ -0,0 +1,278 @@
+"""
+Progress of long uploads and exports, streamed to the browser as Server-Sent Events.
+
+The client picks a progress id, opens /progress/<id> and sends the same id with the
+request (?progress_id=...). The request thread runs inside progress_session(); pipeline
+code reports its stage through profil_memori.stage() and row counts through track(),
+which hands back the iterable unchanged when nothing is being tracked. Row loops report
+every PROGRESS_EVERY rows, so tracking costs nothing measurable per row.
+
+Trackers live in this process only (like export_data_store): the stream has to be served
+by the same process as the request, which holds for the single gunicorn worker.
+
+Every open stream holds a gunicorn thread, so the registry caps concurrent streams
+(max_streams, well below the thread count) and a stream whose job has not started yet
+ends after START_TIMEOUT_SECONDS; the browser reconnects by itself (retry) and clients
+that were refused a stream can poll the snapshot (/progress/<id>/status) instead.
+"""
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+# Rows between two progress updates inside a row loop
+PROGRESS_EVERY = 1000
+# Seconds a finished (or never started) tracker stays available to late subscribers
+RETENTION_SECONDS = 120
+# Seconds between keep-alive comments on an idle stream
+HEARTBEAT_SECONDS = 15
+# Seconds one stream waits for its job to start before it ends (the browser then reconnects)
+START_TIMEOUT_SECONDS = 5
+# Milliseconds the browser waits before reconnecting a stream that ended
+RECONNECT_MILLISECONDS = 1000
+# Concurrent streams per process (each holds a server thread)
+MAX_STREAMS = 3
+
+_VALID_ID = re.compile(r'^[A-Za-z0-9_-]{8,64}$')
+
+_local = threading.local()
+
+def is_valid_id(progress_id):
+    return bool(progress_id) and _VALID_ID.match(progress_id) is not None
+
+class ProgressTracker:
+    """
+    Progress of one job: current stage, rows done / total and timings. Updates bump a
+    version and wake the stream; a slow subscriber only sees the latest state.
+    """
+
+    def __init__(self, progress_id, label=None):
+        self.progress_id = progress_id
+        self.label = label
+        self._condition = threading.Condition()
+        self._version = 0
+        self._started = time.perf_counter()
+        self._stage_started = self._started
+        self._state = {
+            'label': label,
+            'stage': 'menunggu',
+            'done': 0,
+            'total': None,
+            'finished': False,
+            'status': None,
+            'message': None
+        }
+        self.created_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+
+    def _publish(self):
+        self._version += 1
+        self._condition.notify_all()
+
+    def start(self, label):
+        with self._condition:
+            self.label = label
+            self._state.update(label=label, finished=False, status=None, message=None)
+            self._started = self._stage_started = time.perf_counter()
+            self.started_at = time.monotonic()
+            self.finished_at = None
+            self._publish()
+
+    def set_stage(self, name, total=None):
+        with self._condition:
+            self._state.update(stage=name, done=0, total=total)
+            self._stage_started = time.perf_counter()
+            self._publish()
+
+    def update(self, done):
+        with self._condition:
+            self._state['done'] = done
+            self._publish()
+
+    def finish(self, status='done', message=None):
+        with self._condition:
+            if self._state['finished']:
+                return
+            self._state.update(finished=True, status=status, message=message)
+            if status == 'done' and self._state['total'] is not None:
+                self._state['done'] = self._state['total']
+            self.finished_at = time.monotonic()
+            self._publish()
+
+    def _event(self):
+        now = time.perf_counter()
+        return dict(self._state, elapsed=round(now - self._started, 3),
+                    stage_elapsed=round(now - self._stage_started, 3))
+
+    def snapshot(self):
+        with self._condition:
+            return self._event()
+
+    def wait(self, version, timeout):
+        """
+        Block until the state is newer than version (or timeout)
+        Returns: (version, event) - event is None on timeout
+        """
+        with self._condition:
+            if self._version == version:
+                self._condition.wait(timeout)
+            if self._version == version:
+                return version, None
+            return self._version, self._event()
+
+    def track(self, iterable, every=PROGRESS_EVERY):
+        done = 0
+        for item in iterable:
+            yield item
+            done += 1
+            if done % every == 0:
+                self.update(done)
+        self.update(done)
+
+class ProgressRegistry:
+    """
+    Trackers by progress id; the stream and the job may each arrive first
+    """
+
+    def __init__(self, retention_seconds=RETENTION_SECONDS, max_trackers=1000, max_streams=MAX_STREAMS):
+        self.retention_seconds = retention_seconds
+        self.max_trackers = max_trackers
+        self.max_streams = max_streams
+        self._lock = threading.Lock()
+        self._trackers = {}
+        self._streams = 0
+
+    def _expire(self):
+        now = time.monotonic()
+        for progress_id, tracker in list(self._trackers.items()):
+            if tracker.finished_at is not None:
+                idle_since = tracker.finished_at
+            elif tracker.started_at is None:
+                idle_since = tracker.created_at
+            else:
+                continue
+            if now - idle_since > self.retention_seconds:
+                del self._trackers[progress_id]
+
+    def get_or_create(self, progress_id):
+        """
+        Tracker for a valid id, or None when the id is malformed or the registry is full
+        """
+        if not is_valid_id(progress_id):
+            return None
+        with self._lock:
+            tracker = self._trackers.get(progress_id)
+            if tracker is None:
+                self._expire()
+                if len(self._trackers) >= self.max_trackers:
+                    return None
+                tracker = self._trackers[progress_id] = ProgressTracker(progress_id)
+            return tracker
+
+    def get(self, progress_id):
+        """
+        Existing tracker for progress_id, or None (never creates one)
+        """
+        with self._lock:
+            return self._trackers.get(progress_id)
+
+    def acquire_stream(self):
+        """
+        Reserve one of max_streams stream slots; False when all are taken
+        """
+        with self._lock:
+            if self._streams >= self.max_streams:
+                return False
+            self._streams += 1
+            return True
+
+    def release_stream(self):
+        with self._lock:
+            self._streams = max(0, self._streams - 1)
+
+    def stats(self):
+        with self._lock:
+            self._expire()
+            active = sum(1 for tracker in self._trackers.values() if tracker.finished_at is None)
+            return {'trackers': len(self._trackers), 'active': active, 'streams': self._streams,
+                    'max_streams': self.max_streams}
+
+def current():
+    return getattr(_local, 'tracker', None)
+
+@contextmanager
+def progress_session(tracker, label):
+    """
+    Report the stages of everything inside the block to tracker (no-op when tracker is None);
+    the tracker is finished when the block ends ('error' if it raises, unless finished already)
+    """
+    if tracker is None or current() is not None:
+        yield tracker
+        return
+
+    tracker.start(label)
+    _local.tracker = tracker
+    try:
+        yield tracker
+    except BaseException as e:
+        tracker.finish('error', str(e))
+        raise
+    else:
+        tracker.finish('done')
+    finally:
+        _local.tracker = None
+
+def begin_stage(name, total=None):
+    """
+    Announce a stage of the current job, if any
+    """
+    tracker = current()
+    if tracker is not None:
+        tracker.set_stage(name, total)
+    return tracker
+
+def track(iterable, name, total=None):
+    """
+    Iterate and report rows done for stage name; returns iterable itself when nothing is tracked
+    total: row count, or a callable computing it (only called when the job is tracked)
+    """
+    tracker = current()
+    if tracker is None:
+        return iterable
+    tracker.set_stage(name, total() if callable(total) else total)
+    return tracker.track(iterable)
+
+def _sse(event):
+    return f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+def event_stream(tracker, heartbeat=HEARTBEAT_SECONDS, start_timeout=START_TIMEOUT_SECONDS,
+                 retention_seconds=RETENTION_SECONDS):
+    """
+    Server-Sent Events for one tracker, ending after the finished event
+    While no job has picked up the id, the stream ends after start_timeout seconds without a
+    final event (the browser reconnects); once the id has waited retention_seconds it is 'expired'
+    """
+    opened = time.monotonic()
+    version = -1
+    # Tell the browser to reconnect quickly when the connection drops or the stream ends
+    yield f'retry: {RECONNECT_MILLISECONDS}\n\n'
+    while True:
+        timeout = heartbeat
+        if tracker.started_at is None:
+            timeout = max(0.0, min(heartbeat, opened + start_timeout - time.monotonic()))
+        version, event = tracker.wait(version, timeout)
+        if event is None:
+            if tracker.started_at is None:
+                now = time.monotonic()
+                if now - tracker.created_at > retention_seconds:
+                    yield _sse(dict(tracker.snapshot(), finished=True, status='expired'))
+                    return
+                if now - opened >= start_timeout:
+                    return
+            yield ': keep-alive\n\n'
+            continue
+        yield _sse(event)
+        if event['finished']:
+            return
@@ -0,0 +1,79 @@
+"""
+Per-child summary computed in the assessment pass and stored as child['summary']
+
+List views and overview counts read the summary instead of walking the measurements:
+measurement counts, the latest measurement with weight or height, the worst BB / TB
+status over all periods and whether any period has a DANGER height rationality flag.
+DANGER is counted only for measurements the analysis export would validate as DANGER
+(complete per has_validation_data), so the counts match a validasi=DANGER export.
+Data processed before summaries existed gets one computed on demand (summarize_child).
+"""
+from export_analisis import has_validation_data
+
+# Status severity, mildest first; TIDAK LENGKAP and OUT_OF_RANGE carry no finding
+STATUS_BB_SEVERITY = ('TIDAK LENGKAP', 'OUT_OF_RANGE', 'NORMAL', 'LEBIH', 'KURANG')
+STATUS_TB_SEVERITY = ('TIDAK LENGKAP', 'OUT_OF_RANGE', 'NORMAL', 'TINGGI', 'PENDEK')
+
+_BB_RANK = {status: rank for rank, status in enumerate(STATUS_BB_SEVERITY)}
+_TB_RANK = {status: rank for rank, status in enumerate(STATUS_TB_SEVERITY)}
+
+# Fields of the latest measurement kept in the summary
+LATEST_FIELDS = ('periode', 'periode_key', 'tgl_ukur', 'umur_bulan', 'berat_kg', 'tinggi_cm',
+                 'status_bb', 'status_tb')
+
+def new_summary():
+    return {
+        'total_measurements': 0,
+        'complete_measurements': 0,
+        'incomplete_measurements': 0,
+        'latest': None,
+        'worst_status_bb': None,
+        'worst_status_tb': None,
+        'danger_measurements': 0,
+        'has_danger': False
+    }
+
+def add_measurement(summary, measurement):
+    """
+    Fold one assessed measurement (in period order) into summary
+    """
+    summary['total_measurements'] += 1
+    if measurement.get('has_complete_data'):
+        summary['complete_measurements'] += 1
+        summary['latest'] = measurement
+    if measurement.get('is_incomplete'):
+        summary['incomplete_measurements'] += 1
+
+    status_bb = measurement.get('status_bb')
+    if status_bb in _BB_RANK and (summary['worst_status_bb'] is None
+                                  or _BB_RANK[status_bb] > _BB_RANK[summary['worst_status_bb']]):
+        summary['worst_status_bb'] = status_bb
+    status_tb = measurement.get('status_tb')
+    if status_tb in _TB_RANK and (summary['worst_status_tb'] is None
+                                  or _TB_RANK[status_tb] > _TB_RANK[summary['worst_status_tb']]):
+        summary['worst_status_tb'] = status_tb
+
+    if measurement.get('status_tb_rasional') == 'DANGER' and has_validation_data(measurement):
+        summary['danger_measurements'] += 1
+        summary['has_danger'] = True
+
+def finish_summary(summary):
+    """
+    Replace the latest measurement by a copy of its LATEST_FIELDS; returns summary
+    """
+    latest = summary['latest']
+    if latest is not None:
+        summary['latest'] = {field: latest.get(field) for field in LATEST_FIELDS}
+    return summary
+
+def summarize_child(child):
+    """
+    Stored summary of an assessed child, or one computed from its measurements
+    """
+    summary = child.get('summary')
+    if summary is not None:
+        return summary
+    summary = new_summary()
+    for measurement in child.get('measurements', []):
+        add_measurement(summary, measurement)
+    return finish_summary(summary)
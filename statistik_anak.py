@@ -0,0 +1,104 @@
+import pandas as pd
+
+from nik import normalize_nik
+
+# Kolom flag yang diagregasi per tempat / periode
+FLAG_COLUMNS = ['bb_kurang', 'bb_lebih', 'tb_pendek', 'tb_danger', 'tidak_lengkap']
+
+def child_key(position, child):
+    """
+    Key identifying a child for total_anak: normalized NIK, else name + birth date
+    (as in perbandingan_upload), else the child's position in the dataset
+    """
+    nik = normalize_nik(child.get('nik'))
+    if nik:
+        return nik
+    if child.get('nama_anak') or child.get('tanggal_lahir'):
+        return f"{child.get('nama_anak')}|{child.get('tanggal_lahir')}"
+    return f'#{position}'
+
+def build_measurement_frame(data):
+    """
+    Flatten processed JSON data (children -> measurements) into one DataFrame,
+    one row per measurement, with boolean flag columns for aggregation
+    """
+    records = []
+    for position, child in enumerate(data.get('children', [])):
+        tempat = child.get('tempat') or 'Tidak Diketahui'
+        anak = child_key(position, child)
+        for measurement in child.get('measurements', []):
+            records.append((
+                tempat,
+                measurement.get('periode') or '-',
+                measurement.get('periode_key'),
+                anak,
+                measurement.get('status_bb'),
+                measurement.get('status_tb'),
+                measurement.get('status_tb_rasional'),
+                bool(measurement.get('is_incomplete'))
+            ))
+
+    df = pd.DataFrame.from_records(records, columns=[
+        'tempat', 'periode', 'periode_key', 'anak', 'status_bb', 'status_tb', 'status_tb_rasional', 'is_incomplete'
+    ])
+
+    df['bb_dinilai'] = df['status_bb'].isin(['NORMAL', 'KURANG', 'LEBIH'])
+    df['tb_dinilai'] = df['status_tb'].isin(['NORMAL', 'PENDEK', 'TINGGI'])
+    df['bb_kurang'] = df['status_bb'] == 'KURANG'
+    df['bb_lebih'] = df['status_bb'] == 'LEBIH'
+    df['tb_pendek'] = df['status_tb'] == 'PENDEK'
+    df['tb_danger'] = df['status_tb_rasional'] == 'DANGER'
+    df['tidak_lengkap'] = df['is_incomplete']
+    return df
+
+def _aggregate(df, keys):
+    """
+    Group-by aggregation of flag counts and prevalence (in percent) for the given keys
+    """
+    grouped = df.groupby(keys, sort=False, dropna=False)
+    agg = grouped[FLAG_COLUMNS + ['bb_dinilai', 'tb_dinilai']].sum()
+    agg['total_pengukuran'] = grouped.size()
+    agg['total_anak'] = grouped['anak'].nunique()
+
+    def prevalence(count_col, base_col):
+        base = agg[base_col].where(agg[base_col] > 0)
+        return (agg[count_col] / base * 100).round(2).fillna(0.0)
+
+    agg['prevalensi_bb_kurang'] = prevalence('bb_kurang', 'bb_dinilai')
+    agg['prevalensi_bb_lebih'] = prevalence('bb_lebih', 'bb_dinilai')
+    agg['prevalensi_tb_pendek'] = prevalence('tb_pendek', 'tb_dinilai')
+    agg['prevalensi_tb_danger'] = prevalence('tb_danger', 'total_pengukuran')
+    agg['prevalensi_tidak_lengkap'] = prevalence('tidak_lengkap', 'total_pengukuran')
+
+    agg = agg.reset_index()
+    if 'periode_key' in keys:
+        agg = agg.sort_values(['tempat', 'periode_key'], kind='stable', na_position='last')
+        agg['periode_key'] = pd.Series([None if pd.isna(k) else int(k) for k in agg['periode_key']],
+                                       index=agg.index, dtype=object)
+    int_columns = FLAG_COLUMNS + ['bb_dinilai', 'tb_dinilai', 'total_pengukuran', 'total_anak']
+    agg[int_columns] = agg[int_columns].astype(int)
+    return agg.to_dict(orient='records')
+
+def compute_aggregate_statistics(data):
+    """
+    Hitung statistik agregat per tempat (posyandu) dan per tempat + periode
+    Returns dict with 'per_tempat', 'per_tempat_periode' and 'total'
+    """
+    df = build_measurement_frame(data)
+
+    if df.empty:
+        return {
+            'total': {'total_anak': 0, 'total_pengukuran': 0},
+            'per_tempat': [],
+            'per_tempat_periode': []
+        }
+
+    df['semua'] = 'SEMUA'
+    total = _aggregate(df, ['semua'])[0]
+    total.pop('semua', None)
+
+    return {
+        'total': total,
+        'per_tempat': _aggregate(df, ['tempat']),
+        'per_tempat_periode': _aggregate(df, ['tempat', 'periode_key', 'periode'])
+    }
@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: the index is only shared between threads
+    fcntl = None
+
+INDEX_FILENAME = 'index.json'
+LOCK_FILENAME = '.index.lock'
+CHUNK_SIZE = 1024 * 1024
+# Distinct original names kept per stored file (first name plus the most recent ones)
+MAX_ORIGINAL_NAMES = 20
+
+class UploadStore:
+    """
+    Content-addressed upload storage: files are stored once as <sha256><ext>,
+    with a small JSON index (original names, size, upload time, format, child count)
+
+    Several gunicorn workers may share the folder: every change re-reads the index
+    under an exclusive file lock, applies itself and rewrites it, and readers reload
+    the index when it changed on disk.
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.index_path = os.path.join(folder, INDEX_FILENAME)
+        self.lock_path = os.path.join(folder, LOCK_FILENAME)
+        self._lock = threading.Lock()
+        self._index_stamp = None
+        os.makedirs(folder, exist_ok=True)
+        with self._locked():
+            self._entries = self._load_index()
+
+    @contextmanager
+    def _locked(self):
+        """
+        Exclusive access to the index for this thread and, through flock, other processes
+        """
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.lock_path, 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _stamp(self):
+        try:
+            stat = os.stat(self.index_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _refresh(self):
+        """
+        Reload the index if another process rewrote it (caller holds self._lock)
+        """
+        stamp = self._stamp()
+        if stamp is not None and stamp != self._index_stamp:
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+                self._index_stamp = stamp
+            except Exception as e:
+                print(f"Error reloading upload index: {str(e)}")
+
+    def _load_index(self):
+        """
+        Load the index from disk; on first run, import files stored by the old name-based layout
+        """
+        if os.path.exists(self.index_path):
+            try:
+                stamp = self._stamp()
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    entries = json.load(f)
+                self._index_stamp = stamp
+                return entries
+            except Exception as e:
+                print(f"Error loading upload index: {str(e)}")
+
+        entries = {}
+        for filename in os.listdir(self.folder):
+            if filename.endswith(('.xlsx', '.xls')):
+                file_path = os.path.join(self.folder, filename)
+                stat = os.stat(file_path)
+                entries[f"legacy:{filename}"] = {
+                    'sha256': None,
+                    'stored_name': filename,
+                    'original_name': filename,
+                    'original_names': [filename],
+                    'size': stat.st_size,
+                    'uploaded_at': datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                    'upload_count': 1,
+                    'format_detected': None,
+                    'total_children': None
+                }
+        self._entries = entries
+        self._save_index()
+        return entries
+
+    def _save_index(self):
+        """
+        Atomically persist the index (write temp file, then rename)
+        """
+        fd, tmp_path = tempfile.mkstemp(prefix='.index_', dir=self.folder)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(self._entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+        self._index_stamp = self._stamp()
+
+    def save(self, file_storage):
+        """
+        Store an uploaded werkzeug FileStorage by content hash
+        Returns: (sha256, stored_path, is_duplicate)
+        """
+        ext = os.path.splitext(file_storage.filename)[1].lower()
+        hasher = hashlib.sha256()
+        size = 0
+
+        # Hash while streaming to a temp file, so large uploads are read only once
+        fd, tmp_path = tempfile.mkstemp(prefix='.upload_', suffix=ext, dir=self.folder)
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                while True:
+                    chunk = file_storage.stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    hasher.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+
+            sha256 = hasher.hexdigest()
+            stored_name = f"{sha256}{ext}"
+            stored_path = os.path.join(self.folder, stored_name)
+
+            is_duplicate = os.path.exists(stored_path)
+            if is_duplicate:
+                os.remove(tmp_path)
+                # The janitor evicts by mtime: a re-upload counts as fresh use of the stored file
+                os.utime(stored_path)
+            else:
+                os.replace(tmp_path, stored_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._locked():
+            self._refresh()
+            entry = self._entries.get(sha256)
+            if entry is None:
+                entry = {
+                    'sha256': sha256,
+                    'stored_name': stored_name,
+                    'original_name': file_storage.filename,
+                    'size': size,
+                    'upload_count': 0,
+                    'format_detected': None,
+                    'total_children': None
+                }
+                self._entries[sha256] = entry
+            # 'original_name' stays the first name; every distinct name is kept, most recent last
+            names = entry.setdefault('original_names', [entry['original_name']])
+            if file_storage.filename in names:
+                names.remove(file_storage.filename)
+            names.append(file_storage.filename)
+            del names[1:-(MAX_ORIGINAL_NAMES - 1)]
+            entry['uploaded_at'] = datetime.now().isoformat()
+            entry['upload_count'] += 1
+            self._save_index()
+
+        return sha256, stored_path, is_duplicate
+
+    def update_metadata(self, sha256, **metadata):
+        """
+        Record processing results (format_detected, total_children, ...) for a stored file
+        """
+        with self._locked():
+            self._refresh()
+            if sha256 in self._entries:
+                self._entries[sha256].update(metadata)
+                self._save_index()
+
+    def remove_stored(self, stored_name):
+        """
+        Drop index entries whose stored file was deleted (e.g. evicted by the janitor)
+        """
+        with self._locked():
+            self._refresh()
+            keys = [key for key, entry in self._entries.items() if entry.get('stored_name') == stored_name]
+            for key in keys:
+                del self._entries[key]
+            if keys:
+                self._save_index()
+
+    def get(self, sha256):
+        with self._lock:
+            self._refresh()
+            entry = self._entries.get(sha256)
+            return dict(entry) if entry else None
+
+    def list_files(self, page=1, per_page=50):
+        """
+        Paginated listing from the index, newest upload first (one stat, re-read only when changed)
+        Returns: (files, total)
+        """
+        with self._lock:
+            self._refresh()
+            entries = sorted(self._entries.values(), key=lambda e: e.get('uploaded_at') or '', reverse=True)
+
+        start = (page - 1) * per_page
+        files = [{
+            'name': entry['original_name'],
+            'names': entry.get('original_names', [entry['original_name']]),
+            'size': entry['size'],
+            'sha256': entry.get('sha256'),
+            'uploaded_at': entry.get('uploaded_at'),
+            'upload_count': entry.get('upload_count', 1),
+            'format_detected': entry.get('format_detected'),
+            'total_children': entry.get('total_children')
+        } for entry in entries[start:start + per_page]]
+        return files, len(entries)